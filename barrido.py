@@ -0,0 +1,4 @@
+from drone_simulation.barrido import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+from drone_simulation.rng_bateria import main
+
+if __name__ == '__main__':
+    main()
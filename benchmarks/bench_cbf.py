@@ -0,0 +1,95 @@
+# benchmarks/bench_cbf.py
+"""
+Compara los modos de la CBF (config.CBF_MODO) sobre estados reales del motor: el bucle secuencial de
+aplicar_cbf_simplificada (como SimulationEngine.paso), aplicar_cbf_lote y aplicar_cbf_qp.
+Para cada tamaño se simula un enjambre denso (--densidad veces la densidad por defecto; el mapa crece con N),
+se toma el estado tras unos pasos de calentamiento y se filtran las mismas velocidades nominales con cada modo.
+Reporta el tiempo del filtro, las activaciones y las restricciones dron-dron que siguen violadas después
+(evaluadas con las velocidades filtradas de ambos drones).
+
+Uso: python benchmarks/bench_cbf.py [--tamanos 250 500 1000] [--densidad 2] [--calentamiento 0] [--repeticiones 3]
+"""
+import os, sys, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+from drone_simulation.cbf import (aplicar_cbf_simplificada, aplicar_cbf_lote, aplicar_cbf_qp,
+                                  reset_cbf_activation_count, get_cbf_activation_count)
+
+def motor_calentado(n, pasos, densidad):
+    """Motor con n drones a 'densidad' veces la densidad por defecto, después de 'pasos' pasos (con la CBF por lotes)."""
+    cfg = load_config_runtime()
+    cfg.VERBOSE = False
+    escala = np.sqrt(n / (cfg.NUM_DRONES_INICIAL * densidad))
+    cfg.ANCHO_PANTALLA = int(cfg.ANCHO_PANTALLA * escala)
+    cfg.ALTO_PANTALLA = int(cfg.ALTO_PANTALLA * escala)
+    cfg.NUM_DRONES_INICIAL = n
+    cfg.CBF_MODO = "lote"
+    motor = SimulationEngine(cfg, init_rngs(cfg))
+    for _ in range(pasos):
+        motor.paso()
+    return motor
+
+def secuencial(motor, pares, pares_obs):
+    """Bucle de SimulationEngine.paso con CBF_MODO 'secuencial'; retorna (velocidades, activaciones)."""
+    cfg = motor.config
+    (i, j), (io, ko) = pares, pares_obs
+    inicio = np.searchsorted(i, np.arange(motor.estado.n + 1))
+    inicio_obs = np.searchsorted(io, np.arange(motor.estado.n + 1))
+    reset_cbf_activation_count()
+    for a, d1 in enumerate(motor.drones):
+        if not d1.esta_activo:
+            continue
+        for b in j[inicio[a]:inicio[a + 1]]:
+            aplicar_cbf_simplificada(d1, motor.drones[b], cfg.CBF_D_MIN_DRON_DRON, False, cfg)
+            aplicar_cbf_simplificada(motor.drones[b], d1, cfg.CBF_D_MIN_DRON_DRON, False, cfg)
+        for k in ko[inicio_obs[a]:inicio_obs[a + 1]]:
+            aplicar_cbf_simplificada(d1, motor.obstaculos[k], cfg.CBF_D_MIN_DRON_OBSTACULO, True, cfg)
+    return motor.estado.velocidades.copy(), get_cbf_activation_count()
+
+def violaciones(motor, velocidades, pares):
+    """Restricciones dron-dron dirigidas con h_dot + gamma*h < 0."""
+    i, j = pares
+    p_diff = motor.estado.posiciones[i] - motor.estado.posiciones[j]
+    h = (p_diff**2).sum(axis=1) - motor.config.CBF_D_MIN_DRON_DRON**2
+    h_dot = 2 * (p_diff * (velocidades[i] - velocidades[j])).sum(axis=1)
+    return 2 * int((h_dot + motor.config.CBF_GAMMA * h < 0).sum()) # La condición es simétrica en (i, j)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[250, 500, 1000])
+    parser.add_argument('--calentamiento', type=int, default=0, help="Pasos simulados antes de medir (0: velocidades iniciales aleatorias)")
+    parser.add_argument('--densidad', type=float, default=2.0, help="Drones por área, relativo a la configuración por defecto")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'N':>6} {'modo':>11} {'ms/paso':>9} {'activaciones':>13} {'violadas antes':>15} {'violadas después':>17}")
+    for n in args.tamanos:
+        motor = motor_calentado(n, args.calentamiento, args.densidad)
+        cfg = motor.config
+        pares = motor._pares_drones(motor._radio_candidatos_cbf(cfg.CBF_D_MIN_DRON_DRON, 2.0))
+        pares_obs = motor._pares_obstaculos(motor._radio_candidatos_cbf(cfg.CBF_D_MIN_DRON_OBSTACULO, 1.0),
+                                            sumar_radio_obstaculo=False)
+        nominales = motor.estado.velocidades.copy()
+        activos = motor.estado.activos
+        obst = motor.indice_obstaculos.posiciones
+        modos = {
+            "secuencial": lambda: secuencial(motor, pares, pares_obs),
+            "lote": lambda: aplicar_cbf_lote(motor.estado.posiciones, nominales, activos, pares, obst, pares_obs, cfg),
+            "qp": lambda: aplicar_cbf_qp(motor.estado.posiciones, nominales, activos, pares, obst, pares_obs, cfg),
+        }
+        antes = violaciones(motor, nominales, pares)
+        for nombre, modo in modos.items():
+            mejor = float('inf')
+            for _ in range(args.repeticiones):
+                motor.estado.velocidades[:] = nominales # El modo secuencial modifica el estado in situ
+                t0 = time.perf_counter()
+                nuevas, activaciones = modo()
+                mejor = min(mejor, time.perf_counter() - t0)
+            print(f"{n:>6} {nombre:>11} {mejor * 1e3:>9.2f} {activaciones:>13} {antes:>15} "
+                  f"{violaciones(motor, nuevas, pares):>17}")
+
+if __name__ == "__main__":
+    main()
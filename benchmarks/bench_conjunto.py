@@ -0,0 +1,70 @@
+# benchmarks/bench_conjunto.py
+"""
+Compara K corridas individuales (un SimulationEngine por semilla, una tras otra) con las mismas K corridas
+avanzadas juntas en un MotorConjunto. Reporta el tiempo de ambos y verifica que el estado final de cada mundo
+(posiciones, velocidades, drones activos, grilla de cobertura, colisiones críticas, activaciones de la CBF,
+cobertura) sea idéntico al de su corrida individual.
+La corrida k desplaza las semillas de config.py en k, como headless.py --corridas.
+
+Uso: python benchmarks/bench_conjunto.py [--mundos 4 16] [--pasos 300] [--set CBF_MODO=lote NUM_DRONES_INICIAL=15 ...]
+"""
+import os, sys, copy, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+from drone_simulation.conjunto import MotorConjunto
+from drone_simulation.headless import aplicar_asignaciones, semillas_corrida
+
+def mundos_distintos(individuales, conjunto):
+    """Índices de los mundos cuyo estado difiere del de su corrida individual."""
+    distintos = []
+    for w, (solo, mundo) in enumerate(zip(individuales, conjunto.mundos)):
+        iguales = (np.array_equal(solo.estado.posiciones, mundo.estado.posiciones)
+                   and np.array_equal(solo.estado.velocidades, mundo.estado.velocidades)
+                   and np.array_equal(solo.estado.activos, mundo.estado.activos)
+                   and np.array_equal(solo.grilla, mundo.grilla)
+                   and solo.critical_collisions == mundo.critical_collisions
+                   and solo.cbf_activaciones_total == mundo.cbf_activaciones_total
+                   and solo.coverage == mundo.coverage)
+        if not iguales:
+            distintos.append(w)
+    return distintos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mundos', type=int, nargs='+', default=[4, 16])
+    parser.add_argument('--pasos', type=int, default=300)
+    parser.add_argument('--set', dest='asignaciones', nargs='+', default=[], metavar='CLAVE=valor')
+    args = parser.parse_args()
+
+    cfg = load_config_runtime()
+    aplicar_asignaciones(cfg, args.asignaciones)
+    cfg.VERBOSE = False
+    print(f"{cfg.NUM_DRONES_INICIAL} drones por mundo, CBF_MODO={cfg.CBF_MODO}, {args.pasos} pasos")
+    print(f"{'K':>5} {'individual (s)':>15} {'conjunto (s)':>13} {'aceleración':>12} {'mundos distintos':>17}")
+    for k in args.mundos:
+        cfgs = [semillas_corrida(copy.copy(cfg), corrida) for corrida in range(k)]
+
+        t0 = time.perf_counter()
+        individuales = []
+        for cfg_corrida in cfgs:
+            motor = SimulationEngine(cfg_corrida, init_rngs(cfg_corrida))
+            for _ in range(args.pasos):
+                motor.paso()
+            individuales.append(motor)
+        t_individual = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        conjunto = MotorConjunto(cfg, [init_rngs(cfg_corrida) for cfg_corrida in cfgs])
+        for _ in range(args.pasos):
+            conjunto.paso()
+        t_conjunto = time.perf_counter() - t0
+
+        distintos = mundos_distintos(individuales, conjunto)
+        print(f"{k:>5} {t_individual:>15.2f} {t_conjunto:>13.2f} {t_individual / t_conjunto:>11.1f}x "
+              f"{len(distintos):>17}" + (f"  {distintos}" if distintos else ""))
+
+if __name__ == "__main__":
+    main()
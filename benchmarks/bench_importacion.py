@@ -0,0 +1,65 @@
+# benchmarks/bench_importacion.py
+"""
+Mide el tiempo de importación de los módulos del modelo en un intérprete nuevo (como al arrancar cada proceso
+de barrido.py) y verifica que ninguno cargue pygame. Como referencia se mide también 'import pygame' y la
+interfaz (drone_simulation.ui). Termina con código 1 si algún módulo del modelo importa pygame o si su tiempo
+supera --limite-ms, para detectar regresiones.
+
+Uso: python benchmarks/bench_importacion.py [--repeticiones 5] [--limite-ms 0]
+"""
+import os, sys, json, argparse, subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS_MODELO = ("drone_simulation.engine", "drone_simulation.drone", "drone_simulation.obstaculo",
+                  "drone_simulation.cbf", "drone_simulation.rng", "drone_simulation.rng_handler",
+                  "drone_simulation.headless", "drone_simulation.conjunto", "drone_simulation.barrido",
+                  "drone_simulation.hilo_fisica", "drone_simulation.memoria_compartida",
+                  "drone_simulation.trayectoria")
+MODULOS_REFERENCIA = ("pygame", "drone_simulation.ui")
+
+# Se ejecuta en un intérprete nuevo: importa el módulo y reporta el tiempo y si pygame quedó cargado
+PROGRAMA = """
+import os, sys, json, time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+t0 = time.perf_counter()
+__import__({modulo!r})
+print(json.dumps({{"segundos": time.perf_counter() - t0, "pygame": "pygame" in sys.modules}}))
+"""
+
+def medir(modulo, repeticiones):
+    """Mejor tiempo de importación (s) de 'modulo' en 'repeticiones' intérpretes nuevos, y si cargó pygame."""
+    mejor, con_pygame = float('inf'), False
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", PROGRAMA.format(modulo=modulo)], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(salida.strip().splitlines()[-1])
+        mejor = min(mejor, resultado["segundos"])
+        con_pygame |= resultado["pygame"]
+    return mejor, con_pygame
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--limite-ms', type=float, default=0.0, help="Tiempo máximo por módulo del modelo (0: sin límite)")
+    args = parser.parse_args()
+
+    fallas = []
+    print(f"{'módulo':<32} {'ms':>8} {'pygame':>7}")
+    for modulo in MODULOS_MODELO + MODULOS_REFERENCIA:
+        try:
+            segundos, con_pygame = medir(modulo, args.repeticiones)
+        except subprocess.CalledProcessError as e:
+            print(f"{modulo:<32} {'no disponible':>16}  ({e.stderr.strip().splitlines()[-1]})")
+            continue
+        print(f"{modulo:<32} {segundos * 1e3:>8.1f} {'sí' if con_pygame else 'no':>7}")
+        if modulo in MODULOS_MODELO:
+            if con_pygame:
+                fallas.append(f"{modulo} importa pygame")
+            if args.limite_ms > 0 and segundos * 1e3 > args.limite_ms:
+                fallas.append(f"{modulo} tarda {segundos * 1e3:.1f} ms (límite {args.limite_ms:g} ms)")
+    for falla in fallas:
+        print(f"REGRESIÓN: {falla}")
+    sys.exit(1 if fallas else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_integradores.py
+"""
+Compara los integradores del motor (config.INTEGRADOR) en una simulación sin ventana: para cada uno corre
+la misma configuración durante un tiempo simulado fijo y reporta el tiempo de reloj por segundo simulado,
+los subpasos y rechazos por paso y las evaluaciones de fuerza por paso.
+
+Uso: python benchmarks/bench_integradores.py [--drones 200] [--dt 0.0167] [--segundos 5]
+                                            [--integradores rk4_enjambre verlet ...] [--acoplado]
+"""
+import os, sys, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine, INTEGRADORES
+
+def correr(integrador, args):
+    """Corre la simulación con 'integrador' y retorna (segundos de reloj, pasos, estadísticas acumuladas, cobertura)."""
+    cfg = load_config_runtime()
+    cfg.VERBOSE = False
+    cfg.NUM_DRONES_INICIAL = args.drones
+    cfg.DELTA_T = args.dt
+    cfg.INTEGRADOR = integrador
+    cfg.RK4_ACOPLADO = args.acoplado and integrador == "rk4_enjambre"
+    motor = SimulationEngine(cfg, init_rngs(cfg))
+    pasos = max(1, round(args.segundos / args.dt))
+    t0 = time.perf_counter()
+    for _ in range(pasos):
+        motor.paso()
+    return time.perf_counter() - t0, pasos, motor.estadisticas_integracion_total, motor.coverage
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--drones', type=int, default=200)
+    parser.add_argument('--dt', type=float, default=1 / 60.0, help="DELTA_T de la simulación (s)")
+    parser.add_argument('--segundos', type=float, default=5.0, help="Tiempo simulado por integrador (s)")
+    parser.add_argument('--integradores', nargs='+', default=list(INTEGRADORES), choices=list(INTEGRADORES))
+    parser.add_argument('--acoplado', action='store_true', help="RK4_ACOPLADO para rk4_enjambre")
+    args = parser.parse_args()
+
+    print(f"N = {args.drones}, dt = {args.dt:.4f} s, {args.segundos:.1f} s simulados")
+    print(f"{'integrador':>18} {'reloj/s sim':>12} {'subpasos/paso':>14} {'rechazos/paso':>14} {'fuerzas/paso':>13} {'cobertura':>10}")
+    for integrador in args.integradores:
+        reloj, pasos, estadisticas, cobertura = correr(integrador, args)
+        print(f"{integrador:>18} {reloj / args.segundos:>11.3f}s {estadisticas.subpasos / pasos:>14.2f} "
+              f"{estadisticas.rechazados / pasos:>14.2f} {estadisticas.evaluaciones_fuerza / pasos:>13.2f} {cobertura:>9.1f}%")
+
+if __name__ == "__main__":
+    main()
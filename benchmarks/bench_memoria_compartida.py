@@ -0,0 +1,105 @@
+# benchmarks/bench_memoria_compartida.py
+"""
+Mide el canal de memoria compartida (drone_simulation/memoria_compartida.py):
+1) el costo de publicar en cada paso (CanalCompartido.publicar medido aparte, comparado con SimulationEngine.paso),
+   verificando que el estado final sea idéntico al de una corrida sin canal;
+2) la latencia entre que el motor publica un frame y que un lector en otro proceso lo ve (p50 / p99 / máx), cuántos
+   frames alcanzó a ver, cuántas lecturas descartó el seqlock y si todas las copias leídas coinciden con lo publicado
+   (suma de posiciones de cada frame, registrada por el escritor).
+
+Uso: python benchmarks/bench_memoria_compartida.py [--pasos 1000] [--set NUM_DRONES_INICIAL=1000 ...]
+"""
+import os, sys, time, argparse, multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+from drone_simulation.headless import aplicar_asignaciones
+from drone_simulation.memoria_compartida import CanalCompartido, LectorCompartido
+
+def lector(nombre, listo, fin, resultados):
+    """Proceso lector: copia cada frame nuevo y anota la latencia y la suma de posiciones."""
+    canal = LectorCompartido(nombre)
+    latencias, sumas, numero = [], {}, -1
+    listo.set()
+    while True:
+        ultimo = canal.ultimo()
+        if ultimo is None or ultimo.numero <= numero: # Nada nuevo
+            if fin.is_set():
+                break
+            time.sleep(0) # Ceder la CPU sin dormir un intervalo fijo
+            continue
+        frame = canal.leer()
+        latencias.append(time.perf_counter_ns() - frame.t_ns)
+        sumas[frame.numero] = float(frame.posiciones.sum())
+        numero = frame.numero
+    resultados.put((latencias, sumas, canal.reintentos))
+    canal.cerrar()
+
+def avanzar(cfg, pasos, canal=None, sumas=None):
+    """Corre 'pasos' pasos con el canal en el motor; con 'sumas' anota la suma de posiciones de cada frame publicado."""
+    motor = SimulationEngine(cfg, init_rngs(cfg))
+    motor.canal_compartido = canal
+    for _ in range(pasos):
+        motor.paso()
+        if sumas is not None:
+            sumas.append(float(motor.estado.posiciones.sum()))
+    return motor
+
+def medir_publicacion(cfg, pasos, canal):
+    """(segundos en paso, segundos en publicar, motor): el motor publica a mano tras cada paso para medir ambos."""
+    motor = SimulationEngine(cfg, init_rngs(cfg))
+    t_paso = t_publicar = 0.0
+    for _ in range(pasos):
+        t0 = time.perf_counter()
+        motor.paso()
+        t1 = time.perf_counter()
+        canal.publicar(motor)
+        t_paso, t_publicar = t_paso + (t1 - t0), t_publicar + (time.perf_counter() - t1)
+    return t_paso, t_publicar, motor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pasos', type=int, default=1000)
+    parser.add_argument('--set', dest='asignaciones', nargs='*', default=[], metavar='CLAVE=valor')
+    args = parser.parse_args()
+    cfg = load_config_runtime()
+    cfg.VERBOSE = False
+    aplicar_asignaciones(cfg, args.asignaciones)
+
+    # 1) Costo de publicar
+    motor_sin = avanzar(cfg, args.pasos)
+    canal = CanalCompartido.para_config(cfg)
+    try:
+        t_paso, t_publicar, motor_con = medir_publicacion(cfg, args.pasos, canal)
+    finally:
+        canal.cerrar()
+    identicos = (np.array_equal(motor_sin.estado.posiciones, motor_con.estado.posiciones)
+                 and np.array_equal(motor_sin.grilla, motor_con.grilla))
+    print(f"drones: {motor_sin.estado.n}, grilla: {motor_sin.grilla.shape}, pasos: {args.pasos}")
+    print(f"paso: {t_paso / args.pasos * 1e6:.1f} us, publicar: {t_publicar / args.pasos * 1e6:.1f} us "
+          f"({100 * t_publicar / t_paso:.2f} % del paso), estado idéntico: {'sí' if identicos else 'NO'}")
+
+    # 2) Latencia hacia un lector en otro proceso
+    canal = CanalCompartido.para_config(cfg)
+    listo, fin, resultados = multiprocessing.Event(), multiprocessing.Event(), multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=lector, args=(canal.nombre, listo, fin, resultados))
+    proceso.start()
+    try:
+        listo.wait()
+        sumas_escritor = []
+        avanzar(cfg, args.pasos, canal, sumas_escritor)
+        fin.set()
+        latencias, sumas_lector, reintentos = resultados.get()
+        proceso.join()
+    finally:
+        canal.cerrar()
+    latencias = np.array(latencias) / 1e3
+    consistentes = all(sumas_escritor[numero] == suma for numero, suma in sumas_lector.items())
+    print(f"lector: {len(sumas_lector)} de {args.pasos} frames vistos, reintentos del seqlock: {reintentos}, "
+          f"copias consistentes: {'sí' if consistentes else 'NO'}")
+    print(f"latencia (us): p50 {np.percentile(latencias, 50):.1f}, p99 {np.percentile(latencias, 99):.1f}, máx {latencias.max():.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_render_cobertura.py
+"""
+Compara el dibujo de la grilla de cobertura celda por celda (un pygame.draw.rect por celda en cada fotograma)
+con render.CapaCobertura (superficie persistente que solo redibuja las celdas que cambiaron) para varios tamaños
+de celda, sin ventana (SDL_VIDEODRIVER=dummy). Cada fotograma avanza el motor --pasos-por-fotograma pasos; también
+se mide el caso con la cobertura sin cambios (motor detenido). Verifica que ambas pantallas sean idénticas píxel a píxel.
+
+Uso: python benchmarks/bench_render_cobertura.py [--celdas 50 10 4] [--fotogramas 100] [--pasos-por-fotograma 1]
+"""
+import os, sys, time, argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame
+from drone_simulation import render
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+
+def dibujar_por_celda(pantalla, engine, config):
+    """Dibujo anterior de la grilla: un rectángulo por celda."""
+    nx_grid, ny_grid = engine.grilla.shape
+    cell_size = config.TAMANO_CELDA_COBERTURA
+    for i in range(nx_grid):
+        for j in range(ny_grid):
+            color = config.COLOR_CELDA_CUBIERTA if engine.grilla[i, j] else config.COLOR_CELDA_NO_CUBIERTA
+            pygame.draw.rect(pantalla, color, pygame.Rect(i * cell_size, j * cell_size, cell_size, cell_size))
+
+def medir(engine, config, pantalla, dibujar, fotogramas, pasos):
+    """Tiempo medio de dibujo por fotograma (s), sin contar los pasos del motor."""
+    total = 0.0
+    for _ in range(fotogramas):
+        for _ in range(pasos):
+            engine.paso()
+        t0 = time.perf_counter()
+        pantalla.fill(config.GRIS_CLARO)
+        dibujar(pantalla)
+        total += time.perf_counter() - t0
+    return total / fotogramas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--celdas', type=int, nargs='+', default=[50, 10, 4], help="Valores de TAMANO_CELDA_COBERTURA")
+    parser.add_argument('--fotogramas', type=int, default=100)
+    parser.add_argument('--pasos-por-fotograma', type=int, default=1)
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'celda':>6} {'celdas':>8} {'caso':>10} {'por celda (ms)':>15} {'capa (ms)':>10} {'idénticas':>10}")
+    for tamano in args.celdas:
+        cfg = load_config_runtime()
+        cfg.TAMANO_CELDA_COBERTURA = tamano
+        pantalla_celdas = pygame.Surface((cfg.ANCHO_PANTALLA, cfg.ALTO_PANTALLA))
+        pantalla_capa = pygame.Surface((cfg.ANCHO_PANTALLA, cfg.ALTO_PANTALLA))
+        # Dos motores con las mismas semillas avanzan igual; cada uno se dibuja con un método
+        engine_celdas, engine_capa = SimulationEngine(cfg, init_rngs(cfg)), SimulationEngine(cfg, init_rngs(cfg))
+        capa = render.CapaCobertura(cfg)
+        for caso, pasos in (("avanzando", args.pasos_por_fotograma), ("detenido", 0)):
+            t_celdas = medir(engine_celdas, cfg, pantalla_celdas,
+                             lambda p: dibujar_por_celda(p, engine_celdas, cfg), args.fotogramas, pasos)
+            t_capa = medir(engine_capa, cfg, pantalla_capa, lambda p: capa.dibujar(p, engine_capa), args.fotogramas, pasos)
+            identicas = (pygame.image.tobytes(pantalla_celdas, "RGB") == pygame.image.tobytes(pantalla_capa, "RGB"))
+            print(f"{tamano:>6} {engine_capa.grilla.size:>8} {caso:>10} {t_celdas * 1e3:>15.3f} {t_capa * 1e3:>10.3f} "
+                  f"{'sí' if identicas else 'NO':>10}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_render_enjambre.py
+"""
+Compara el dibujo de obstáculos y drones objeto por objeto (pygame.draw.circle por cada uno y la etiqueta de ID
+renderizada con una fuente nueva en cada fotograma, como antes) con render.CapaEnjambre (sprites cacheados y un
+solo Surface.blits por fotograma, incluida la instantánea del motor que dibuja), sin ventana (SDL_VIDEODRIVER=dummy) y para varios tamaños de enjambre.
+Verifica que ambas pantallas sean idénticas píxel a píxel cuando se dibujan las etiquetas; por encima de
+MAX_DRONES_CON_ETIQUETA la capa las omite (nivel de detalle) y la comparación no aplica.
+
+Uso: python benchmarks/bench_render_enjambre.py [--drones 15 200 2000] [--fotogramas 30] [--set MAX_DRONES_CON_ETIQUETA=300 ...]
+"""
+import os, sys, time, argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame
+from drone_simulation import render
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+from drone_simulation.hilo_fisica import Instantanea
+from drone_simulation.headless import aplicar_asignaciones
+
+def dibujar_por_objeto(pantalla, engine):
+    """Dibujo anterior: un círculo por objeto y la etiqueta de cada dron activo con una fuente nueva."""
+    for obs in engine.obstaculos:
+        if obs.esta_activo:
+            pygame.draw.circle(pantalla, obs.color, (int(obs.posicion[0]), int(obs.posicion[1])), int(obs.radio))
+    for dr in engine.drones:
+        pygame.draw.circle(pantalla, dr.color, (int(dr.posicion[0]), int(dr.posicion[1])), int(dr.radio))
+        if dr.esta_activo:
+            font = pygame.font.SysFont(None, 18)
+            texto_id = font.render(str(dr.id), True, dr.config_propia.NEGRO)
+            pantalla.blit(texto_id, (dr.posicion[0] - texto_id.get_width() / 2,
+                                     dr.posicion[1] - dr.radio - texto_id.get_height() - 2))
+
+def medir(dibujar, pantalla, fondo, fotogramas):
+    """Tiempo medio por fotograma (s)."""
+    t0 = time.perf_counter()
+    for _ in range(fotogramas):
+        pantalla.fill(fondo)
+        dibujar(pantalla)
+    return (time.perf_counter() - t0) / fotogramas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--drones', type=int, nargs='+', default=[15, 200, 2000])
+    parser.add_argument('--fotogramas', type=int, default=30)
+    parser.add_argument('--pasos', type=int, default=30, help="Pasos del motor antes de dibujar (drones dispersos)")
+    parser.add_argument('--set', nargs='*', default=[], metavar="CLAVE=VALOR")
+    args = parser.parse_args()
+
+    pygame.init()
+    print(f"{'drones':>7} {'etiquetas':>10} {'por objeto (ms)':>16} {'capa (ms)':>10} {'fps capa':>9} {'idénticas':>10}")
+    for n in args.drones:
+        cfg = load_config_runtime()
+        cfg.VERBOSE = False
+        aplicar_asignaciones(cfg, args.set)
+        cfg.NUM_DRONES_INICIAL = n
+        engine = SimulationEngine(cfg, init_rngs(cfg))
+        for _ in range(args.pasos):
+            engine.paso()
+        capa = render.CapaEnjambre(cfg)
+        pantalla_objetos = pygame.Surface((cfg.ANCHO_PANTALLA, cfg.ALTO_PANTALLA))
+        pantalla_capa = pygame.Surface((cfg.ANCHO_PANTALLA, cfg.ALTO_PANTALLA))
+        t_objetos = medir(lambda p: dibujar_por_objeto(p, engine), pantalla_objetos, cfg.GRIS_CLARO, args.fotogramas)
+        t_capa = medir(lambda p: capa.dibujar(p, Instantanea.de_motor(engine)), pantalla_capa, cfg.GRIS_CLARO, args.fotogramas)
+        con_etiquetas = int(engine.estado.activos.sum()) <= cfg.MAX_DRONES_CON_ETIQUETA
+        identicas = pygame.image.tobytes(pantalla_objetos, "RGB") == pygame.image.tobytes(pantalla_capa, "RGB")
+        print(f"{n:>7} {'sí' if con_etiquetas else 'no':>10} {t_objetos * 1e3:>16.3f} {t_capa * 1e3:>10.3f} "
+              f"{1 / t_capa:>9.0f} {('sí' if identicas else 'NO') if con_etiquetas else '-':>10}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_rng.py
+"""
+Compara la generación de flotantes muestra por muestra (next_float en un bucle) con la generación por bloques
+(next_floats) para los generadores de la simulación, con sus parámetros de config.py, y verifica que ambas den
+exactamente los mismos valores y dejen el generador en el mismo estado. Para el LCG compara también el salto
+O(log n) (saltar) con avanzar n pasos uno por uno, y para Cuadrados Medios reporta el ciclo en que cae desde su semilla.
+
+Uso: python benchmarks/bench_rng.py [--tamanos 1000 100000 1000000] [--repeticiones 3]
+"""
+import os, sys, time, copy, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+
+def mejor_tiempo(funcion, repeticiones):
+    """Mejor tiempo (s) de 'repeticiones' llamadas y el resultado de la última."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, resultado
+
+def _estado(rng):
+    """Estado entero actual del generador (LCG o Cuadrados Medios)."""
+    return getattr(rng, 'current_value', getattr(rng, 'current_seed_int', None))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    cfg = load_config_runtime()
+    rng_entorno, rng_drones, rng_obst = init_rngs(cfg)
+    generadores = {"LCG entorno": rng_entorno, "Cuad. medios": rng_drones, "LCG obstáculos": rng_obst}
+
+    print(f"{'generador':<16} {'n':>9} {'bucle (ms)':>11} {'bloque (ms)':>12} {'aceleración':>12} {'idénticos':>10}")
+    for nombre, rng in generadores.items():
+        for n in args.tamanos:
+            bucle, bloque = copy.deepcopy(rng), copy.deepcopy(rng)
+            t0 = time.perf_counter()
+            esperados = [bucle.next_float() for _ in range(n)]
+            t_bucle = time.perf_counter() - t0
+            t_bloque, obtenidos = mejor_tiempo(lambda: copy.deepcopy(rng).next_floats(n), args.repeticiones)
+            bloque.next_floats(n)
+            identicos = obtenidos.tolist() == esperados and _estado(bloque) == _estado(bucle)
+            print(f"{nombre:<16} {n:>9} {t_bucle * 1e3:>11.2f} {t_bloque * 1e3:>12.3f} "
+                  f"{t_bucle / t_bloque:>11.0f}x {'sí' if identicos else 'NO':>10}")
+
+    ciclo = copy.deepcopy(rng_drones).detectar_ciclo()
+    print(f"\nCuadrados Medios ({rng_drones.num_digits} dígitos, semilla {rng_drones.initial_seed}): "
+          + ("sin ciclo en el límite de búsqueda" if ciclo is None else f"ciclo de largo {ciclo[1]} tras {ciclo[0]} valores"))
+
+    print()
+    print(f"{'salto n':>12} {'pasos (ms)':>11} {'saltar (ms)':>12} {'mismo estado':>13}")
+    for n in args.tamanos:
+        pasos, salto = copy.deepcopy(rng_entorno), copy.deepcopy(rng_entorno)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            pasos._next_raw()
+        t_pasos = time.perf_counter() - t0
+        t_salto, _ = mejor_tiempo(lambda: copy.deepcopy(salto).saltar(n), args.repeticiones)
+        salto.saltar(n)
+        print(f"{n:>12} {t_pasos * 1e3:>11.2f} {t_salto * 1e3:>12.4f} {'sí' if salto.current_value == pasos.current_value else 'NO':>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_trayectoria.py
+"""
+Graba una corrida con trayectoria.GrabadorTrayectoria y la lee con LectorTrayectoria (archivo mapeado en memoria).
+Reporta el costo de grabar por paso, el tamaño del archivo por paso (frente al estado en float64 / bool / grilla int
+sin comprimir) y el tiempo de acceso aleatorio a un paso y a su grilla. Verifica que los pasos leídos coincidan con el
+estado del motor al grabarlos y que un archivo interrumpido (sin índice) se pueda leer hasta el último bloque completo.
+A mitad de la corrida se añaden drones y a 3/4 se resetea el motor, para ejercitar los cambios de bloque.
+
+Uso: python benchmarks/bench_trayectoria.py [--pasos 3000] [--accesos 1000] [--set NUM_DRONES_INICIAL=100 ...]
+"""
+import os, sys, time, argparse, tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.engine import SimulationEngine
+from drone_simulation.headless import aplicar_asignaciones
+from drone_simulation.trayectoria import GrabadorTrayectoria, LectorTrayectoria
+
+def coincide(leido, referencia):
+    """True si el paso leído es igual al estado guardado al grabarlo."""
+    return (leido.time == referencia["time"] and leido.coverage == referencia["coverage"]
+            and np.array_equal(leido.posiciones, referencia["posiciones"])
+            and np.array_equal(leido.velocidades, referencia["velocidades"])
+            and np.array_equal(leido.activos, referencia["activos"])
+            and np.array_equal(leido.grilla(), referencia["grilla"]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pasos', type=int, default=3000)
+    parser.add_argument('--accesos', type=int, default=1000, help="Lecturas de pasos al azar")
+    parser.add_argument('--muestras', type=int, default=50, help="Pasos cuyo estado se compara con el del motor")
+    parser.add_argument('--set', dest='asignaciones', nargs='*', default=[], metavar='CLAVE=valor')
+    args = parser.parse_args()
+    cfg = load_config_runtime()
+    cfg.VERBOSE = False
+    aplicar_asignaciones(cfg, args.asignaciones)
+    azar = np.random.default_rng(0)
+    muestras = set(azar.choice(args.pasos, min(args.muestras, args.pasos), replace=False).tolist())
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "corrida.tray")
+        motor = SimulationEngine(cfg, init_rngs(cfg))
+        grabador = GrabadorTrayectoria.para_config(ruta, cfg)
+        referencias, t_paso, t_grabar, bytes_crudos = {}, 0.0, 0.0, 0
+        for paso in range(args.pasos):
+            if paso == args.pasos // 2:
+                motor._spawn_drones(5)
+            if paso == 3 * args.pasos // 4:
+                motor._init_state()
+            t0 = time.perf_counter()
+            motor.paso()
+            t1 = time.perf_counter()
+            grabador.grabar(motor) # Igual que engine.grabador_trayectoria, pero medido aparte
+            t_paso, t_grabar = t_paso + (t1 - t0), t_grabar + (time.perf_counter() - t1)
+            e = motor.estado
+            bytes_crudos += e.posiciones.nbytes + e.velocidades.nbytes + e.activos.nbytes + motor.grilla.nbytes + 16
+            if paso in muestras:
+                referencias[paso] = {
+                    "time": motor.time, "coverage": motor.coverage, "grilla": motor.grilla.copy(),
+                    "posiciones": e.posiciones.astype(np.float32), "velocidades": e.velocidades.astype(np.float32),
+                    "activos": e.activos.copy(),
+                }
+        t0 = time.perf_counter()
+        grabador.cerrar()
+        t_cerrar = time.perf_counter() - t0
+        tamano = os.path.getsize(ruta)
+        print(f"drones: {motor.estado.n}, grilla: {motor.grilla.shape}, pasos: {args.pasos}")
+        print(f"paso: {t_paso / args.pasos * 1e6:.1f} us, grabar: {t_grabar / args.pasos * 1e6:.1f} us "
+              f"({100 * t_grabar / t_paso:.1f} % del paso), cerrar: {t_cerrar * 1e3:.1f} ms")
+        print(f"archivo: {tamano / args.pasos:.0f} bytes/paso (sin comprimir: {bytes_crudos / args.pasos:.0f}), "
+              f"{tamano / 1e6:.2f} MB")
+
+        lector = LectorTrayectoria(ruta)
+        indices = azar.integers(0, len(lector), args.accesos).tolist()
+        t0 = time.perf_counter()
+        for i in indices:
+            lector[i]
+        t_acceso = (time.perf_counter() - t0) / args.accesos
+        t0 = time.perf_counter()
+        for i in indices:
+            lector[i].grilla()
+        t_grilla = (time.perf_counter() - t0) / args.accesos - t_acceso
+        iguales = all(coincide(lector[paso], referencia) for paso, referencia in referencias.items())
+        print(f"lector: {len(lector)} pasos en {len(lector.bloques)} bloques, acceso a un paso: {t_acceso * 1e6:.1f} us, "
+              f"grilla: {t_grilla * 1e6:.1f} us, {len(referencias)} pasos comparados, idénticos: {'sí' if iguales else 'NO'}")
+
+        # Archivo interrumpido: se corta en medio del último bloque, sin índice ni pie
+        ruta_cortada = os.path.join(carpeta, "cortada.tray")
+        ultimo_bloque = int(lector.bloques[-1][0])
+        with open(ruta, "rb") as origen, open(ruta_cortada, "wb") as destino:
+            destino.write(origen.read(ultimo_bloque + 100))
+        lector.cerrar()
+        cortada = LectorTrayectoria(ruta_cortada)
+        esperados = int(LectorTrayectoria(ruta).bloques[-1][1]) # Pasos antes del último bloque
+        legibles = all(coincide(cortada[paso], referencia) for paso, referencia in referencias.items() if paso < esperados)
+        print(f"archivo interrumpido: índice {'completo' if cortada.completo else 'reconstruido'}, {len(cortada)} pasos "
+              f"(esperados {esperados}), pasos comparados idénticos: {'sí' if legibles and len(cortada) == esperados else 'NO'}")
+        cortada.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# benchmarks/bench_validador.py
+"""
+Mide perform_rng_quality_tests_from_scratch (Chi-cuadrado, K-S y autocorrelación lag-1) sobre los generadores de la
+simulación para varios tamaños de muestra. Hasta --tamano-bloque muestras las pruebas son exactas sobre el arreglo
+completo; con más se usa el modo por bloques (memoria acotada). Reporta el tiempo, los estadísticos y sus p-values.
+
+Uso: python benchmarks/bench_validador.py [--tamanos 100000 10000000 100000000] [--tamano-bloque 4194304]
+"""
+import os, sys, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation.rng_handler import load_config_runtime, init_rngs
+from drone_simulation.rng_validator import perform_rng_quality_tests_from_scratch, TAMANO_BLOQUE_VALIDACION
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[100000, 10000000, 100000000])
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE_VALIDACION)
+    args = parser.parse_args()
+
+    cfg = load_config_runtime()
+    nombres = ("LCG entorno", "Cuad. medios", "LCG obstáculos")
+    print(f"{'generador':<16} {'n':>11} {'modo':>8} {'s':>8} {'chi2':>10} {'p chi2':>8} {'D':>10} {'p K-S':>8} {'autocorr':>9}")
+    for n in args.tamanos:
+        for nombre, rng in zip(nombres, init_rngs(cfg)):
+            t0 = time.perf_counter()
+            r = perform_rng_quality_tests_from_scratch(rng, n, tamano_bloque=args.tamano_bloque)
+            segundos = time.perf_counter() - t0
+            chi2, ks = r['chi_squared_uniformity'], r['kolmogorov_smirnov_uniformity']
+            modo = "exacto" if n <= args.tamano_bloque else "bloques"
+            print(f"{nombre:<16} {n:>11} {modo:>8} {segundos:>8.2f} {chi2.get('statistic', float('nan')):>10.2f} "
+                  f"{chi2.get('p_value', float('nan')):>8.4f} {ks.get('statistic_D', float('nan')):>10.2e} "
+                  f"{ks.get('p_value', float('nan')):>8.4f} {r['autocorrelation_lag1_numpy'].get('value', float('nan')):>9.5f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_vecindad.py
+"""
+Compara la búsqueda de pares por fuerza bruta contra la GrillaEspacial para enjambres de tamaño creciente,
+con densidad constante (el área del mapa crece con N). Reporta el tamaño de enjambre a partir del cual
+la grilla es más rápida.
+
+Uso: python benchmarks/bench_vecindad.py [--tamanos 50 100 ...] [--area-por-dron 10000] [--repeticiones 5]
+"""
+import os, sys, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drone_simulation import config
+from drone_simulation.vecindad import GrillaEspacial, pares_en_rango_bruto
+
+def medir(funcion, repeticiones):
+    """Mejor tiempo (s) de 'repeticiones' ejecuciones."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[25, 50, 100, 200, 500, 1000, 2000, 5000])
+    parser.add_argument('--area-por-dron', type=float, default=100.0 * 100.0, help="Área del mapa por dron (px^2)")
+    parser.add_argument('--radio', type=float, default=config.SENSOR_RANGE_DRONE, help="Radio de la consulta de pares")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'N':>6} {'pares':>9} {'bruta (ms)':>11} {'grilla (ms)':>12} {'aceleración':>12}")
+    cruce = None
+    for n in args.tamanos:
+        lado = np.sqrt(n * args.area_por_dron)
+        posiciones = rng.uniform(0, lado, size=(n, 2))
+        activos = np.ones(n, dtype=bool)
+
+        def con_grilla():
+            grilla = GrillaEspacial(args.radio)
+            grilla.construir(posiciones)
+            return grilla.pares(args.radio)
+
+        t_bruta = medir(lambda: pares_en_rango_bruto(posiciones, activos, args.radio), args.repeticiones)
+        t_grilla = medir(con_grilla, args.repeticiones)
+        num_pares = len(con_grilla()[0])
+        print(f"{n:>6} {num_pares:>9} {t_bruta * 1e3:>11.3f} {t_grilla * 1e3:>12.3f} {t_bruta / t_grilla:>11.2f}x")
+        if cruce is None and t_grilla < t_bruta:
+            cruce = n
+    if cruce is None:
+        print("La grilla no superó a la fuerza bruta en los tamaños probados.")
+    else:
+        print(f"La grilla es más rápida a partir de N = {cruce} drones (densidad constante).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# drone_simulation/barrido.py
+"""
+Barrido de parámetros de configuración sobre un pool de procesos.
+Genera los puntos de diseño (grilla completa, muestreo aleatorio o hipercubo latino sobre rangos) para claves
+conocidas por rng_handler.load_config_runtime, corre cada punto --repeticiones veces sin ventana (ver headless.py)
+repartiendo las corridas entre todos los núcleos, y escribe una línea JSON por corrida a medida que terminan.
+Las semillas de cada corrida se derivan de --semilla-maestra, así que el barrido completo es reproducible; al
+relanzarlo con la misma salida se omiten las corridas ya escritas (reanudación).
+
+Uso: python barrido.py --grilla K_COHESION=0.5,1,2 K_SEPARATION=50,100 [--repeticiones 3] --salida barrido.jsonl
+     python barrido.py --diseno lhs --rango K_COHESION=0.5:2 CBF_D_MIN_DRON_DRON=15:35 --muestras 40 --salida lhs.jsonl
+     Opciones comunes: [--set NUM_DRONES_INICIAL=100 ...] [--segundos 60] [--cobertura-objetivo 90] [--hitos 50 90]
+                       [--semilla-maestra 12345] [--semillas-comunes] [--procesos 8] [--use-runtime-config]
+"""
+import os, sys, copy, json, time, argparse, itertools, multiprocessing
+from .rng import SplitMix64, derivar_semilla
+from .rng_handler import load_config_runtime
+from .headless import HITOS_COBERTURA, _valor_desde_texto, aplicar_asignaciones, ejecutar_corrida
+
+DISENOS = ("grilla", "aleatorio", "lhs")
+FLUJO_DISENO, FLUJO_CORRIDAS = 0, 1 # Primera clave de derivar_semilla para cada uso de la semilla maestra
+
+def _parsear_parametros(asignaciones, separador):
+    """'CLAVE=v1,v2,...' (separador ',') o 'CLAVE=min:max' (separador ':') -> {CLAVE: [valores]}."""
+    parametros = {}
+    for asignacion in asignaciones:
+        clave, sep, texto = asignacion.partition("=")
+        if not sep or not clave.strip():
+            raise ValueError(f"Parámetro de barrido inválido: '{asignacion}'.")
+        valores = [_valor_desde_texto(v.strip()) for v in texto.split(separador)]
+        if separador == ":" and (len(valores) != 2 or not all(isinstance(v, (int, float)) for v in valores)):
+            raise ValueError(f"Rango inválido para '{clave}': use CLAVE=min:max con números.")
+        parametros[clave.strip()] = valores
+    return parametros
+
+def puntos_grilla(parametros):
+    """Producto cartesiano de los valores de cada parámetro (el último parámetro varía más rápido)."""
+    claves = list(parametros)
+    return [dict(zip(claves, valores)) for valores in itertools.product(*(parametros[c] for c in claves))]
+
+def _escalar(u, minimo, maximo):
+    """Lleva u en [0, 1) al rango; si ambos extremos son enteros, el resultado es un entero en [minimo, maximo]."""
+    if isinstance(minimo, int) and isinstance(maximo, int):
+        return min(maximo, minimo + int(u * (maximo - minimo + 1)))
+    return minimo + u * (maximo - minimo)
+
+def puntos_aleatorios(rangos, muestras, rng):
+    """'muestras' puntos con cada parámetro uniforme e independiente en su rango."""
+    return [{clave: _escalar(rng.next_float(), *rango) for clave, rango in rangos.items()} for _ in range(muestras)]
+
+def puntos_hipercubo_latino(rangos, muestras, rng):
+    """
+    Hipercubo latino: cada rango se divide en 'muestras' estratos iguales y cada estrato de cada parámetro
+    se usa exactamente una vez (permutación independiente por parámetro, punto uniforme dentro del estrato).
+    """
+    puntos = [{} for _ in range(muestras)]
+    for clave, (minimo, maximo) in rangos.items():
+        estratos = list(range(muestras))
+        for i in range(muestras - 1, 0, -1): # Fisher-Yates
+            j = rng.next_int(0, i)
+            estratos[i], estratos[j] = estratos[j], estratos[i]
+        for punto, estrato in zip(puntos, estratos):
+            punto[clave] = _escalar((estrato + rng.next_float()) / muestras, minimo, maximo)
+    return puntos
+
+def semillas_corrida(cfg, semilla_maestra, punto, repeticion, comunes=False):
+    """
+    Semillas de los tres RNG de la simulación para la corrida (punto, repeticion), derivadas de la semilla maestra.
+    Con comunes=True dependen solo de la repetición (números aleatorios comunes entre puntos de diseño).
+    """
+    claves = (FLUJO_CORRIDAS, repeticion) if comunes else (FLUJO_CORRIDAS, punto, repeticion)
+    return {
+        "GCL_SEED_ENTORNO": derivar_semilla(semilla_maestra, *claves, 0) % cfg.GCL_MODULUS_M,
+        "MIDDLE_SQUARE_SEED_DRONES": derivar_semilla(semilla_maestra, *claves, 1) % 10**cfg.N_DIGITS_MIDDLE_SQUARE,
+        "GCL_SEED_OBSTACULOS_DYN": derivar_semilla(semilla_maestra, *claves, 2) % cfg.GCL_MODULUS_M_OBS,
+    }
+
+def _corridas_hechas(ruta):
+    """
+    Lee las corridas ya escritas en 'ruta' ({id: línea}) para reanudar. Una última línea incompleta
+    (proceso interrumpido a mitad de escritura) se descarta del archivo; las corridas con error se repiten.
+    """
+    hechas = {}
+    if not os.path.exists(ruta):
+        return hechas
+    with open(ruta, "rb+") as f:
+        contenido = f.read()
+        fin = contenido.rfind(b"\n") + 1
+        if fin < len(contenido):
+            f.truncate(fin)
+    for linea in contenido[:fin].decode("utf-8").splitlines():
+        if linea.strip():
+            registro = json.loads(linea)
+            if "error" not in registro:
+                hechas[registro["id"]] = registro
+    return hechas
+
+def _correr_tarea(tarea):
+    """Ejecuta una corrida en un proceso del pool; los errores se reportan en la línea en vez de abortar el barrido."""
+    registro, cfg, segundos, cobertura_objetivo, hitos = tarea
+    try:
+        registro.update(ejecutar_corrida(cfg, segundos, cobertura_objetivo, hitos))
+    except Exception as e:
+        registro["error"] = f"{type(e).__name__}: {e}"
+    return registro
+
+def tareas_barrido(cfg_base, puntos, repeticiones, semilla_maestra, comunes, segundos, cobertura_objetivo, hitos):
+    """Una tarea por (punto, repetición), cada una con su copia de la configuración y sus semillas."""
+    tareas = []
+    for p, parametros in enumerate(puntos):
+        for r in range(repeticiones):
+            cfg = copy.copy(cfg_base)
+            vars(cfg).update(parametros)
+            semillas = semillas_corrida(cfg, semilla_maestra, p, r, comunes)
+            vars(cfg).update(semillas)
+            registro = {"id": f"p{p:05d}-r{r:03d}", "punto": p, "repeticion": r, "parametros": parametros}
+            tareas.append((registro, cfg, segundos, cobertura_objetivo, hitos))
+    return tareas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--diseno', choices=DISENOS, default=None, help="Por defecto 'grilla' con --grilla y 'lhs' con --rango")
+    parser.add_argument('--grilla', nargs='+', default=[], metavar='CLAVE=v1,v2,...', help="Valores de cada parámetro (diseño grilla)")
+    parser.add_argument('--rango', nargs='+', default=[], metavar='CLAVE=min:max', help="Rango de cada parámetro (diseños aleatorio y lhs)")
+    parser.add_argument('--muestras', type=int, default=20, help="Puntos de diseño para aleatorio y lhs")
+    parser.add_argument('--repeticiones', type=int, default=1, help="Corridas con semillas distintas por punto de diseño")
+    parser.add_argument('--semilla-maestra', type=int, default=12345)
+    parser.add_argument('--semillas-comunes', action='store_true', help="Mismas semillas para todos los puntos en cada repetición")
+    parser.add_argument('--set', dest='asignaciones', nargs='+', default=[], metavar='CLAVE=valor', help="Parámetros fijos para todo el barrido")
+    parser.add_argument('--segundos', type=float, default=60.0, help="Tiempo simulado máximo por corrida (s)")
+    parser.add_argument('--cobertura-objetivo', type=float, default=None, help="Detener cada corrida al alcanzar esta cobertura (%%)")
+    parser.add_argument('--hitos', type=float, nargs='+', default=list(HITOS_COBERTURA), help="Coberturas (%%) cuyo tiempo de llegada se reporta")
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos del pool (1: sin pool)")
+    parser.add_argument('--salida', required=True, help="Archivo JSONL de resultados (se reanuda si ya existe)")
+    parser.add_argument('--use-runtime-config', action='store_true', help="Partir de config_runtime.json (como main.py)")
+    args = parser.parse_args(argv)
+
+    diseno = args.diseno or ("grilla" if args.grilla else "lhs")
+    try:
+        if diseno == "grilla":
+            parametros = _parsear_parametros(args.grilla, ",")
+        else:
+            parametros = _parsear_parametros(args.rango, ":")
+        if not parametros:
+            raise ValueError("No hay parámetros para barrer: use --grilla (diseño grilla) o --rango (aleatorio / lhs).")
+        cfg_base = load_config_runtime() # Lee --use-runtime-config de sys.argv
+        desconocidas = [clave for clave in parametros if not hasattr(cfg_base, clave)]
+        if desconocidas:
+            raise ValueError(f"Parámetros de configuración desconocidos: {', '.join(desconocidas)}.")
+        aplicar_asignaciones(cfg_base, args.asignaciones)
+    except ValueError as e:
+        parser.error(str(e))
+    cfg_base.VERBOSE = False
+
+    rng_diseno = SplitMix64(derivar_semilla(args.semilla_maestra, FLUJO_DISENO))
+    if diseno == "grilla":
+        puntos = puntos_grilla(parametros)
+    elif diseno == "aleatorio":
+        puntos = puntos_aleatorios(parametros, args.muestras, rng_diseno)
+    else:
+        puntos = puntos_hipercubo_latino(parametros, args.muestras, rng_diseno)
+
+    tareas = tareas_barrido(cfg_base, puntos, args.repeticiones, args.semilla_maestra, args.semillas_comunes,
+                            args.segundos, args.cobertura_objetivo, args.hitos)
+    hechas = _corridas_hechas(args.salida)
+    for registro, *_ in tareas:
+        previo = hechas.get(registro["id"])
+        if previo is not None and previo["parametros"] != json.loads(json.dumps(registro["parametros"])):
+            parser.error(f"{args.salida} contiene la corrida {registro['id']} con otros parámetros; use otra salida.")
+    pendientes = [t for t in tareas if t[0]["id"] not in hechas]
+    print(f"Barrido '{diseno}': {len(puntos)} puntos x {args.repeticiones} repeticiones = {len(tareas)} corridas "
+          f"({len(tareas) - len(pendientes)} ya hechas, {len(pendientes)} pendientes, {args.procesos} procesos)",
+          file=sys.stderr)
+
+    t0 = time.perf_counter()
+    with open(args.salida, "a") as salida:
+        if args.procesos > 1 and len(pendientes) > 1:
+            pool = multiprocessing.Pool(min(args.procesos, len(pendientes)))
+            resultados = pool.imap_unordered(_correr_tarea, pendientes)
+        else:
+            pool = None
+            resultados = map(_correr_tarea, pendientes)
+        try:
+            for k, registro in enumerate(resultados, 1):
+                salida.write(json.dumps(registro) + "\n")
+                salida.flush() # Lo escrito sobrevive a una interrupción y se omite al reanudar
+                estado = registro.get("error") or f"cobertura {registro['coverage']:.1f}%"
+                print(f"[{k}/{len(pendientes)}] {registro['id']} {estado} ({time.perf_counter() - t0:.1f} s)", file=sys.stderr)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 # drone_simulation/cbf.py
 import numpy as np
 import random # Para el fallback de n_ij
+from .fuerzas import _sumar_por_indice
 # from . import config # YA NO IMPORTAMOS EL CONFIG GLOBAL AQUÍ
 
+# Máximo de candidatos (drones x candidatos por dron) generados a la vez por aplicar_cbf_qp
+MAX_CANDIDATOS_QP = 2_000_000
+# Candidatos por dron cuya factibilidad se comprueba en la primera ronda de _resolver_qp_2d (luego se duplica)
+CANDIDATOS_POR_BLOQUE_QP = 16
+# Candidatos revisados como máximo por dron; si ninguno es factible (dron rodeado) se toma el de menor violación
+MAX_CANDIDATOS_REVISADOS_QP = 1024
+
 cbf_activation_count = 0
 def reset_cbf_activation_count(): global cbf_activation_count; cbf_activation_count = 0
 def get_cbf_activation_count(): global cbf_activation_count; return cbf_activation_count
@@ -39,4 +47,244 @@ def aplicar_cbf_simplificada(dron_actual, entidad_proxima, d_min, es_obstaculo,
             if norma_vel > dron_actual.max_velocidad: # dron_actual.max_velocidad viene de su config_propia
                 dron_actual.velocidad = (dron_actual.velocidad / norma_vel) * dron_actual.max_velocidad
             return True
-    return False
\ No newline at end of file
+    return False
+
+def radio_activacion_cbf(d_min, gamma, v_rel_max):
+    """
+    Distancia centro-a-centro a partir de la cual la condición h_dot + gamma*h < 0 no puede cumplirse.
+    Con h = d^2 - d_min^2 y |h_dot| <= 2*d*v_rel_max, basta gamma*(d^2 - d_min^2) >= 2*d*v_rel_max.
+    Permite filtrar pares candidatos sin cambiar el resultado de aplicar_cbf_simplificada.
+    """
+    if gamma <= 0:
+        return float('inf')
+    return (v_rel_max + np.sqrt(v_rel_max**2 + gamma**2 * d_min**2)) / gamma
+
+def _restricciones_cbf(pos_dron, vel_dron, pos_entidad, vel_entidad, d_min, gamma, normal_distancia_cero):
+    """
+    Evalúa h = |p_e - p_i|^2 - d_min^2, h_dot = 2 (p_i - p_e) . (v_i - v_e) y la condición de la barrera
+    para un lote de restricciones (una por fila). Retorna (activa, n_ij, componente de v_i hacia la entidad).
+    Las restricciones a distancia cero usan normal_distancia_cero como dirección n_ij.
+    """
+    p_diff = pos_entidad - pos_dron
+    dist_sq = p_diff[:, 0]**2 + p_diff[:, 1]**2
+    dist = np.sqrt(dist_sq)
+    h = dist_sq - d_min**2
+    v_rel = vel_dron - vel_entidad
+    h_dot = 2 * ((-p_diff[:, 0]) * v_rel[:, 0] + (-p_diff[:, 1]) * v_rel[:, 1])
+    activa = h_dot + gamma * h < 0
+    n_ij = np.empty_like(p_diff)
+    lejos = dist > 0
+    n_ij[lejos] = p_diff[lejos] / dist[lejos, None]
+    n_ij[~lejos] = normal_distancia_cero[~lejos]
+    componente = vel_dron[:, 0] * n_ij[:, 0] + vel_dron[:, 1] * n_ij[:, 1]
+    return activa, n_ij, componente
+
+def aplicar_cbf_lote(posiciones, velocidades, activos, pares, obst_posiciones, pares_obstaculos, config_obj,
+                     activaciones_por_dron=False):
+    """
+    Versión por lotes de aplicar_cbf_simplificada para todo el enjambre.
+    - pares: pares candidatos (i, j) de drones; cada par da dos restricciones (i respecto de j y j respecto de i).
+    - pares_obstaculos: pares candidatos (dron, obstáculo) sobre obst_posiciones.
+    Retorna (nuevas velocidades (N, 2), número de activaciones de la barrera). Con activaciones_por_dron
+    las activaciones se retornan como arreglo (N,): las de las restricciones de cada dron.
+
+    Orden: todas las restricciones se evalúan con las velocidades de entrada y cada dron recibe el promedio
+    de sus correcciones (proyecciones simultáneas); luego la rapidez de los drones corregidos se limita a
+    MAX_VELOCIDAD una vez. En la versión secuencial cada corrección usa la velocidad ya corregida por las
+    anteriores (Gauss-Seidel), de modo que el resultado depende del orden de los drones; aquí no. Sumar las
+    correcciones sin promediar sobrecorrige en grupos densos (varias restricciones casi paralelas).
+    Ambas versiones coinciden cuando cada dron tiene a lo sumo una restricción activa.
+    Si dos centros coinciden, n_ij = (1, 0) para i y (-1, 0) para j (en lugar de una dirección aleatoria),
+    y (1, 0) frente a un obstáculo.
+    """
+    gamma = config_obj.CBF_GAMMA
+    factor = 1 + config_obj.CBF_FACTOR_CORRECCION_VELOCIDAD
+    n = len(posiciones)
+    correcciones = np.zeros((n, 2))
+    num_correcciones = np.zeros(n, dtype=np.int64)
+    activaciones = np.zeros(n, dtype=np.int64)
+
+    # Restricciones dron-dron: (i respecto de j) y (j respecto de i)
+    i, j = pares
+    mantener = activos[i] & activos[j]
+    i, j = i[mantener], j[mantener]
+    dron = np.concatenate([i, j])
+    entidad = np.concatenate([j, i])
+    normal_cero = np.zeros((len(dron), 2))
+    normal_cero[:len(i), 0], normal_cero[len(i):, 0] = 1.0, -1.0
+    activa, n_ij, componente = _restricciones_cbf(
+        posiciones[dron], velocidades[dron], posiciones[entidad], velocidades[entidad],
+        config_obj.CBF_D_MIN_DRON_DRON, gamma, normal_cero
+    )
+    activaciones += np.bincount(dron[activa], minlength=n)
+    corrige = activa & (componente > 0)
+    correcciones -= _sumar_por_indice(dron[corrige], n_ij[corrige] * (componente[corrige] * factor)[:, None], n)
+    num_correcciones += np.bincount(dron[corrige], minlength=n)
+
+    # Restricciones dron-obstáculo (el obstáculo está quieto)
+    if len(obst_posiciones) > 0:
+        io, ko = pares_obstaculos
+        mantener = activos[io]
+        io, ko = io[mantener], ko[mantener]
+        normal_cero = np.zeros((len(io), 2))
+        normal_cero[:, 0] = 1.0
+        activa, n_ij, componente = _restricciones_cbf(
+            posiciones[io], velocidades[io], obst_posiciones[ko], np.zeros((len(io), 2)),
+            config_obj.CBF_D_MIN_DRON_OBSTACULO, gamma, normal_cero
+        )
+        activaciones += np.bincount(io[activa], minlength=n)
+        corrige = activa & (componente > 0)
+        correcciones -= _sumar_por_indice(io[corrige], n_ij[corrige] * (componente[corrige] * factor)[:, None], n)
+        num_correcciones += np.bincount(io[corrige], minlength=n)
+
+    # Promedio de las correcciones de cada dron (proyecciones simultáneas, método de Cimmino)
+    corregido = num_correcciones > 0
+    nuevas = velocidades.copy()
+    nuevas[corregido] += correcciones[corregido] / num_correcciones[corregido, None]
+    norma = np.sqrt(nuevas[:, 0]**2 + nuevas[:, 1]**2)
+    excede = corregido & (norma > config_obj.MAX_VELOCIDAD)
+    nuevas[excede] = (nuevas[excede] / norma[excede, None]) * config_obj.MAX_VELOCIDAD
+    return nuevas, activaciones if activaciones_por_dron else int(activaciones.sum())
+
+def _restricciones_lineales(posiciones, velocidades, dron, pos_entidad, vel_entidad, d_min, gamma, normal_distancia_cero):
+    """
+    Escribe la condición h_dot + gamma*h >= 0 de cada restricción como a . v_i >= b, lineal en la velocidad del dron
+    (la entidad conserva su velocidad nominal): a = p_i - p_e, b = a . v_e - gamma*h/2.
+    Si los centros coinciden, a = normal_distancia_cero y b = a . v_e (no acercarse más).
+    """
+    a = posiciones[dron] - pos_entidad
+    dist_sq = a[:, 0]**2 + a[:, 1]**2
+    h = dist_sq - d_min**2
+    b = a[:, 0] * vel_entidad[:, 0] + a[:, 1] * vel_entidad[:, 1] - 0.5 * gamma * h
+    cero = dist_sq == 0
+    a[cero] = normal_distancia_cero[cero]
+    b[cero] = a[cero, 0] * vel_entidad[cero, 0] + a[cero, 1] * vel_entidad[cero, 1]
+    return a, b
+
+def _resolver_qp_2d(v_nominal, A, B):
+    """
+    Resuelve para cada fila d: min |v - v_nominal[d]|^2 sujeto a A[d, k] . v >= B[d, k] (v en el plano).
+    En 2D el óptimo es la nominal, la proyección sobre una restricción o un vértice entre dos, así que se evalúan
+    todos esos candidatos (conjuntos activos de tamaño 1 y 2) y se toma el factible más cercano a la nominal.
+    Si entre los MAX_CANDIDATOS_REVISADOS_QP más cercanos no hay uno factible (en la práctica, un dron rodeado
+    cuyo problema es infactible) se toma el revisado con la menor violación máxima.
+    Las filas de relleno de A son cero con B = -inf.
+    """
+    D, M = B.shape
+    norma_sq = A[:, :, 0]**2 + A[:, :, 1]**2
+    norma = np.sqrt(np.where(norma_sq > 0, norma_sq, 1.0))
+    # Proyección de la nominal sobre cada restricción (no cambia si ya la cumple)
+    exceso = np.maximum(0.0, B - (A[:, :, 0] * v_nominal[:, None, 0] + A[:, :, 1] * v_nominal[:, None, 1])) / norma**2
+    candidatos = [v_nominal[:, None, :] + exceso[:, :, None] * A]
+    # Vértices: intersección de las rectas de cada par de restricciones (k, l)
+    if M > 1:
+        with np.errstate(invalid='ignore'): # Los pares con relleno (B = -inf) se descartan con 'validos'
+            k, l = np.triu_indices(M, 1)
+            a1, a2, b1, b2 = A[:, k], A[:, l], B[:, k], B[:, l]
+            det = a1[:, :, 0] * a2[:, :, 1] - a1[:, :, 1] * a2[:, :, 0]
+            validos = (np.abs(det) > 1e-12 * norma[:, k] * norma[:, l]) & np.isfinite(b1) & np.isfinite(b2)
+            det = np.where(validos, det, 1.0)
+            vertices = np.stack([(b1 * a2[:, :, 1] - b2 * a1[:, :, 1]) / det,
+                                 (a1[:, :, 0] * b2 - a2[:, :, 0] * b1) / det], axis=2)
+            vertices[~validos] = np.nan
+        candidatos.append(vertices)
+    candidatos = np.concatenate(candidatos, axis=1) # (D, C, 2)
+    distancia = np.nan_to_num(((candidatos - v_nominal[:, None, :])**2).sum(axis=2), nan=np.inf)
+
+    # Se revisan los candidatos de menor a mayor distancia; el primero factible es el óptimo.
+    # Casi siempre está entre los primeros, así que la factibilidad se evalúa por bloques de candidatos.
+    orden = np.argsort(distancia, axis=1, kind='stable') # Empates: orden de generación de los candidatos
+    elegido = np.full(D, -1)
+    menor_violacion = np.full(D, np.inf)
+    candidato_menor_violacion = orden[:, 0].copy()
+    ini, bloque = 0, CANDIDATOS_POR_BLOQUE_QP
+    while ini < min(candidatos.shape[1], MAX_CANDIDATOS_REVISADOS_QP):
+        pendientes = np.flatnonzero(elegido < 0)
+        if len(pendientes) == 0:
+            break
+        idx = orden[pendientes, ini:ini + bloque] # (P, b)
+        ini, bloque = ini + bloque, 2 * bloque # Bloques crecientes: los problemas difíciles se terminan en pocas rondas
+        cand = candidatos[pendientes[:, None], idx] # (P, b, 2)
+        A_p, B_p, norma_p = A[pendientes], B[pendientes], norma[pendientes]
+        with np.errstate(invalid='ignore'):
+            # Violación de cada restricción en cada candidato, en unidades de velocidad (las de relleno dan -inf)
+            violacion = ((B_p[:, None, :] - (cand[:, :, None, 0] * A_p[:, None, :, 0] + cand[:, :, None, 1] * A_p[:, None, :, 1]))
+                         / norma_p[:, None, :]).max(axis=2)
+        violacion = np.nan_to_num(violacion, nan=np.inf)
+        factible = (violacion <= 1e-9 * (1.0 + np.abs(cand).max(axis=2))) & np.isfinite(distancia[pendientes[:, None], idx])
+        encontrado = factible.any(axis=1)
+        elegido[pendientes[encontrado]] = idx[encontrado, np.argmax(factible[encontrado], axis=1)]
+        # Respaldo para problemas infactibles: el candidato con la menor violación máxima
+        filas = np.arange(len(pendientes))
+        local = np.argmin(violacion, axis=1)
+        mejora = violacion[filas, local] < menor_violacion[pendientes]
+        menor_violacion[pendientes[mejora]] = violacion[filas, local][mejora]
+        candidato_menor_violacion[pendientes[mejora]] = idx[filas, local][mejora]
+    elegido = np.where(elegido >= 0, elegido, candidato_menor_violacion)
+    return candidatos[np.arange(D), elegido]
+
+def aplicar_cbf_qp(posiciones, velocidades, activos, pares, obst_posiciones, pares_obstaculos, config_obj,
+                   activaciones_por_dron=False):
+    """
+    Filtro CBF como programa cuadrático por dron: la velocidad más cercana a la nominal que cumple a la vez
+    todas las restricciones de barrera de sus drones y obstáculos candidatos,
+        min |v - v_nominal|^2  sujeto a  a_k . v >= b_k,
+    con los demás drones en su velocidad nominal. Se resuelve de forma exacta por conjuntos activos
+    (ver _resolver_qp_2d), vectorizado sobre los drones. Solo se resuelven los drones con alguna
+    restricción violada en la velocidad nominal (para los demás la nominal ya es óptima).
+    El resultado no depende del orden de los drones; luego se limita la rapidez a MAX_VELOCIDAD.
+    Retorna (nuevas velocidades (N, 2), número de restricciones violadas en la velocidad nominal);
+    con activaciones_por_dron, un arreglo (N,) con las restricciones violadas de cada dron.
+    """
+    gamma = config_obj.CBF_GAMMA
+    n = len(posiciones)
+    nuevas = velocidades.copy()
+
+    # Restricciones dirigidas (dron, a, b): dos por par de drones y una por par dron-obstáculo
+    i, j = pares
+    mantener = activos[i] & activos[j]
+    i, j = i[mantener], j[mantener]
+    dron = np.concatenate([i, j])
+    entidad = np.concatenate([j, i])
+    normal_cero = np.zeros((len(dron), 2))
+    normal_cero[:len(i), 0], normal_cero[len(i):, 0] = -1.0, 1.0 # a apunta de la entidad al dron
+    a, b = _restricciones_lineales(posiciones, velocidades, dron, posiciones[entidad], velocidades[entidad],
+                                   config_obj.CBF_D_MIN_DRON_DRON, gamma, normal_cero)
+    if len(obst_posiciones) > 0:
+        io, ko = pares_obstaculos
+        io, ko = io[activos[io]], ko[activos[io]]
+        normal_cero = np.zeros((len(io), 2))
+        normal_cero[:, 0] = -1.0
+        a_obs, b_obs = _restricciones_lineales(posiciones, velocidades, io, obst_posiciones[ko], np.zeros((len(io), 2)),
+                                               config_obj.CBF_D_MIN_DRON_OBSTACULO, gamma, normal_cero)
+        dron, a, b = np.concatenate([dron, io]), np.concatenate([a, a_obs]), np.concatenate([b, b_obs])
+
+    violada = a[:, 0] * velocidades[dron, 0] + a[:, 1] * velocidades[dron, 1] < b
+    activaciones = np.bincount(dron[violada], minlength=n) if activaciones_por_dron else int(violada.sum())
+    if not violada.any():
+        return nuevas, activaciones
+
+    # Restricciones de los drones a corregir, agrupadas por dron en una matriz con relleno (D, M)
+    a_corregir = np.unique(dron[violada])
+    incluir = np.isin(dron, a_corregir)
+    dron, a, b = dron[incluir], a[incluir], b[incluir]
+    orden = np.argsort(dron, kind='stable')
+    dron, a, b = dron[orden], a[orden], b[orden]
+    fila = np.searchsorted(a_corregir, dron)
+    inicio = np.searchsorted(dron, a_corregir)
+    columna = np.arange(len(dron)) - inicio[fila]
+    D, M = len(a_corregir), int(columna.max()) + 1
+    A = np.zeros((D, M, 2))
+    B = np.full((D, M), -np.inf) # Las posiciones de relleno nunca se activan
+    A[fila, columna], B[fila, columna] = a, b
+    # Lotes de drones para acotar la memoria de los candidatos (M + M(M-1)/2 por dron)
+    v = np.empty((D, 2))
+    tam_lote = max(1, MAX_CANDIDATOS_QP // (M * (M + 1) // 2))
+    for ini in range(0, D, tam_lote):
+        v[ini:ini + tam_lote] = _resolver_qp_2d(velocidades[a_corregir[ini:ini + tam_lote]], A[ini:ini + tam_lote], B[ini:ini + tam_lote])
+
+    norma = np.sqrt(v[:, 0]**2 + v[:, 1]**2)
+    excede = norma > config_obj.MAX_VELOCIDAD
+    v[excede] = (v[excede] / norma[excede, None]) * config_obj.MAX_VELOCIDAD
+    nuevas[a_corregir] = v
+    return nuevas, activaciones
@@ -1,5 +1,3 @@
-import pygame
-
 # Dimensiones de la pantalla de Pygame
 ANCHO_PANTALLA = 800
 ALTO_PANTALLA = 650
@@ -59,6 +57,7 @@ GCL_INCREMENT_C = 1013904223
 GCL_MODULUS_M = 2**32
 MIDDLE_SQUARE_SEED_DRONES = 6453215
 N_DIGITS_MIDDLE_SQUARE = 8
+MIDDLE_SQUARE_CICLO_MINIMO = 1000 # Si rng_drones cae en un ciclo más corto, el motor lo advierte al entrar en él
 GCL_SEED_OBSTACULOS_DYN = 7485316
 GCL_MULTIPLIER_A_OBS = 1103515245
 GCL_INCREMENT_C_OBS = 12345
@@ -68,13 +67,25 @@ GCL_MODULUS_M_OBS = 2**31
 COLOR_CELDA_NO_CUBIERTA = (45, 134, 64, 53)
 COLOR_CELDA_CUBIERTA = (29, 177, 61, 69)
 COLOR_DRON_INACTIVO = (100, 100, 100)
-TECLA_PAUSA_REANUDAR = pygame.K_SPACE
-TECLA_RESETEAR = pygame.K_r
-TECLA_ANADIR_DRON = pygame.K_a
-TECLA_QUITAR_DRON = pygame.K_q
+CAPACIDAD_CACHE_SPRITES = 4096 # Sprites pre-renderizados (círculos por radio y color, etiquetas de ID) que guarda la interfaz (LRU)
+MAX_DRONES_CON_ETIQUETA = 300 # Nivel de detalle: con más drones activos no se dibujan las etiquetas de ID
+FISICA_EN_HILO = True # La interfaz avanza el motor en un hilo propio (hilo_fisica.HiloFisica) y dibuja instantáneas interpoladas
+PERIODO_INSTANTANEAS = 1 / 120 # Intervalo mínimo (s de reloj) entre instantáneas mientras el hilo de física corre para alcanzar el ritmo
+MAX_ATRASO_FISICA = 0.25 # Atraso máximo (s de reloj) que el hilo de física intenta recuperar; el resto se descarta
+MEMORIA_COMPARTIDA = "" # Nombre del bloque de memoria compartida donde la interfaz publica el estado cada paso ("" = no publicar)
+MEMORIA_COMPARTIDA_CAPACIDAD = 4096 # Drones que caben en cada frame de la memoria compartida
+MEMORIA_COMPARTIDA_FRAMES = 4 # Frames del anillo: un frame leído sigue vigente los FRAMES - 1 pasos siguientes
+ARCHIVO_TRAYECTORIA = "" # Archivo donde la interfaz graba cada paso (trayectoria.GrabadorTrayectoria; "" = no grabar)
+PASOS_POR_BLOQUE_TRAYECTORIA = 1024 # Pasos por bloque del archivo de trayectoria (cada bloque lleva la grilla completa)
+VELOCIDADES_SIMULACION = (0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 10.0, 20.0, 50.0, 100.0) # Multiplicadores que recorren las teclas +/-
+# Teclas como códigos enteros de pygame (config no importa pygame, para poder correr sin ventana)
+TECLA_PAUSA_REANUDAR = 32 # pygame.K_SPACE
+TECLA_RESETEAR = 114 # pygame.K_r
+TECLA_ANADIR_DRON = 97 # pygame.K_a
+TECLA_QUITAR_DRON = 113 # pygame.K_q
 RNG_TEST_NUM_SAMPLES = 10000
 RNG_TEST_NUM_BINS_CHI2 = 10
-TECLA_EJECUTAR_RNG_TESTS = pygame.K_t
+TECLA_EJECUTAR_RNG_TESTS = 116 # pygame.K_t
 VERBOSE = True
 
 # ==============================================================================
@@ -85,6 +96,14 @@ VERBOSE = True
 NUM_DRONES_INICIAL = 15   
 FPS = 60.0 
 DELTA_T = 1 / FPS
+BACKEND_FUERZAS = "vectorizado" # "vectorizado" (todo el enjambre con NumPy) o "referencia" (Drone.calcular_fuerzas por dron)
+INDICE_ESPACIAL = "auto" # "grilla" (celdas uniformes, ~O(N)), "fuerza_bruta" (todos los pares, O(N^2)) o "auto"
+MIN_DRONES_GRILLA_ESPACIAL = 200 # Con "auto", a partir de este número de drones se usa la grilla (ver benchmarks/bench_vecindad.py)
+INTEGRADOR = "rk4_enjambre" # "rk4_enjambre", "rk4_por_dron" (_rk4_step por dron), "euler_simplectico", "verlet" o "rk45" (adaptativo)
+RK4_ACOPLADO = False # Si es True, las fuerzas se recalculan en cada etapa del RK4 (más preciso, ~4 evaluaciones de fuerza por paso)
+RK45_TOL_ABS = 1e-3 # Tolerancia absoluta del error por subpaso con INTEGRADOR "rk45" (px y px/s)
+RK45_TOL_REL = 1e-4 # Tolerancia relativa del error por subpaso con INTEGRADOR "rk45"
+RK45_SUBPASO_MIN = 1e-3 # Menor subpaso de "rk45", como fracción de DELTA_T (se acepta aunque exceda la tolerancia)
 
 # Comportamiento del Enjambre
 K_COHESION = 1.0           
@@ -105,6 +124,8 @@ GENERAR_NUEVOS_OBSTACULOS_INTERVALO = 30.0
 CBF_ACTIVADO = True         
 CBF_D_MIN_DRON_DRON = 25.0
 CBF_FACTOR_CORRECCION_VELOCIDAD = 0.2
+CBF_MODO = "secuencial" # "secuencial" (aplicar_cbf_simplificada par por par), "lote" (aplicar_cbf_lote) o "qp" (aplicar_cbf_qp)
 
 # Cobertura
-TAMANO_CELDA_COBERTURA = 50
\ No newline at end of file
+TAMANO_CELDA_COBERTURA = 50
+RADIO_FOOTPRINT_COBERTURA = 0.0 # Radio (px) del área que cubre cada dron: celdas con centro a esta distancia o menos. 0 = solo la celda del dron
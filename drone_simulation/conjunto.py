@@ -0,0 +1,290 @@
+# drone_simulation/conjunto.py
+import numpy as np
+from .engine import SimulationEngine, EstadisticasIntegracion, IntegradorRK45, celdas_huella
+from .swarm_state import SwarmState
+from .frontera import CampoFrontera
+from .vecindad import GrillaEspacial, HOLGURA_CANDIDATOS, _expandir_rangos
+from .cbf import aplicar_cbf_lote, aplicar_cbf_qp, radio_activacion_cbf
+
+class _IndiceObstaculosConjunto:
+    """
+    Obstáculos de todos los mundos de un MotorConjunto en arreglos planos (los de cada mundo uno tras otro,
+    en el orden de su lista), con la misma consulta de pares que IndiceObstaculos: cada dron solo forma pares
+    con los obstáculos de su mundo. Con pocos obstáculos por mundo se revisan todos los del mundo de cada dron.
+    """
+    def __init__(self, mundos, mundo_de_dron):
+        self.mundos = mundos
+        self.mundo_de_dron = mundo_de_dron
+        self.refrescar()
+
+    def refrescar(self):
+        """Vuelve a reunir los obstáculos de los mundos (tras actualizarlos o crear obstáculos nuevos)."""
+        indices = [m.indice_obstaculos for m in self.mundos]
+        self.cuentas = np.array([len(ind.radios) for ind in indices], dtype=np.int64)
+        self.inicio = np.concatenate([[0], np.cumsum(self.cuentas)]) # Obstáculos del mundo w: [inicio[w], inicio[w + 1])
+        self.posiciones = np.concatenate([ind.posiciones for ind in indices]).reshape(-1, 2)
+        self.radios = np.concatenate([ind.radios for ind in indices])
+        self.activos = np.concatenate([ind.activos for ind in indices])
+        self.dinamicos = np.concatenate([ind.dinamicos for ind in indices])
+
+    def pares(self, puntos, activos_puntos, radio, sumar_radio_obstaculo=True):
+        """
+        Pares candidatos (p, k) de puntos activos y obstáculos activos del mismo mundo, con distancia entre centros
+        < radio (+ radio del obstáculo k si sumar_radio_obstaculo), ordenados por (p, k). Mismo criterio que
+        IndiceObstaculos.pares (incluido que con radio <= 0 solo se consultan los dinámicos).
+        """
+        idx_puntos = np.flatnonzero(activos_puntos)
+        w = self.mundo_de_dron[idx_puntos]
+        p, k = _expandir_rangos(self.inicio[w], self.cuentas[w]) # Todos los obstáculos del mundo de cada punto, en orden
+        consultar = self.activos[k] if radio > 0 else self.activos[k] & self.dinamicos[k]
+        p, k = p[consultar], k[consultar]
+        dif = self.posiciones[k] - puntos[idx_puntos[p]]
+        limite = radio + (self.radios[k] if sumar_radio_obstaculo else 0.0)
+        cerca = (dif[:, 0]**2 + dif[:, 1]**2) < (limite * (1.0 + HOLGURA_CANDIDATOS))**2
+        return idx_puntos[p[cerca]], k[cerca]
+
+
+class MotorConjunto(SimulationEngine):
+    """
+    K mundos independientes (misma configuración, RNG propios) avanzados a la vez sobre un único estado.
+    Cada mundo es un SimulationEngine creado como en una corrida individual (mismos drones y obstáculos iniciales)
+    cuyas filas de SwarmState pasan a ser vistas del estado plano del conjunto (mundo w: filas
+    [inicio_mundo[w], inicio_mundo[w + 1])). Fuerzas, CBF por lotes, integración, colisiones y cobertura se
+    calculan para todos los mundos con las mismas operaciones vectorizadas del motor; los pares de vecinos y de
+    obstáculos solo se forman dentro de cada mundo. Cada mundo conserva su grilla de cobertura (una capa de
+    'grillas'), sus obstáculos y sus RNG, que se consumen en el mismo orden que en la corrida individual;
+    las métricas (coverage, critical_collisions, cbf_activaciones_total, time) quedan en cada mundo. El conjunto
+    expone sus agregados con los mismos nombres (coverage sobre todas las celdas, sumas de celdas_cubiertas y
+    critical_collisions, obstaculos de todos los mundos); no tiene 'grilla': la de cada mundo es mundos[w].grilla.
+
+    El resultado de cada mundo coincide con el de correrlo solo. Con CBF_MODO "qp" puede diferir únicamente en
+    drones cuyo problema es infactible (respaldo de menor violación, ver _resolver_qp_2d). No admite el integrador
+    "rk45" (su subpaso es común a todo el estado) ni BACKEND_FUERZAS "referencia", y el número de drones es fijo.
+    """
+    def __init__(self, config, lista_rngs):
+        self.config = config
+        self.lista_rngs = [tuple(rngs) for rngs in lista_rngs] # (entorno, drones, obstáculos) de cada mundo
+        self._init_state()
+
+    def _init_state(self):
+        """Crea los mundos y reúne su estado en los arreglos del conjunto."""
+        self.mundos = [SimulationEngine(self.config, rngs) for rngs in self.lista_rngs]
+        tamanos = np.array([m.estado.n for m in self.mundos], dtype=np.int64)
+        self.inicio_mundo = np.concatenate([[0], np.cumsum(tamanos)])
+        self.mundo_de_dron = np.repeat(np.arange(len(self.mundos)), tamanos)
+        self.estado = SwarmState(capacidad=int(tamanos.sum()))
+        for w, mundo in enumerate(self.mundos):
+            mundo.estado.trasladar_a(self.estado, int(self.inicio_mundo[w]))
+        self.drones = [dr for mundo in self.mundos for dr in mundo.drones]
+
+        # Grillas de cobertura (K, nx, ny); la de cada mundo es una vista de su capa
+        self.grillas = np.stack([m.grilla for m in self.mundos])
+        for w, mundo in enumerate(self.mundos):
+            mundo.grilla = self.grillas[w]
+            mundo.campo_frontera = CampoFrontera(
+                mundo.grilla, self.config.TAMANO_CELDA_COBERTURA, self.config.RADIO_BUSQUEDA_FRONTERA_DRONE
+            )
+        self.campo_frontera = CampoFrontera(
+            self.grillas, self.config.TAMANO_CELDA_COBERTURA, self.config.RADIO_BUSQUEDA_FRONTERA_DRONE,
+            mundos=self.mundo_de_dron
+        )
+        self.rng_drones = [m.rng_drones for m in self.mundos] # El CampoFrontera elige el RNG del mundo de cada dron
+        self.indice_obstaculos = _IndiceObstaculosConjunto(self.mundos, self.mundo_de_dron)
+
+        self._indice_vecinos = None
+        self._pares_mismo_mundo = None # Todos los pares (i, j) de cada mundo, para INDICE_ESPACIAL "fuerza_bruta"
+        self._puntos_frontera = None
+        self.integrador = None
+        self.estadisticas_integracion = EstadisticasIntegracion()
+        self.estadisticas_integracion_total = EstadisticasIntegracion()
+        self.time = 0.0
+        self.cbf_activaciones_paso = 0 # Suma de todos los mundos
+        self.cbf_activaciones_total = 0
+
+    def _spawn_drones(self, count):
+        raise RuntimeError("MotorConjunto tiene un número fijo de drones por mundo.")
+
+    def _remove_last_drone(self):
+        raise RuntimeError("MotorConjunto tiene un número fijo de drones por mundo.")
+
+    # Métricas agregadas de todos los mundos (las de cada mundo están en mundos[w]), con los nombres del motor
+    @property
+    def obstaculos(self):
+        """Obstáculos de todos los mundos, los de cada mundo uno tras otro (como drones)."""
+        return [obs for mundo in self.mundos for obs in mundo.obstaculos]
+
+    @property
+    def total_celdas(self):
+        return sum(mundo.total_celdas for mundo in self.mundos)
+
+    @property
+    def celdas_cubiertas(self):
+        return sum(mundo.celdas_cubiertas for mundo in self.mundos)
+
+    @property
+    def coverage(self):
+        """Porcentaje de cobertura sobre las celdas de todos los mundos (la media de los mundos: son del mismo tamaño)."""
+        return (self.celdas_cubiertas / self.total_celdas) * 100 if self.total_celdas > 0 else 0
+
+    @property
+    def critical_collisions(self):
+        return sum(mundo.critical_collisions for mundo in self.mundos)
+
+    def paso(self):
+        """Avanza todos los mundos un paso DELTA_T (la misma secuencia que SimulationEngine.paso en cada mundo)."""
+        if self.config.BACKEND_FUERZAS != "vectorizado":
+            raise ValueError("MotorConjunto requiere BACKEND_FUERZAS = 'vectorizado'.")
+        for mundo in self.mundos:
+            mundo.time += self.config.DELTA_T
+            mundo.cbf_activaciones_paso = 0
+        super().paso()
+
+    def _revisar_ciclo_rng_drones(self):
+        for mundo in self.mundos:
+            mundo._revisar_ciclo_rng_drones()
+
+    def _integrador(self):
+        if self.config.INTEGRADOR == IntegradorRK45.nombre:
+            raise ValueError("El integrador 'rk45' no está disponible en MotorConjunto: su subpaso adaptativo es común "
+                             "a todo el estado y acoplaría los mundos.")
+        return super()._integrador()
+
+    def _actualizar_obstaculos(self, dt):
+        for mundo in self.mundos: # Cada mundo con su RNG de obstáculos y de entorno
+            mundo._actualizar_obstaculos(dt)
+        self.indice_obstaculos.refrescar()
+
+    def _pares_drones(self, radio, posiciones=None, tamano_celda=None):
+        """Como SimulationEngine._pares_drones, pero solo entre drones del mismo mundo (índices del estado del conjunto)."""
+        activos = self.estado.activos
+        modo = self.config.INDICE_ESPACIAL
+        if modo == "auto":
+            # Misma elección que el motor de cada mundo (todos los mundos tienen el mismo número de drones)
+            modo = "grilla" if np.diff(self.inicio_mundo).max(initial=0) >= self.config.MIN_DRONES_GRILLA_ESPACIAL else "fuerza_bruta"
+        if modo == "grilla":
+            if posiciones is not None or tamano_celda is not None:
+                indice = GrillaEspacial(tamano_celda or self.config.SENSOR_RANGE_DRONE)
+                indice.construir(self.estado.posiciones if posiciones is None else posiciones, self.mundo_de_dron)
+            else:
+                if self._indice_vecinos is None:
+                    self._indice_vecinos = GrillaEspacial(self.config.SENSOR_RANGE_DRONE)
+                    self._indice_vecinos.construir(self.estado.posiciones, self.mundo_de_dron)
+                indice = self._indice_vecinos
+            i, j = indice.pares(radio)
+            mantener = activos[i] & activos[j]
+            return i[mantener], j[mantener]
+        elif modo == "fuerza_bruta":
+            # Mismo criterio que pares_en_rango_bruto, sobre todos los pares de cada mundo
+            if self._pares_mismo_mundo is None:
+                pares = [np.triu_indices(int(fin - ini), 1) for ini, fin in zip(self.inicio_mundo[:-1], self.inicio_mundo[1:])]
+                self._pares_mismo_mundo = (
+                    np.concatenate([i + ini for (i, _), ini in zip(pares, self.inicio_mundo)]).astype(np.intp),
+                    np.concatenate([j + ini for (_, j), ini in zip(pares, self.inicio_mundo)]).astype(np.intp),
+                )
+            i, j = self._pares_mismo_mundo
+            mantener = activos[i] & activos[j]
+            i, j = i[mantener], j[mantener]
+            pos = self.estado.posiciones if posiciones is None else posiciones
+            dif = pos[j] - pos[i]
+            cerca = (dif[:, 0]**2 + dif[:, 1]**2) < (radio * (1.0 + HOLGURA_CANDIDATOS))**2
+            return i[cerca], j[cerca]
+        raise ValueError(f"INDICE_ESPACIAL desconocido: '{self.config.INDICE_ESPACIAL}'. Use 'grilla', 'fuerza_bruta' o 'auto'.")
+
+    def _radios_candidatos_cbf(self, d_min, factor_velocidad_relativa):
+        """
+        SimulationEngine._radio_candidatos_cbf de cada mundo (con la rapidez máxima de sus drones activos).
+        Se calcula mundo por mundo con escalares, con el mismo redondeo que en la corrida individual.
+        """
+        activos = self.estado.activos
+        vel = self.estado.velocidades[activos]
+        rapidez_max = np.zeros(len(self.mundos))
+        np.maximum.at(rapidez_max, self.mundo_de_dron[activos], np.sqrt((vel**2).sum(axis=1)))
+        radios = []
+        for rapidez in rapidez_max.tolist():
+            if self.config.CBF_FACTOR_CORRECCION_VELOCIDAD > 1:
+                rapidez = max(rapidez, self.config.MAX_VELOCIDAD)
+            radios.append(radio_activacion_cbf(d_min, self.config.CBF_GAMMA, factor_velocidad_relativa * rapidez))
+        return radios
+
+    def _recortar_pares(self, pares, posiciones_entidad, radios):
+        """Deja los pares (dron, entidad) a distancia < radio del mundo del dron, con el criterio de los índices de vecindad."""
+        i, j = pares
+        radio_sq = np.array([(radio * (1.0 + HOLGURA_CANDIDATOS))**2 for radio in radios])
+        dif = posiciones_entidad[j] - self.estado.posiciones[i]
+        cerca = (dif[:, 0]**2 + dif[:, 1]**2) < radio_sq[self.mundo_de_dron[i]]
+        return i[cerca], j[cerca]
+
+    def _aplicar_cbf(self):
+        """
+        CBF de todos los mundos. Los pares candidatos se buscan con el mayor radio de los mundos y luego se recortan al
+        radio de cada mundo, para usar exactamente los candidatos de la corrida individual. Las activaciones se
+        registran por mundo; retorna la suma.
+        """
+        cfg = self.config
+        posiciones = self.estado.posiciones
+        radios_dd = self._radios_candidatos_cbf(cfg.CBF_D_MIN_DRON_DRON, 2.0)
+        radios_do = self._radios_candidatos_cbf(cfg.CBF_D_MIN_DRON_OBSTACULO, 1.0)
+        pares_cbf = self._recortar_pares(self._pares_drones(max(radios_dd)), posiciones, radios_dd)
+        pares_obs = self._recortar_pares(
+            self._pares_obstaculos(max(radios_do), sumar_radio_obstaculo=False), self.indice_obstaculos.posiciones, radios_do
+        )
+
+        if cfg.CBF_MODO in ("lote", "qp"):
+            filtro = aplicar_cbf_lote if cfg.CBF_MODO == "lote" else aplicar_cbf_qp
+            self.estado.velocidades[:], por_dron = filtro(
+                posiciones, self.estado.velocidades, self.estado.activos,
+                pares_cbf, self.indice_obstaculos.posiciones, pares_obs, cfg, activaciones_por_dron=True
+            )
+            por_mundo = np.bincount(self.mundo_de_dron, weights=por_dron, minlength=len(self.mundos)).astype(np.int64)
+        elif cfg.CBF_MODO == "secuencial":
+            # Par por par dentro de cada mundo, con los índices locales del mundo
+            por_mundo = np.zeros(len(self.mundos), dtype=np.int64)
+            corte_pares = np.searchsorted(pares_cbf[0], self.inicio_mundo)
+            corte_obs = np.searchsorted(pares_obs[0], self.inicio_mundo)
+            for w, mundo in enumerate(self.mundos):
+                a, b = corte_pares[w], corte_pares[w + 1]
+                c, d = corte_obs[w], corte_obs[w + 1]
+                if a == b and c == d:
+                    continue # Sin candidatos el bucle del mundo no modifica nada
+                ini, ini_obs = self.inicio_mundo[w], self.indice_obstaculos.inicio[w]
+                por_mundo[w] = mundo._aplicar_cbf_secuencial(
+                    (pares_cbf[0][a:b] - ini, pares_cbf[1][a:b] - ini), (pares_obs[0][c:d] - ini, pares_obs[1][c:d] - ini_obs)
+                )
+        else:
+            raise ValueError(f"CBF_MODO desconocido: '{cfg.CBF_MODO}'. Use 'secuencial', 'lote' o 'qp'.")
+
+        for w in np.flatnonzero(por_mundo):
+            mundo = self.mundos[w]
+            mundo.cbf_activaciones_paso = int(por_mundo[w])
+            mundo.cbf_activaciones_total += mundo.cbf_activaciones_paso
+        return int(por_mundo.sum())
+
+    def _detect_collisions(self):
+        """Colisiones de todos los mundos en bloque; cada mundo resuelve las suyas con su RNG de drones, en orden."""
+        drones_obstaculo, pares_i, pares_j = self._buscar_colisiones()
+        mundo_obs, mundo_par = self.mundo_de_dron[drones_obstaculo], self.mundo_de_dron[pares_i]
+        for w in np.union1d(mundo_obs, mundo_par):
+            ini = self.inicio_mundo[w]
+            en_obs, en_par = mundo_obs == w, mundo_par == w
+            self.mundos[w]._resolver_colisiones(drones_obstaculo[en_obs] - ini, pares_i[en_par] - ini, pares_j[en_par] - ini)
+
+    def _update_coverage(self):
+        """Como SimulationEngine._update_coverage, marcando las celdas de todos los mundos en una sola pasada."""
+        num_mundos, nx_grilla, ny_grilla = self.grillas.shape
+        activos = self.estado.activos
+        ix, iy, origen = celdas_huella(self.estado.posiciones[activos], self.config.TAMANO_CELDA_COBERTURA,
+                                       self.config.RADIO_FOOTPRINT_COBERTURA, nx_grilla, ny_grilla)
+        celdas_por_mundo = nx_grilla * ny_grilla
+        planos = self.mundo_de_dron[activos][origen] * celdas_por_mundo + ix * ny_grilla + iy
+        grilla_plana = self.grillas.reshape(-1) # Vista de todas las grillas (contiguas)
+        nuevas = np.unique(planos[grilla_plana[planos] == 0])
+        grilla_plana[nuevas] = 1
+        mundo_nuevas = nuevas // celdas_por_mundo
+        corte = np.searchsorted(mundo_nuevas, np.arange(num_mundos + 1))
+        for w, mundo in enumerate(self.mundos):
+            mundo.celdas_nuevas = nuevas[corte[w]:corte[w + 1]] - w * celdas_por_mundo # Índices planos de la grilla del mundo
+            if len(mundo.celdas_nuevas):
+                mundo.celdas_cubiertas += len(mundo.celdas_nuevas)
+                mundo.coverage = (mundo.celdas_cubiertas / mundo.total_celdas) * 100 if mundo.total_celdas > 0 else 0
+        if len(nuevas):
+            self.campo_frontera.marcar_cubiertas(nuevas)
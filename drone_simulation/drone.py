@@ -1,26 +1,32 @@
 # drone_simulation/drone.py
-import pygame
 import numpy as np
 import random # Usado para velocidad inicial por defecto si Simulation no la provee o como fallback en manejar_colision
+from .swarm_state import SwarmState, _CampoEstado
 
 # Ya no se importa el config global aquí, se recibe en __init__
 
 class Drone:
     _id_counter = -1 # Contador de clase para asignar IDs únicos a los drones
 
-    def __init__(self, x, y, radio_param, color, config_obj, id_drone=None):
+    # El estado físico vive en los arreglos del SwarmState; el Drone es un manejador indexado
+    posicion = _CampoEstado('_posiciones')         # Vector de posición [x, y]
+    velocidad = _CampoEstado('_velocidades')       # Vector de velocidad [vx, vy]
+    aceleracion = _CampoEstado('_aceleraciones')   # Vector de aceleración [ax, ay]
+    fuerza_actual = _CampoEstado('_fuerzas')       # Fuerza neta actual que actúa sobre el dron
+    radio = _CampoEstado('_radios', float)
+    esta_activo = _CampoEstado('_activos', bool)
+
+    def __init__(self, x, y, radio_param, color, config_obj, id_drone=None, estado=None):
         
         Drone._id_counter +=1
         self.id = id_drone if id_drone is not None else Drone._id_counter
         
         self.config_propia = config_obj
+
+        # Si no se provee un estado compartido (p. ej. el del SimulationEngine), el dron usa uno propio
+        self._estado = estado if estado is not None else SwarmState(capacidad=1)
+        self._idx = self._estado.agregar([float(x), float(y)], radio_param) # Velocidad inicial cero, Simulation asignará la inicial
         
-        self.posicion = np.array([float(x), float(y)]) # Vector de posición [x, y]
-        self.velocidad = np.array([0.0, 0.0], dtype=float) # Vector de velocidad [vx, vy], Simulation asignará la inicial
-        self.aceleracion = np.array([0.0, 0.0]) # Vector de aceleración [ax, ay]
-        self.fuerza_actual = np.array([0.0,0.0]) # Fuerza neta actual que actúa sobre el dron
-        
-        self.radio = radio_param
         self.color_original = color 
         self.color = color         
 
@@ -29,8 +35,7 @@ class Drone:
         self.max_fuerza = self.config_propia.MAX_FUERZA
         self.sensor_range = self.config_propia.SENSOR_RANGE_DRONE 
         self.radio_busqueda_frontera = self.config_propia.RADIO_BUSQUEDA_FRONTERA_DRONE
-        
-        self.esta_activo = True
+        self.punto_frontera = None # Último punto frontera usado por calcular_fuerzas (lo reutiliza el RK4 acoplado)
 
     def _encontrar_punto_frontera(self, grilla_cobertura, tamano_celda, num_celdas_x, num_celdas_y, rng_decision):
         """
@@ -99,6 +104,7 @@ class Drone:
         """
         if not self.esta_activo: # Los drones inactivos no calculan ni aplican fuerzas
             self.fuerza_actual = np.array([0.0, 0.0])
+            self.punto_frontera = None
             return
 
         fuerza_total = np.array([0.0, 0.0])
@@ -106,6 +112,7 @@ class Drone:
         # --- 1. Fuerza de Atracción a la Frontera (K_o) ---
         # Dirige al dron hacia áreas no exploradas.
         punto_frontera = self._encontrar_punto_frontera(grilla_cobertura, tamano_celda, num_cx, num_cy, rng_decision_dron)
+        self.punto_frontera = punto_frontera
         if punto_frontera is not None:
             vec_hacia_frontera = punto_frontera - self.posicion # Vector (r_frontier,i - r_i)
             dist_frontera = np.linalg.norm(vec_hacia_frontera)
@@ -268,20 +275,6 @@ class Drone:
                 print(f"Dron {self.id} ha fallado debido a colisión con {tipo_colision}.")
 
     def dibujar(self, pantalla):
-        """
-        Dibuja el dron en la pantalla de Pygame.
-        Los drones activos se muestran con su color original y su ID.
-        Los drones inactivos se muestran con el color de dron inactivo.
-        """
-        pygame.draw.circle(pantalla, self.color, 
-                           (int(self.posicion[0]), int(self.posicion[1])), 
-                           int(self.radio))
-        
-        if self.esta_activo: # Solo dibujar ID si está activo
-            # Considerar inicializar la fuente una vez en Simulation y pasarla para optimizar
-            font = pygame.font.SysFont(None, 18) 
-            texto_id = font.render(str(self.id), True, self.config_propia.NEGRO) # Usa color de config_propia
-            # Centrar el texto del ID sobre el dron
-            pos_texto_x = self.posicion[0] - texto_id.get_width() / 2
-            pos_texto_y = self.posicion[1] - self.radio - texto_id.get_height() - 2 # Un poco encima del círculo
-            pantalla.blit(texto_id, (pos_texto_x, pos_texto_y))
\ No newline at end of file
+        """Dibuja el dron en la pantalla de Pygame (ver render.dibujar_dron)."""
+        from .render import dibujar_dron # Solo la interfaz dibuja; el modelo no carga pygame
+        dibujar_dron(pantalla, self)
@@ -1,14 +1,281 @@
 # engine.py
+import warnings
 import numpy as np
 from .drone import Drone
 from .obstaculo import Obstaculo
-from .cbf import aplicar_cbf_simplificada, reset_cbf_activation_count 
+from .swarm_state import SwarmState
+from .fuerzas import calcular_fuerzas_lote
+from .frontera import CampoFrontera
+from .vecindad import GrillaEspacial, IndiceObstaculos, pares_en_rango_bruto, vecinos_por_dron
+from .cbf import (aplicar_cbf_simplificada, aplicar_cbf_lote, aplicar_cbf_qp, reset_cbf_activation_count, get_cbf_activation_count,
+                  radio_activacion_cbf)
+
+def _norma_filas(v):
+    """Norma de cada fila de un arreglo (N, 2), con el mismo redondeo que np.linalg.norm sobre cada fila."""
+    return np.sqrt((v[:, None, :] @ v[:, :, None])[:, 0, 0])
+
+def celdas_huella(posiciones, tamano, radio, nx, ny):
+    """
+    Celdas de cobertura que marcan los drones en 'posiciones' (N, 2): la celda de cada dron y, con radio > 0, las
+    celdas cuyo centro está a distancia <= radio. Retorna (ix, iy, origen), solo las celdas dentro de la grilla
+    (nx, ny), con 'origen' la fila de 'posiciones' de cada celda (en orden de dron y luego de la plantilla).
+    """
+    celdas = np.floor_divide(posiciones, tamano).astype(np.int64)
+    ix, iy = celdas[:, 0], celdas[:, 1]
+    origen = np.arange(len(posiciones))
+    if radio > 0:
+        k = int(np.ceil(radio / tamano))
+        rango = np.arange(-k, k + 1)
+        dx, dy = np.repeat(rango, 2 * k + 1), np.tile(rango, 2 * k + 1)
+        cx, cy = ix[:, None] + dx[None, :], iy[:, None] + dy[None, :]
+        # Celdas con centro dentro del radio; la celda del propio dron siempre cuenta
+        dist_sq = ((cx + 0.5) * tamano - posiciones[:, 0, None])**2 + ((cy + 0.5) * tamano - posiciones[:, 1, None])**2
+        en_huella = (dist_sq <= radio**2) | ((dx == 0) & (dy == 0))[None, :]
+        ix, iy, origen = cx[en_huella], cy[en_huella], np.broadcast_to(origen[:, None], cx.shape)[en_huella]
+    # Asegurar que los índices estén dentro de los límites de la grilla
+    dentro = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    return ix[dentro], iy[dentro], origen[dentro]
+
+class EstadisticasIntegracion:
+    """Contadores de un integrador: subpasos aceptados, subpasos rechazados y evaluaciones de la fuerza del enjambre."""
+    def __init__(self):
+        self.subpasos = 0
+        self.rechazados = 0
+        self.evaluaciones_fuerza = 0 # Incluye el cálculo de fuerzas del paso 3 de SimulationEngine.paso
+
+    def sumar(self, otras):
+        self.subpasos += otras.subpasos
+        self.rechazados += otras.rechazados
+        self.evaluaciones_fuerza += otras.evaluaciones_fuerza
+
+    def como_dict(self):
+        return {"subpasos": self.subpasos, "rechazados": self.rechazados,
+                "evaluaciones_fuerza": self.evaluaciones_fuerza}
+
+
+class Integrador:
+    """
+    Interfaz de los integradores del motor. avanzar(dt) lleva posiciones y velocidades de los drones activos
+    de t a t + dt sobre los arreglos de motor.estado, partiendo de las fuerzas ya calculadas en el paso
+    (estado.fuerzas) y de las velocidades filtradas por la CBF, aplica los límites de velocidad y el rebote
+    en bordes, y retorna las EstadisticasIntegracion del paso.
+    """
+    nombre = None
+
+    def __init__(self, motor):
+        self.motor = motor
+
+    def avanzar(self, dt):
+        raise NotImplementedError
+
+    def _estado_inicial(self):
+        """Posiciones, velocidades y aceleraciones (copias) de los drones activos, y su máscara."""
+        estado = self.motor.estado
+        activos = estado.activos.copy()
+        return (activos, estado.posiciones[activos], estado.velocidades[activos],
+                estado.fuerzas[activos] / self.motor.config.MASA_DRONE)
+
+    def _aceleracion(self, activos, p, v, estadisticas):
+        """Aceleración F/m de los drones activos en el estado (p, v); los inactivos quedan quietos y sin fuerza."""
+        estado = self.motor.estado
+        posiciones, velocidades = estado.posiciones.copy(), estado.velocidades.copy()
+        posiciones[activos], velocidades[activos] = p, v
+        estadisticas.evaluaciones_fuerza += 1
+        return self.motor._fuerzas_en(posiciones, velocidades)[activos] / self.motor.config.MASA_DRONE
+
+    def _guardar(self, activos, p, v):
+        """Escribe el estado final de los drones activos en motor.estado y detiene a los inactivos."""
+        estado = self.motor.estado
+        estado.posiciones[activos] = p
+        estado.velocidades[activos] = v
+        estado.velocidades[~activos] = 0.0 # Los drones inactivos no se mueven
+
+
+class IntegradorRK4PorDron(Integrador):
+    """RK4 de referencia: SimulationEngine._rk4_step dron por dron, con la fuerza constante durante el paso."""
+    nombre = "rk4_por_dron"
+
+    def avanzar(self, dt):
+        if self.motor.config.RK4_ACOPLADO:
+            raise ValueError("RK4_ACOPLADO requiere INTEGRADOR = 'rk4_enjambre'.")
+        for dr in self.motor.drones:
+            # El método _rk4_step solo actúa sobre drones activos (o debería verificar internamente)
+            # La lógica en _get_derivadas_estado dentro de _rk4_step ya maneja drones inactivos
+            self.motor._rk4_step(dr, dt)
+        estadisticas = EstadisticasIntegracion()
+        estadisticas.subpasos, estadisticas.evaluaciones_fuerza = 1, 1
+        return estadisticas
+
+
+class IntegradorRK4Enjambre(Integrador):
+    """
+    Paso RK4 de todos los drones a la vez.
+    Sin RK4_ACOPLADO la fuerza se mantiene constante durante el paso, igual que _rk4_step
+    (mismo resultado, sin el bucle por dron). Con RK4_ACOPLADO la fuerza se vuelve a evaluar
+    en cada etapa k2, k3 y k4 con las posiciones y velocidades intermedias (RK4 del sistema acoplado).
+    """
+    nombre = "rk4_enjambre"
+
+    def avanzar(self, dt):
+        estadisticas = EstadisticasIntegracion()
+        estadisticas.subpasos, estadisticas.evaluaciones_fuerza = 1, 1
+        activos, p0, v0, k1a = self._estado_inicial()
+        k1v = v0
+        if self.motor.config.RK4_ACOPLADO:
+            def aceleracion(p, v):
+                return self._aceleracion(activos, p, v, estadisticas)
+        else:
+            def aceleracion(p, v):
+                return k1a # Fuerza constante durante el paso (la calculada en el paso 3)
+
+        k2v = v0 + 0.5*dt*k1a
+        k2a = aceleracion(p0 + 0.5*dt*k1v, k2v)
+        k3v = v0 + 0.5*dt*k2a
+        k3a = aceleracion(p0 + 0.5*dt*k2v, k3v)
+        k4v = v0 + dt*k3a
+        k4a = aceleracion(p0 + dt*k3v, k4v)
+
+        newp = p0 + (dt/6.0)*(k1v + 2*k2v + 2*k3v + k4v)
+        newv = v0 + (dt/6.0)*(k1a + 2*k2a + 2*k3a + k4a)
+        self.motor._aplicar_limites(newp, newv, self.motor.estado.radios[activos])
+        self._guardar(activos, newp, newv)
+        return estadisticas
+
+
+class IntegradorEulerSimplectico(Integrador):
+    """
+    Euler simpléctico (semi-implícito): v1 = v0 + a0*dt, p1 = p0 + v1*dt.
+    Primer orden, una sola evaluación de fuerza por paso (la del paso 3).
+    """
+    nombre = "euler_simplectico"
+
+    def avanzar(self, dt):
+        estadisticas = EstadisticasIntegracion()
+        estadisticas.subpasos, estadisticas.evaluaciones_fuerza = 1, 1
+        activos, p0, v0, a0 = self._estado_inicial()
+        newv = v0 + dt*a0
+        newp = p0 + dt*newv
+        self.motor._aplicar_limites(newp, newv, self.motor.estado.radios[activos])
+        self._guardar(activos, newp, newv)
+        return estadisticas
+
+
+class IntegradorVerlet(Integrador):
+    """
+    Velocity Verlet: p1 = p0 + v0*dt + a0*dt^2/2, v1 = v0 + (a0 + a1)*dt/2.
+    Como la fuerza depende de la velocidad (alineación), a1 se evalúa en p1 con la velocidad predicha v0 + a0*dt.
+    Segundo orden, dos evaluaciones de fuerza por paso.
+    """
+    nombre = "verlet"
+
+    def avanzar(self, dt):
+        estadisticas = EstadisticasIntegracion()
+        estadisticas.subpasos, estadisticas.evaluaciones_fuerza = 1, 1
+        activos, p0, v0, a0 = self._estado_inicial()
+        newp = p0 + dt*v0 + (0.5*dt*dt)*a0
+        a1 = self._aceleracion(activos, newp, v0 + dt*a0, estadisticas)
+        newv = v0 + (0.5*dt)*(a0 + a1)
+        self.motor._aplicar_limites(newp, newv, self.motor.estado.radios[activos])
+        self._guardar(activos, newp, newv)
+        return estadisticas
+
+
+class IntegradorRK45(Integrador):
+    """
+    Dormand-Prince 5(4) con control de error: el paso dt se recorre en subpasos de tamaño h, que crece
+    donde el movimiento es suave (enjambre disperso) y se reduce cerca de obstáculos, bordes y vecinos,
+    donde la fuerza cambia rápido. El error de cada subpaso es el mayor sobre todos los drones y
+    componentes, escalado por RK45_TOL_ABS + RK45_TOL_REL * |y|; h se conserva entre pasos.
+    Los límites de velocidad y el rebote se aplican al final de cada subpaso aceptado.
+    Con un DELTA_T grande (estudios sin ventana) los subpasos mantienen la precisión donde hace falta.
+    """
+    nombre = "rk45"
+
+    # Tablero de Butcher de Dormand-Prince (la última fila de A son los pesos de quinto orden)
+    A = (
+        (),
+        (1/5,),
+        (3/40, 9/40),
+        (44/45, -56/15, 32/9),
+        (19372/6561, -25360/2187, 64448/6561, -212/729),
+        (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+        (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84),
+    )
+    # Diferencia entre los pesos de quinto y cuarto orden (estimación del error)
+    E = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+    SEGURIDAD = 0.9
+    FACTOR_MIN, FACTOR_MAX = 0.2, 5.0
+
+    def __init__(self, motor):
+        super().__init__(motor)
+        self.h = None # Último tamaño de subpaso aceptado (None: empezar con el dt completo)
+
+    def _error(self, y0, y1, err):
+        cfg = self.motor.config
+        escala = cfg.RK45_TOL_ABS + cfg.RK45_TOL_REL * np.maximum(np.abs(y0), np.abs(y1))
+        return float(np.max(np.abs(err) / escala)) if err.size else 0.0
+
+    def avanzar(self, dt):
+        cfg = self.motor.config
+        estadisticas = EstadisticasIntegracion()
+        estadisticas.evaluaciones_fuerza = 1
+        activos, p, v, a = self._estado_inicial()
+        radios = self.motor.estado.radios[activos]
+        h_min = cfg.RK45_SUBPASO_MIN * dt
+        h = self.h if self.h is not None else dt
+        t = 0.0
+        while t < dt and activos.any():
+            truncado = h >= dt - t # El subpaso se recorta para terminar exactamente en dt
+            h_paso = dt - t if truncado else h
+            # Etapas: kp son derivadas de posición (velocidades), ka de velocidad (aceleraciones)
+            kp, ka = [v], [a]
+            for fila in self.A[1:]:
+                pe = p + h_paso * sum(c * k for c, k in zip(fila, kp) if c)
+                ve = v + h_paso * sum(c * k for c, k in zip(fila, ka) if c)
+                kp.append(ve)
+                ka.append(self._aceleracion(activos, pe, ve, estadisticas))
+            newp, newv = pe, ve # La última etapa se evalúa en la solución de quinto orden (FSAL)
+            error = max(self._error(p, newp, h_paso * sum(c * k for c, k in zip(self.E, kp) if c)),
+                        self._error(v, newv, h_paso * sum(c * k for c, k in zip(self.E, ka) if c)))
+            factor = self.FACTOR_MAX if error == 0 else min(self.FACTOR_MAX, max(self.FACTOR_MIN, self.SEGURIDAD * error**-0.2))
+
+            if error > 1.0 and h_paso > h_min:
+                estadisticas.rechazados += 1
+                h = max(h_min, h_paso * factor)
+                continue
+
+            # Subpaso aceptado (o ya en el tamaño mínimo)
+            estadisticas.subpasos += 1
+            t = dt if truncado else t + h_paso
+            antes_p, antes_v = newp.copy(), newv.copy()
+            self.motor._aplicar_limites(newp, newv, radios)
+            if np.array_equal(antes_p, newp) and np.array_equal(antes_v, newv):
+                a = ka[-1] # FSAL: la última etapa es la derivada al inicio del próximo subpaso
+            elif t < dt:
+                a = self._aceleracion(activos, newp, newv, estadisticas) # Los límites cambiaron el estado
+            p, v = newp, newv
+            # Un subpaso recortado al final de dt no limita el crecimiento de h
+            h = max(h, h_paso * factor) if truncado and factor >= 1.0 else max(h_min, h_paso * factor)
+        self.h = min(h, dt)
+        self._guardar(activos, p, v)
+        return estadisticas
+
+
+# Integradores disponibles según config.INTEGRADOR
+INTEGRADORES = {
+    clase.nombre: clase
+    for clase in (IntegradorRK4PorDron, IntegradorRK4Enjambre, IntegradorEulerSimplectico, IntegradorVerlet, IntegradorRK45)
+}
+
 
 class SimulationEngine:
     """
     Motor principal de la simulación. Gestiona el estado, los agentes (drones),
     los obstáculos, las interacciones y la progresión temporal.
     """
+    canal_compartido = None # memoria_compartida.CanalCompartido donde se publica el estado al final de cada paso (opcional)
+    grabador_trayectoria = None # trayectoria.GrabadorTrayectoria que graba el estado de cada paso en un archivo (opcional)
+
     def __init__(self, config, rngs):
         
         self.config = config # Almacena la configuración editable/actual
@@ -26,8 +293,18 @@ class SimulationEngine:
         if hasattr(Obstaculo, '_id_counter'): # Si Obstaculo también tiene un contador de ID
             Obstaculo._id_counter = -1
 
-        self.drones = [] # Lista para almacenar los objetos Drone
+        self.drones = [] # Lista para almacenar los objetos Drone (manejadores indexados sobre self.estado)
+        self.estado = SwarmState(capacidad=self.config.NUM_DRONES_INICIAL) # Arreglos contiguos del enjambre; self.drones[i] ocupa la fila i
+        self._indice_vecinos = None # GrillaEspacial de las posiciones actuales; None si debe reconstruirse
+        self._puntos_frontera = None # Puntos frontera (N, 2) del último cálculo de fuerzas (NaN para inactivos)
+        self.integrador = None # Se crea en el primer paso según config.INTEGRADOR
+        self.estadisticas_integracion = EstadisticasIntegracion() # Estadísticas del último paso
+        self.estadisticas_integracion_total = EstadisticasIntegracion() # Acumuladas desde el inicio
         self.obstaculos = [] # Lista para almacenar los objetos Obstaculo
+        # Índice de proximidad de obstáculos; la celda cubre el alcance de la repulsión de obstáculos
+        self.indice_obstaculos = IndiceObstaculos(
+            self.config.DISTANCIA_REACCION_OBSTACULO + self.config.RADIO_DRONE + self.config.MAX_TAMANO_OBSTACULO
+        )
 
         # Inicialización de la grilla de cobertura
         # Esto corresponde a la discretización del espacio para medir la cobertura.
@@ -36,12 +313,26 @@ class SimulationEngine:
         self.grilla = np.zeros((nx, ny), dtype=int) # Matriz NumPy, 0=no cubierta, 1=cubierta
         self.total_celdas = nx * ny # Número total de celdas para calcular el porcentaje
         self.coverage = 0.0 # Porcentaje de cobertura inicial
+        self.celdas_cubiertas = 0 # Celdas con valor 1 en la grilla (se actualiza solo en transiciones 0 -> 1)
+        self.celdas_nuevas = np.zeros(0, dtype=np.intp) # Índices planos (ix * ny + iy) de las celdas cubiertas en el último paso
+        # Estructura para buscar el punto frontera de todos los drones a partir de la grilla
+        self.campo_frontera = CampoFrontera(
+            self.grilla, self.config.TAMANO_CELDA_COBERTURA, self.config.RADIO_BUSQUEDA_FRONTERA_DRONE
+        )
 
         # Inicialización de contadores de tiempo y colisiones
         self.time = 0.0 # Tiempo total de simulación transcurrido
         self.critical_collisions = 0 # Contador de colisiones que resultan en fallo de dron
+        self.cbf_activaciones_paso = 0 # Activaciones de la barrera CBF en el último paso
+        self.cbf_activaciones_total = 0 # Activaciones de la barrera CBF desde el inicio
         self.time_since_last_obs = 0.0 # Temporizador para la generación periódica de obstáculos
 
+        # Cuadrados Medios termina siempre en un ciclo (a menudo 0 fijo): se ubica el de rng_drones desde su estado
+        # actual, y si es más corto que MIDDLE_SQUARE_CICLO_MINIMO se advierte al entrar en él (ver _revisar_ciclo_rng_drones)
+        self.ciclo_rng_drones = self.rng_drones.detectar_ciclo() if hasattr(self.rng_drones, 'detectar_ciclo') else None # (mu, largo)
+        self._advertir_ciclo_rng_drones = (self.ciclo_rng_drones is not None and
+                                           self.ciclo_rng_drones[1] < self.config.MIDDLE_SQUARE_CICLO_MINIMO)
+
         # Crear los agentes iniciales de la simulación
         self._spawn_drones(self.config.NUM_DRONES_INICIAL) # Crea el número inicial de drones
         self._spawn_initial_obstacles() # Crea el conjunto inicial de obstáculos
@@ -56,13 +347,16 @@ class SimulationEngine:
             self.config.AZUL, self.config.VERDE, self.config.ROJO,
             (255, 165, 0), (128, 0, 128) # Naranja, Morado
         ]
-        for _ in range(count):
-            # Generar posición inicial aleatoria usando el RNG del entorno
+        # Posiciones iniciales aleatorias con el RNG del entorno, en un bloque: (x, y) de cada dron en orden
+        uniformes = self.rng_entorno.next_floats(2 * count).reshape(-1, 2)
+        # Velocidades iniciales con el RNG de decisiones de drones, también en un bloque: (vx, vy) de cada dron
+        uniformes_vel = self.rng_drones.next_floats(2 * count).reshape(-1, 2)
+        for (u_x, u_y), (v_x, v_y) in zip(uniformes.tolist(), uniformes_vel.tolist()):
             # Se asegura que el dron aparezca completamente dentro de los límites
-            x = (self.rng_entorno.next_float() *
+            x = (u_x *
                  (self.config.ANCHO_PANTALLA - 2 * self.config.RADIO_DRONE) # Rango disponible
                  + self.config.RADIO_DRONE) # Offset para el radio
-            y = (self.rng_entorno.next_float() *
+            y = (u_y *
                  (self.config.ALTO_PANTALLA - 2 * self.config.RADIO_DRONE)
                  + self.config.RADIO_DRONE)
             
@@ -73,14 +367,23 @@ class SimulationEngine:
                 x, y,
                 self.config.RADIO_DRONE, # Radio del dron desde la config
                 colores[dr_id % len(colores)], # Asigna un color cíclicamente
-                config_obj=self.config # Pasa el objeto config para que el dron use los parámetros actuales
+                config_obj=self.config, # Pasa el objeto config para que el dron use los parámetros actuales
+                estado=self.estado # El dron guarda su estado físico en los arreglos del motor
             )
             # Asigna una velocidad inicial aleatoria usando el RNG de decisiones de drones
             dr.velocidad = np.array([
-                self.rng_drones.next_float() * 40 - 20, 
-                self.rng_drones.next_float() * 40 - 20
+                v_x * 40 - 20,
+                v_y * 40 - 20
             ], dtype=float)
             self.drones.append(dr)
+        self._indice_vecinos = None # Cambió el conjunto de drones
+
+    def _remove_last_drone(self):
+        """Quita el último dron añadido, liberando también su fila en self.estado."""
+        if self.drones:
+            self.drones.pop()
+            self.estado.quitar_ultimo()
+            self._indice_vecinos = None
 
     def _spawn_initial_obstacles(self):
         """Crea el conjunto inicial de obstáculos al inicio de la simulación."""
@@ -135,6 +438,7 @@ class SimulationEngine:
             rng_para_dinamica=self.rng_obst # RNG para su lógica interna si es dinámico
         )
         self.obstaculos.append(obs)
+        self.indice_obstaculos.agregar(obs)
 
     def paso(self):
         """
@@ -145,73 +449,62 @@ class SimulationEngine:
         dt = self.config.DELTA_T # Paso de tiempo
         self.time += dt          # Avanzar el tiempo global de la simulación
 
-        # 1) Actualizar el estado de los obstáculos dinámicos (aparecer/desaparecer)
-        for obs in self.obstaculos:
-            obs.actualizar(dt, self.rng_obst) # El obstáculo usa su RNG para tiempos/tamaños al reactivarse
-
-        # 2) Generar nuevos obstáculos dinámicos periódicamente
-        self.time_since_last_obs += dt
-        if (self.time_since_last_obs >=
-                self.config.GENERAR_NUEVOS_OBSTACULOS_INTERVALO):
-            self._spawn_obstacle()
-            self.time_since_last_obs = 0.0 # Resetear temporizador
+        # 1) y 2) Ciclo de vida de los obstáculos dinámicos y generación periódica de obstáculos nuevos
+        self._actualizar_obstaculos(dt)
 
         # 3) Calcular las fuerzas para cada dron activo
         # Se necesitan las listas actuales de obstáculos y drones activos para estos cálculos.
-        obsts_active = [o for o in self.obstaculos if o.esta_activo]
-        drones_active_for_forces = [d for d in self.drones if d.esta_activo] # Evitar que drones inactivos ejerzan fuerza
+        # Pares de drones activos dentro del rango sensorial (consultados al índice espacial)
+        pares_sensor = self._pares_drones(self.config.SENSOR_RANGE_DRONE)
+        # Pares (dron, obstáculo activo) dentro del alcance de la repulsión: d - r_obs - r_dron < DISTANCIA_REACCION_OBSTACULO
+        pares_obs = self._pares_obstaculos(self.config.DISTANCIA_REACCION_OBSTACULO + self._radio_max_dron())
         
-        for dr in self.drones:
-            if dr.esta_activo:
-                # Los vecinos son otros drones activos dentro del rango sensorial del dron 'dr'
-                neighbors = [d for d in drones_active_for_forces if d.id != dr.id] # Excluye al propio dron
-                # El método calcular_fuerzas en Drone implementa la EDO de fuerzas:
-                # F_i = F_cohesion + F_separacion + F_alineacion + F_frontera + F_obstaculos + F_bordes
-                #
-                dr.calcular_fuerzas(
-                    neighbors, obsts_active,
-                    self.grilla, self.config.TAMANO_CELDA_COBERTURA,
-                    self.grilla.shape[0], self.grilla.shape[1], # Pasar dimensiones de la grilla (nx, ny)
-                    self.rng_drones # RNG para decisiones internas del dron (ej. _encontrar_punto_frontera)
-                )
-            else:
-                # Los drones inactivos no ejercen ni experimentan estas fuerzas de enjambre
-                dr.fuerza_actual = np.zeros(2)
+        if self.config.BACKEND_FUERZAS == "vectorizado":
+            # Todas las fuerzas del enjambre en una pasada de operaciones NumPy sobre self.estado
+            self._calcular_fuerzas_vectorizado(pares_sensor, pares_obs)
+        elif self.config.BACKEND_FUERZAS == "referencia":
+            inicio_vecinos, vecinos = vecinos_por_dron(pares_sensor, self.estado.n)
+            inicio_obs = np.searchsorted(pares_obs[0], np.arange(self.estado.n + 1))
+            for k, dr in enumerate(self.drones):
+                if dr.esta_activo:
+                    # Los vecinos son otros drones activos dentro del rango sensorial del dron 'dr',
+                    # en el orden de self.drones (los que quedan fuera del rango no aportan fuerza)
+                    neighbors = [self.drones[v] for v in vecinos[inicio_vecinos[k]:inicio_vecinos[k + 1]]]
+                    # El método calcular_fuerzas en Drone implementa la EDO de fuerzas:
+                    # F_i = F_cohesion + F_separacion + F_alineacion + F_frontera + F_obstaculos + F_bordes
+                    #
+                    # Obstáculos activos cercanos, en el orden de self.obstaculos
+                    obsts_cercanos = [self.obstaculos[k] for k in pares_obs[1][inicio_obs[k]:inicio_obs[k + 1]]]
+                    dr.calcular_fuerzas(
+                        neighbors, obsts_cercanos,
+                        self.grilla, self.config.TAMANO_CELDA_COBERTURA,
+                        self.grilla.shape[0], self.grilla.shape[1], # Pasar dimensiones de la grilla (nx, ny)
+                        self.rng_drones # RNG para decisiones internas del dron (ej. _encontrar_punto_frontera)
+                    )
+                else:
+                    # Los drones inactivos no ejercen ni experimentan estas fuerzas de enjambre
+                    dr.fuerza_actual = np.zeros(2)
+                    dr.punto_frontera = None
+            self._puntos_frontera = np.array(
+                [dr.punto_frontera if dr.punto_frontera is not None else (np.nan, np.nan) for dr in self.drones]
+            ).reshape(-1, 2)
+        else:
+            raise ValueError(f"BACKEND_FUERZAS desconocido: '{self.config.BACKEND_FUERZAS}'. Use 'vectorizado' o 'referencia'.")
 
         # 4) Aplicar Control Barrier Functions (CBF) si están activadas
         # La CBF ajusta las velocidades para garantizar la seguridad (evitar colisiones)
         # Se basa en h(x) >= 0, donde h es la función barrera.
+        self.cbf_activaciones_paso = 0
         if self.config.CBF_ACTIVADO:
-            # Iterar sobre drones activos para aplicar CBF
-            # Nota: drones_active fue definida antes para el cálculo de fuerzas, podemos reutilizarla
-            # o re-filtrarla si algún dron se volvió inactivo justo ahora (poco probable sin movimiento aún)
-            current_drones_active_for_cbf = [d for d in self.drones if d.esta_activo]
-            for i, d1 in enumerate(current_drones_active_for_cbf):
-                # CBF Dron-Dron
-                for d2 in current_drones_active_for_cbf[i+1:]: # Evitar auto-comparación y pares duplicados
-                    aplicar_cbf_simplificada(
-                        d1, d2, self.config.CBF_D_MIN_DRON_DRON, False, # es_obstaculo = False
-                        self.config # Pasa el objeto de configuración actual
-                    )
-                    aplicar_cbf_simplificada( # Aplicación simétrica
-                        d2, d1, self.config.CBF_D_MIN_DRON_DRON, False,
-                        self.config
-                    )
-                # CBF Dron-Obstáculo
-                for obs in obsts_active: # Usar la lista ya filtrada de obstáculos activos
-                    # d_min para CBF con obstáculos debe ser la distancia centro-a-centro segura
-                    dist_min_cbf_obs = self.config.CBF_D_MIN_DRON_OBSTACULO
-                    aplicar_cbf_simplificada(
-                        d1, obs, dist_min_cbf_obs, True, # es_obstaculo = True
-                        self.config
-                    )
+            self.cbf_activaciones_paso = self._aplicar_cbf()
+            self.cbf_activaciones_total += self.cbf_activaciones_paso
 
-        # 5) Integración numérica RK4 para actualizar posición y velocidad
+        # 5) Integración numérica para actualizar posición y velocidad
         # Resuelve el sistema de EDOs: dr/dt = v, dv/dt = F/m
-        for dr in self.drones:
-            # El método _rk4_step solo actúa sobre drones activos (o debería verificar internamente)
-            # La lógica en _get_derivadas_estado dentro de _rk4_step ya maneja drones inactivos
-            self._rk4_step(dr, dt)
+        # El integrador se elige con config.INTEGRADOR (ver INTEGRADORES); las estadísticas del paso quedan en el motor
+        self.estadisticas_integracion = self._integrador().avanzar(dt)
+        self.estadisticas_integracion_total.sumar(self.estadisticas_integracion)
+        self._indice_vecinos = None # Las posiciones cambiaron
 
         # 6) Detección y manejo de colisiones (después del movimiento)
         # Esto determina si un dron "falla" y se vuelve inactivo
@@ -220,6 +513,212 @@ class SimulationEngine:
         # 7) Actualizar la grilla de cobertura
         self._update_coverage()
 
+        # 8) Advertir (una vez) si rng_drones quedó atrapado en un ciclo corto
+        self._revisar_ciclo_rng_drones()
+
+        # 9) Publicar el estado para otros procesos, si hay un canal de memoria compartida
+        if self.canal_compartido is not None:
+            self.canal_compartido.publicar(self)
+
+        # 10) Grabar el paso en el archivo de trayectoria, si hay uno
+        if self.grabador_trayectoria is not None:
+            self.grabador_trayectoria.grabar(self)
+
+    def _revisar_ciclo_rng_drones(self):
+        """Emite un RuntimeWarning la primera vez que rng_drones está dentro de su ciclo, si este es corto."""
+        if self._advertir_ciclo_rng_drones and self.rng_drones.en_ciclo():
+            self._advertir_ciclo_rng_drones = False
+            mu, largo = self.ciclo_rng_drones
+            ciclo = "quedó fijo en 0" if largo == 1 and self.rng_drones.current_seed_int == 0 else f"entró en un ciclo de largo {largo}"
+            warnings.warn(
+                f"rng_drones (Cuadrados Medios, semilla {self.rng_drones.initial_seed}) {ciclo} después de {mu} valores "
+                f"(t = {self.time:.2f} s): las decisiones aleatorias de los drones se repiten desde ahora. "
+                f"Use otra semilla o más dígitos (N_DIGITS_MIDDLE_SQUARE).", RuntimeWarning
+            )
+
+    def _integrador(self):
+        """Integrador de config.INTEGRADOR; se vuelve a crear si la configuración cambió."""
+        nombre = self.config.INTEGRADOR
+        if self.integrador is None or self.integrador.nombre != nombre:
+            if nombre not in INTEGRADORES:
+                raise ValueError(f"INTEGRADOR desconocido: '{nombre}'. Use uno de: {', '.join(INTEGRADORES)}.")
+            self.integrador = INTEGRADORES[nombre](self)
+        return self.integrador
+
+    def _actualizar_obstaculos(self, dt):
+        """Pasos 1 y 2 de paso(): ciclo de vida de los obstáculos dinámicos y generación periódica de nuevos."""
+        # 1) Actualizar el estado de los obstáculos dinámicos (aparecer/desaparecer)
+        for k, obs in enumerate(self.obstaculos):
+            if obs.actualizar(dt, self.rng_obst): # El obstáculo usa su RNG para tiempos/tamaños al reactivarse
+                self.indice_obstaculos.actualizar(k, obs) # Solo se refresca el índice si cambió
+
+        # 2) Generar nuevos obstáculos dinámicos periódicamente
+        self.time_since_last_obs += dt
+        if (self.time_since_last_obs >=
+                self.config.GENERAR_NUEVOS_OBSTACULOS_INTERVALO):
+            self._spawn_obstacle()
+            self.time_since_last_obs = 0.0 # Resetear temporizador
+
+    def _aplicar_cbf(self):
+        """Paso 4 de paso(): filtra las velocidades con la CBF según config.CBF_MODO y retorna las activaciones."""
+        # Solo se visitan pares dentro del radio donde la CBF puede activarse; los demás no modifican nada.
+        pares_cbf = self._pares_drones(self._radio_candidatos_cbf(self.config.CBF_D_MIN_DRON_DRON, 2.0))
+        # Para obstáculos la entidad está quieta: la velocidad relativa es solo la del dron
+        pares_obs = self._pares_obstaculos(
+            self._radio_candidatos_cbf(self.config.CBF_D_MIN_DRON_OBSTACULO, 1.0), sumar_radio_obstaculo=False
+        )
+        if self.config.CBF_MODO in ("lote", "qp"):
+            # Todas las restricciones a la vez sobre las velocidades de entrada (ver aplicar_cbf_lote y aplicar_cbf_qp)
+            filtro = aplicar_cbf_lote if self.config.CBF_MODO == "lote" else aplicar_cbf_qp
+            self.estado.velocidades[:], activaciones = filtro(
+                self.estado.posiciones, self.estado.velocidades, self.estado.activos,
+                pares_cbf, self.indice_obstaculos.posiciones, pares_obs, self.config
+            )
+            return activaciones
+        elif self.config.CBF_MODO == "secuencial":
+            return self._aplicar_cbf_secuencial(pares_cbf, pares_obs)
+        raise ValueError(f"CBF_MODO desconocido: '{self.config.CBF_MODO}'. Use 'secuencial', 'lote' o 'qp'.")
+
+    def _aplicar_cbf_secuencial(self, pares_cbf, pares_obs):
+        """
+        CBF_MODO "secuencial": aplicar_cbf_simplificada par por par sobre los pares candidatos (i, j) y (dron, obstáculo),
+        en el mismo orden que el doble bucle sobre todos los pares. Retorna las activaciones.
+        """
+        pares_cbf_i, pares_cbf_j = pares_cbf
+        pares_obs_i, pares_obs_k = pares_obs
+        # Iterar sobre drones activos para aplicar CBF, en el mismo orden que el doble bucle sobre todos los pares.
+        inicio_pares = np.searchsorted(pares_cbf_i, np.arange(self.estado.n + 1))
+        inicio_obs = np.searchsorted(pares_obs_i, np.arange(self.estado.n + 1))
+        activaciones_antes = get_cbf_activation_count()
+        for i, d1 in enumerate(self.drones):
+            if not d1.esta_activo:
+                continue
+            # CBF Dron-Dron (pares (i, j) con j > i: sin auto-comparación ni pares duplicados)
+            for j in pares_cbf_j[inicio_pares[i]:inicio_pares[i + 1]]:
+                d2 = self.drones[j]
+                aplicar_cbf_simplificada(
+                    d1, d2, self.config.CBF_D_MIN_DRON_DRON, False, # es_obstaculo = False
+                    self.config # Pasa el objeto de configuración actual
+                )
+                aplicar_cbf_simplificada( # Aplicación simétrica
+                    d2, d1, self.config.CBF_D_MIN_DRON_DRON, False,
+                    self.config
+                )
+            # CBF Dron-Obstáculo
+            for k in pares_obs_k[inicio_obs[i]:inicio_obs[i + 1]]: # Obstáculos activos candidatos, en orden
+                obs = self.obstaculos[k]
+                # d_min para CBF con obstáculos debe ser la distancia centro-a-centro segura
+                dist_min_cbf_obs = self.config.CBF_D_MIN_DRON_OBSTACULO
+                aplicar_cbf_simplificada(
+                    d1, obs, dist_min_cbf_obs, True, # es_obstaculo = True
+                    self.config
+                )
+        return get_cbf_activation_count() - activaciones_antes
+
+    def _pares_drones(self, radio, posiciones=None, tamano_celda=None):
+        """
+        Pares candidatos (i, j), con i < j, de drones activos a distancia < radio, ordenados por (i, j).
+        Con la grilla (INDICE_ESPACIAL "grilla", o "auto" en enjambres grandes) la GrillaEspacial se construye una sola vez por cada conjunto
+        de posiciones y se reutiliza en todas las fases (fuerzas y CBF).
+        Si se pasan 'posiciones' (p. ej. las de una etapa intermedia del RK4) o un 'tamano_celda' propio (consultas de radio
+        mucho menor que el rango sensorial, como las colisiones) se consulta un índice temporal.
+        """
+        activos = self.estado.activos
+        modo = self.config.INDICE_ESPACIAL
+        if modo == "auto":
+            modo = "grilla" if self.estado.n >= self.config.MIN_DRONES_GRILLA_ESPACIAL else "fuerza_bruta"
+        if modo == "grilla":
+            if posiciones is not None or tamano_celda is not None:
+                indice = GrillaEspacial(tamano_celda or self.config.SENSOR_RANGE_DRONE)
+                indice.construir(self.estado.posiciones if posiciones is None else posiciones)
+            else:
+                if self._indice_vecinos is None:
+                    self._indice_vecinos = GrillaEspacial(self.config.SENSOR_RANGE_DRONE)
+                    self._indice_vecinos.construir(self.estado.posiciones)
+                indice = self._indice_vecinos
+            i, j = indice.pares(radio)
+            mantener = activos[i] & activos[j] # La grilla incluye drones que se inactivaron después de construirla
+            return i[mantener], j[mantener]
+        elif modo == "fuerza_bruta":
+            return pares_en_rango_bruto(self.estado.posiciones if posiciones is None else posiciones, activos, radio)
+        raise ValueError(f"INDICE_ESPACIAL desconocido: '{self.config.INDICE_ESPACIAL}'. Use 'grilla', 'fuerza_bruta' o 'auto'.")
+
+    def _pares_obstaculos(self, radio, sumar_radio_obstaculo=True):
+        """
+        Pares candidatos (dron activo, obstáculo activo) con distancia entre centros < radio
+        (+ radio del obstáculo si sumar_radio_obstaculo), ordenados por (dron, obstáculo).
+        """
+        return self.indice_obstaculos.pares(self.estado.posiciones, self.estado.activos, radio, sumar_radio_obstaculo)
+
+    def _radio_max_dron(self):
+        """Mayor radio de dron del enjambre (0 si no hay drones)."""
+        return float(self.estado.radios.max()) if self.estado.n else 0.0
+
+    def _radio_candidatos_cbf(self, d_min, factor_velocidad_relativa):
+        """
+        Radio de búsqueda de pares para la CBF. La condición de activación no está acotada por d_min,
+        sino por la velocidad relativa; se usa la rapidez máxima actual del enjambre como cota.
+        Una corrección CBF nunca aumenta la rapidez si CBF_FACTOR_CORRECCION_VELOCIDAD <= 1;
+        si es mayor, la rapidez queda limitada por MAX_VELOCIDAD.
+        """
+        vel = self.estado.velocidades[self.estado.activos]
+        rapidez_max = float(np.sqrt((vel**2).sum(axis=1)).max()) if len(vel) else 0.0
+        if self.config.CBF_FACTOR_CORRECCION_VELOCIDAD > 1:
+            rapidez_max = max(rapidez_max, self.config.MAX_VELOCIDAD)
+        return radio_activacion_cbf(d_min, self.config.CBF_GAMMA, factor_velocidad_relativa * rapidez_max)
+
+    def _calcular_fuerzas_vectorizado(self, pares_sensor, pares_obs):
+        """
+        Calcula la fuerza neta de todos los drones con calcular_fuerzas_lote.
+        Los puntos frontera salen del CampoFrontera, que da los mismos puntos que el cálculo por dron
+        y consume el RNG de decisiones de drones en el mismo orden.
+        """
+        puntos_frontera = self.campo_frontera.puntos_frontera(
+            self.estado.posiciones, self.estado.activos, self.estado.radios,
+            self.config.ANCHO_PANTALLA, self.config.ALTO_PANTALLA, self.rng_drones
+        )
+        self._puntos_frontera = puntos_frontera
+        self.estado.fuerzas[:] = calcular_fuerzas_lote(
+            self.estado.posiciones, self.estado.velocidades, self.estado.radios, self.estado.activos,
+            puntos_frontera, self.indice_obstaculos.posiciones, self.indice_obstaculos.radios, self.config,
+            pares=pares_sensor, pares_obstaculos=pares_obs
+        )
+
+    def _fuerzas_en(self, posiciones, velocidades):
+        """
+        Fuerza neta del enjambre evaluada en un estado (posiciones, velocidades) distinto del actual,
+        como las etapas intermedias de los integradores (RK4 acoplado, Verlet, RK45). Los puntos frontera se mantienen fijos durante el paso
+        (son los del cálculo de fuerzas del paso 3), por lo que no se consume el RNG de decisiones.
+        """
+        activos = self.estado.activos
+        pares = self._pares_drones(self.config.SENSOR_RANGE_DRONE, posiciones)
+        pares_obs = self.indice_obstaculos.pares(
+            posiciones, activos, self.config.DISTANCIA_REACCION_OBSTACULO + self._radio_max_dron()
+        )
+        return calcular_fuerzas_lote(
+            posiciones, velocidades, self.estado.radios, activos,
+            self._puntos_frontera, self.indice_obstaculos.posiciones, self.indice_obstaculos.radios, self.config,
+            pares=pares, pares_obstaculos=pares_obs
+        )
+
+    def _aplicar_limites(self, posiciones, velocidades, radios):
+        """
+        Versión vectorizada de Drone.actualizar_estado_simple (modifica los arreglos in situ):
+        limita la rapidez a MAX_VELOCIDAD y aplica el rebote amortiguado en los bordes del mapa.
+        """
+        vmax = self.config.MAX_VELOCIDAD
+        norma = _norma_filas(velocidades)
+        excede = norma > vmax
+        velocidades[excede] = (velocidades[excede] / norma[excede, None]) * vmax
+
+        for eje, limite in ((0, self.config.ANCHO_PANTALLA), (1, self.config.ALTO_PANTALLA)):
+            coord = posiciones[:, eje]
+            fuera_inicio = coord - radios < 0
+            fuera_fin = ~fuera_inicio & (coord + radios > limite) # Mismo orden que el if/elif por dron
+            coord[fuera_inicio] = radios[fuera_inicio]
+            coord[fuera_fin] = limite - radios[fuera_fin]
+            velocidades[fuera_inicio | fuera_fin, eje] *= -0.5 # Invertir y amortiguar la velocidad en ese eje
+
     def _rk4_step(self, dr, dt):
         """
         Implementa un paso del método Runge-Kutta de 4º orden para el dron 'dr'.
@@ -267,58 +766,79 @@ class SimulationEngine:
         """
         Detecta colisiones entre drones, y drones con obstáculos.
         Si ocurre una colisión, llama a dr.manejar_colision() que puede inactivar el dron.
+        Las distancias de todos los pares candidatos se calculan en bloque (_buscar_colisiones); luego las colisiones
+        encontradas se resuelven en el orden del doble bucle original (_resolver_colisiones).
+        """
+        self._resolver_colisiones(*self._buscar_colisiones())
+
+    def _buscar_colisiones(self):
+        """
+        Retorna (drones en colisión con un obstáculo, una vez por obstáculo, en el orden (dron, obstáculo);
+        pares (i, j) de drones en colisión, con i < j, ordenados por (i, j)), con las posiciones actuales.
         """
+        posiciones, radios = self.estado.posiciones, self.estado.radios
+
         # Colisión dron-obstáculo
-        for dr in self.drones:
-            if not dr.esta_activo:
-                continue
-            for obs in self.obstaculos:
-                if not obs.esta_activo:
-                    continue
-                # Distancia entre centros de dron y obstáculo
-                d = np.linalg.norm(dr.posicion - obs.posicion)
-                # Umbral para considerar colisión (superposición menos un margen)
-                umbral = dr.radio + obs.radio - self.config.DISTANCIA_COLISION_DRON_OBSTACULO
-                if d < umbral:
-                    antes_activo = dr.esta_activo
-                    dr.manejar_colision("obstaculo", self.rng_drones) # rng_drones para la probabilidad de fallo
-                    if antes_activo and not dr.esta_activo: # Si el dron falló en esta colisión
-                        self.critical_collisions += 1
+        # Candidatos del índice de obstáculos, en el orden (dron, obstáculo) del doble bucle original
+        pares_obs_i, pares_obs_k = self._pares_obstaculos(
+            self._radio_max_dron() - self.config.DISTANCIA_COLISION_DRON_OBSTACULO
+        )
+        # Distancia entre centros de dron y obstáculo (mismo redondeo que np.linalg.norm por par)
+        d = _norma_filas(posiciones[pares_obs_i] - self.indice_obstaculos.posiciones[pares_obs_k])
+        # Umbral para considerar colisión (superposición menos un margen)
+        umbral = radios[pares_obs_i] + self.indice_obstaculos.radios[pares_obs_k] - self.config.DISTANCIA_COLISION_DRON_OBSTACULO
+        colisiones_obs = d < umbral
 
         # Colisión dron-dron (evita doble conteo y auto-colisión)
-        n_drones = len(self.drones)
-        for i in range(n_drones):
-            for j in range(i + 1, n_drones): # Solo pares (i, j) con j > i
-                d1, d2 = self.drones[i], self.drones[j]
-                if not d1.esta_activo or not d2.esta_activo:
-                    continue
-                dist = np.linalg.norm(d1.posicion - d2.posicion)
-                umbral_dron_dron = d1.radio + d2.radio - self.config.DISTANCIA_COLISION_DRON_DRON
-                if dist < umbral_dron_dron:
-                    antes_d1_activo, antes_d2_activo = d1.esta_activo, d2.esta_activo
-                    d1.manejar_colision("dron", self.rng_drones)
-                    d2.manejar_colision("dron", self.rng_drones) # Ambos tienen probabilidad de fallar
-                    if (antes_d1_activo and not d1.esta_activo) or \
-                       (antes_d2_activo and not d2.esta_activo):
-                        self.critical_collisions += 1 # Contar como una colisión crítica si al menos uno falla
+        # Solo se revisan los pares que el índice espacial encuentra dentro del mayor umbral posible
+        # Con la grilla se usa una de celdas del tamaño del umbral: la del rango sensorial revisaría demasiados pares
+        radio_colision = 2 * self._radio_max_dron() - self.config.DISTANCIA_COLISION_DRON_DRON
+        pares_i, pares_j = self._pares_drones(radio_colision, tamano_celda=radio_colision if radio_colision > 0 else None)
+        dist = _norma_filas(posiciones[pares_i] - posiciones[pares_j])
+        umbral_dron_dron = radios[pares_i] + radios[pares_j] - self.config.DISTANCIA_COLISION_DRON_DRON
+        colisiones = dist < umbral_dron_dron
+        return pares_obs_i[colisiones_obs], pares_i[colisiones], pares_j[colisiones]
+
+    def _resolver_colisiones(self, drones_obstaculo, pares_i, pares_j):
+        """
+        Resuelve las colisiones encontradas por _buscar_colisiones: primero las de (dron, obstáculo) y luego las (i, j),
+        de modo que los valores de rng_drones se consumen en el orden del doble bucle original y critical_collisions no cambia.
+        """
+        for i in drones_obstaculo:
+            dr = self.drones[i]
+            antes_activo = dr.esta_activo
+            dr.manejar_colision("obstaculo", self.rng_drones) # rng_drones para la probabilidad de fallo
+            if antes_activo and not dr.esta_activo: # Si el dron falló en esta colisión
+                self.critical_collisions += 1
+
+        activos = self.estado.activos
+        for i, j in zip(pares_i, pares_j): # Pares (i, j) con j > i, en el orden del doble bucle original
+            if not activos[i] or not activos[j]: # Un dron pudo fallar en una colisión anterior de este mismo paso
+                continue
+            d1, d2 = self.drones[i], self.drones[j]
+            d1.manejar_colision("dron", self.rng_drones)
+            d2.manejar_colision("dron", self.rng_drones) # Ambos tienen probabilidad de fallar
+            if not d1.esta_activo or not d2.esta_activo:
+                self.critical_collisions += 1 # Contar como una colisión crítica si al menos uno falla
 
     def _update_coverage(self):
         """
         Actualiza la grilla de cobertura basada en las posiciones de los drones activos.
         Calcula el porcentaje de cobertura.
+        Las celdas de todos los drones activos se marcan de una vez; el contador celdas_cubiertas solo suma
+        las que pasan de 0 a 1, así el costo es O(drones activos) y no O(celdas de la grilla).
+        Con RADIO_FOOTPRINT_COBERTURA > 0 cada dron cubre además las celdas cuyo centro está dentro de ese radio.
         """
         nx_grilla, ny_grilla = self.grilla.shape # Dimensiones de la grilla
-        for dr in self.drones:
-            if not dr.esta_activo:
-                continue
-            # Convertir posición del dron a índices de la grilla
-            ix = int(dr.posicion[0] // self.config.TAMANO_CELDA_COBERTURA)
-            iy = int(dr.posicion[1] // self.config.TAMANO_CELDA_COBERTURA)
-            
-            # Asegurar que los índices estén dentro de los límites de la grilla
-            if 0 <= ix < nx_grilla and 0 <= iy < ny_grilla:
-                if self.grilla[ix, iy] == 0: # Marcar solo si no estaba cubierta
-                    self.grilla[ix, iy] = 1
-        
-        covered_cells = np.sum(self.grilla)
-        self.coverage = (covered_cells / self.total_celdas) * 100 if self.total_celdas > 0 else 0
\ No newline at end of file
+        # Convertir posición de cada dron a índices de la grilla (con su huella)
+        ix, iy, _ = celdas_huella(self.estado.posiciones[self.estado.activos], self.config.TAMANO_CELDA_COBERTURA,
+                                  self.config.RADIO_FOOTPRINT_COBERTURA, nx_grilla, ny_grilla)
+        planos = ix * ny_grilla + iy
+        grilla_plana = self.grilla.reshape(-1) # Vista de la grilla (contigua)
+        self.celdas_nuevas = np.unique(planos[grilla_plana[planos] == 0]) # Marcar solo las que no estaban cubiertas
+        if len(self.celdas_nuevas):
+            grilla_plana[self.celdas_nuevas] = 1
+            self.celdas_cubiertas += len(self.celdas_nuevas)
+            self.campo_frontera.marcar_cubiertas(self.celdas_nuevas)
+
+        self.coverage = (self.celdas_cubiertas / self.total_celdas) * 100 if self.total_celdas > 0 else 0
\ No newline at end of file
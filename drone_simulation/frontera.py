@@ -0,0 +1,148 @@
+# drone_simulation/frontera.py
+import numpy as np
+
+# Máximo de celdas evaluadas a la vez al buscar el punto frontera de un grupo de drones (acota la memoria)
+MAX_CELDAS_POR_LOTE = 2_000_000
+
+class CampoFrontera:
+    """
+    Estructura para encontrar el punto frontera de todo el enjambre sin recorrer celda por celda.
+    Mantiene una tabla de sumas acumuladas (imagen integral) de las celdas NO cubiertas de la grilla,
+    que permite contar las celdas no cubiertas de cualquier ventana en O(1). En los pasos en que alguna
+    celda pasó de 0 a 1 (ver marcar_cubiertas) se recalculan solo las filas de la tabla desde la primera
+    fila x con celdas nuevas: O((nx - x_min) * ny) por paso con cambios, O(nx * ny) en el peor caso.
+
+    Para cada dron se busca (búsqueda binaria, vectorizada sobre todo el enjambre) el menor anillo k0 de
+    la ventana que contiene una celda no cubierta, y solo se evalúan las celdas hasta el anillo k_eval donde
+    podría estar una celda más cercana: O(log r + k_eval^2) por dron, con r el radio de búsqueda en celdas.
+    El resultado es el mismo que Drone._encontrar_punto_frontera:
+    la celda no cubierta más cercana a la posición del dron dentro de la ventana de búsqueda (sin contar
+    su propia celda), con el mismo desempate por orden de recorrido y el mismo respaldo aleatorio.
+
+    También atiende varios mundos a la vez (MotorConjunto): con una grilla (K, nx, ny) y 'mundos', el mundo de
+    cada dron, cada dron busca solo en la grilla de su mundo y la tabla se actualiza solo en los mundos marcados
+    (desde la menor de sus primeras filas con cambios).
+    """
+    def __init__(self, grilla, tamano_celda, radio_busqueda, mundos=None):
+        self.grilla = grilla # Referencia a la grilla de cobertura del motor (se modifica in situ)
+        self._grillas = grilla if grilla.ndim == 3 else grilla[None] # Vista (K, nx, ny); K = 1 para un solo mundo
+        self.mundos = mundos # Mundo de cada dron (None: todos en el mundo 0)
+        self.tamano_celda = tamano_celda
+        self.radio_celdas = int(radio_busqueda // tamano_celda) # Igual que en Drone._encontrar_punto_frontera
+        self._integral = None
+        # Primera fila x de la grilla de cada mundo cuyas filas de la tabla hay que recalcular (nx: al día)
+        self._fila_desde = np.zeros(len(self._grillas), dtype=np.int64)
+
+    def marcar_cubiertas(self, celdas=None):
+        """
+        Avisa que las 'celdas' pasaron a estar cubiertas: índices planos de la grilla (ix * ny + iy; con varios
+        mundos, w * nx * ny + ix * ny + iy). La tabla se actualiza en la próxima consulta, desde la primera fila
+        con cambios de cada mundo. Sin 'celdas' se recalcula completa.
+        """
+        _, nx, ny = self._grillas.shape
+        if celdas is None:
+            self._fila_desde[:] = 0
+            return
+        celdas = np.asarray(celdas)
+        np.minimum.at(self._fila_desde, celdas // (nx * ny), celdas % (nx * ny) // ny)
+
+    def _tabla_integral(self):
+        k, nx, ny = self._grillas.shape
+        if self._integral is None:
+            self._integral = np.zeros((k, nx + 1, ny + 1), dtype=np.int64)
+            self._fila_desde[:] = 0
+        w = np.flatnonzero(self._fila_desde < nx)
+        if len(w):
+            # Las celdas solo pasan de 0 a 1: las filas x < x0 de la tabla (celdas [0, x) x [0, y)) no cambian, y
+            # cada fila siguiente es la anterior más la suma acumulada de su fila de la grilla
+            x0 = int(self._fila_desde[w].min())
+            filas = (self._grillas[w, x0:] == 0).cumsum(axis=2).cumsum(axis=1)
+            self._integral[w, x0 + 1:, 1:] = self._integral[w, x0, 1:][:, None, :] + filas
+            self._fila_desde[w] = nx
+        return self._integral
+
+    def _contar_no_cubiertas(self, w, cx, cy, k):
+        """Celdas no cubiertas en la ventana [cx-k, cx+k] x [cy-k, cy+k] del mundo w, sin contar la celda (cx, cy)."""
+        _, nx, ny = self._grillas.shape
+        tabla = self._tabla_integral()
+        x0, x1 = np.clip(cx - k, 0, nx), np.clip(cx + k + 1, 0, nx)
+        y0, y1 = np.clip(cy - k, 0, ny), np.clip(cy + k + 1, 0, ny)
+        total = tabla[w, x1, y1] - tabla[w, x0, y1] - tabla[w, x1, y0] + tabla[w, x0, y0]
+        propia_dentro = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        propia_no_cubierta = np.zeros(len(cx), dtype=bool)
+        propia_no_cubierta[propia_dentro] = self._grillas[w[propia_dentro], cx[propia_dentro], cy[propia_dentro]] == 0
+        return total - propia_no_cubierta
+
+    def _celda_mas_cercana(self, posiciones, w, cx, cy, k):
+        """
+        Para cada dron, centro de la celda no cubierta más cercana en la ventana de radio k (excluida la propia).
+        El desempate coincide con el recorrido dx externo, dy interno y comparación estricta.
+        """
+        _, nx, ny = self._grillas.shape
+        s = self.tamano_celda
+        rango = np.arange(-k, k + 1)
+        dx = np.repeat(rango, 2 * k + 1) # Orden de recorrido: dx en el bucle externo, dy en el interno
+        dy = np.tile(rango, 2 * k + 1)
+        celda_x = cx[:, None] + dx[None, :]
+        celda_y = cy[:, None] + dy[None, :]
+        validas = ((celda_x >= 0) & (celda_x < nx) & (celda_y >= 0) & (celda_y < ny)) & ~((dx == 0) & (dy == 0))[None, :]
+        celda_w = np.broadcast_to(w[:, None], celda_x.shape)
+        validas[validas] = self._grillas[celda_w[validas], celda_x[validas], celda_y[validas]] == 0
+        punto_x = (celda_x + 0.5) * s
+        punto_y = (celda_y + 0.5) * s
+        dist_sq = (punto_x - posiciones[:, 0, None])**2 + (punto_y - posiciones[:, 1, None])**2
+        dist_sq[~validas] = np.inf
+        mejor = np.argmin(dist_sq, axis=1) # Primer mínimo: mismo desempate que la comparación estricta
+        filas = np.arange(len(cx))
+        return np.stack([punto_x[filas, mejor], punto_y[filas, mejor]], axis=1)
+
+    def puntos_frontera(self, posiciones, activos, radios, ancho, alto, rng_decision):
+        """
+        Retorna un arreglo (N, 2) con el punto frontera de cada dron (NaN para drones inactivos).
+        Los drones sin celdas no cubiertas en su ventana toman un punto aleatorio del mapa, consumiendo
+        dos valores de rng_decision en el orden de los drones, igual que el cálculo por dron.
+        Con varios mundos, rng_decision es una secuencia con el RNG de decisiones de cada mundo.
+        """
+        n = len(posiciones)
+        puntos = np.full((n, 2), np.nan)
+        idx_activos = np.flatnonzero(activos)
+        if len(idx_activos) == 0:
+            return puntos
+        pos = posiciones[idx_activos]
+        w = np.zeros(len(pos), dtype=np.int64) if self.mundos is None else self.mundos[idx_activos]
+        celdas = np.floor_divide(pos, self.tamano_celda).astype(np.int64)
+        cx, cy = celdas[:, 0], celdas[:, 1]
+        rc = self.radio_celdas
+
+        # Anillo mínimo k0 con alguna celda no cubierta (búsqueda binaria; el conteo crece con k)
+        con_frontera = self._contar_no_cubiertas(w, cx, cy, rc) > 0 if rc > 0 else np.zeros(len(pos), dtype=bool)
+        bajo = np.ones(len(pos), dtype=np.int64)
+        alto_k = np.full(len(pos), max(rc, 1), dtype=np.int64)
+        pendientes = con_frontera & (bajo < alto_k)
+        while pendientes.any():
+            medio = (bajo + alto_k) // 2
+            hay = self._contar_no_cubiertas(w[pendientes], cx[pendientes], cy[pendientes], medio[pendientes]) > 0
+            alto_k[pendientes] = np.where(hay, medio[pendientes], alto_k[pendientes])
+            bajo[pendientes] = np.where(hay, bajo[pendientes], medio[pendientes] + 1)
+            pendientes = con_frontera & (bajo < alto_k)
+
+        # Una celda del anillo k está a más de (k - 0.5) celdas y la del anillo k0 a lo sumo a sqrt(2)*(k0 + 0.5):
+        # basta evaluar la ventana hasta ese anillo (+1 de margen por redondeo)
+        k_eval = np.minimum(rc, np.floor(np.sqrt(2.0) * (bajo + 0.5) + 0.5).astype(np.int64) + 1)
+        for k in np.unique(k_eval[con_frontera]):
+            grupo = np.flatnonzero(con_frontera & (k_eval == k))
+            tam_lote = max(1, MAX_CELDAS_POR_LOTE // (2 * k + 1)**2)
+            for ini in range(0, len(grupo), tam_lote):
+                sub = grupo[ini:ini + tam_lote]
+                puntos[idx_activos[sub]] = self._celda_mas_cercana(pos[sub], w[sub], cx[sub], cy[sub], int(k))
+
+        # Como último recurso, un punto aleatorio en todo el mapa (en el orden de los drones)
+        for i in idx_activos[~con_frontera]:
+            rng = rng_decision if self.mundos is None else rng_decision[self.mundos[i]]
+            puntos[i] = [rng.next_float() * ancho, rng.next_float() * alto]
+
+        # Asegurar que el punto frontera no esté demasiado pegado a los bordes físicos del mapa
+        margen = radios[idx_activos] * 2
+        puntos[idx_activos, 0] = np.clip(puntos[idx_activos, 0], margen, ancho - margen)
+        puntos[idx_activos, 1] = np.clip(puntos[idx_activos, 1], margen, alto - margen)
+        return puntos
@@ -0,0 +1,93 @@
+# drone_simulation/fuerzas.py
+import numpy as np
+from .vecindad import pares_en_rango_bruto
+
+def pares_obstaculos_bruto(activos, num_obstaculos):
+    """Todos los pares (dron activo, obstáculo). El filtro por distancia lo aplica el consumidor."""
+    idx_activos = np.flatnonzero(activos)
+    return (np.repeat(idx_activos, num_obstaculos),
+            np.tile(np.arange(num_obstaculos), len(idx_activos)))
+
+def _sumar_por_indice(indices, valores, n):
+    """Suma las filas de 'valores' (m, 2) en las posiciones 'indices', retornando un arreglo (n, 2)."""
+    return np.stack([np.bincount(indices, weights=valores[:, 0], minlength=n),
+                     np.bincount(indices, weights=valores[:, 1], minlength=n)], axis=1)
+
+def calcular_fuerzas_lote(posiciones, velocidades, radios, activos, puntos_frontera,
+                          obst_posiciones, obst_radios, config, pares=None, pares_obstaculos=None):
+    """
+    Versión vectorizada de Drone.calcular_fuerzas para todo el enjambre a la vez.
+    F_i = F_frontera + F_cohesion + F_alineacion + F_separacion + F_obstaculos + F_bordes, limitada a MAX_FUERZA.
+
+    - puntos_frontera: arreglo (N, 2) con el punto frontera de cada dron (NaN si no tiene).
+    - obst_posiciones / obst_radios: obstáculos indexados por pares_obstaculos (si es None, solo los activos).
+    - pares / pares_obstaculos: pares candidatos (i, j) y (dron, obstáculo). Si son None se usan todos.
+    Los resultados coinciden con el cálculo por dron salvo el orden de las sumas (diferencias de redondeo).
+    """
+    cfg = config
+    n = len(posiciones)
+    fuerza_total = np.zeros((n, 2))
+    if n == 0:
+        return fuerza_total
+
+    # --- 1. Fuerza de Atracción a la Frontera (K_o) ---
+    vec_hacia_frontera = puntos_frontera - posiciones
+    dist_frontera = np.sqrt(vec_hacia_frontera[:, 0]**2 + vec_hacia_frontera[:, 1]**2)
+    with np.errstate(invalid='ignore'): # NaN (sin punto frontera) compara como False
+        con_frontera = activos & (dist_frontera > 0)
+    fuerza_total[con_frontera] += ((vec_hacia_frontera[con_frontera] / dist_frontera[con_frontera, None])
+                                   * cfg.K_FRONTIER_ATTRACTION)
+
+    # --- Interacciones con otros Drones (Cohesión, Alineación, Separación) ---
+    if pares is None:
+        pares = pares_en_rango_bruto(posiciones, activos, cfg.SENSOR_RANGE_DRONE)
+    i, j = pares
+    dist_vector = posiciones[j] - posiciones[i] # Vector (r_j - r_i)
+    distancia = np.sqrt(dist_vector[:, 0]**2 + dist_vector[:, 1]**2)
+    validos = (distancia > 0) & (distancia < cfg.SENSOR_RANGE_DRONE) & activos[i] & activos[j]
+    i, j, dist_vector, distancia = i[validos], j[validos], dist_vector[validos], distancia[validos]
+
+    # Cada par contribuye a ambos drones con signo opuesto (Cohesión y Separación) o con la velocidad del otro (Alineación)
+    idx = np.concatenate([i, j])
+    separacion_par = dist_vector / (distancia**2 + cfg.EPSILON_FUERZA)[:, None]
+    vecinos = np.bincount(idx, minlength=n)
+    cohesion = _sumar_por_indice(idx, np.concatenate([dist_vector, -dist_vector]), n)
+    alineacion = _sumar_por_indice(idx, np.concatenate([velocidades[j], velocidades[i]]), n)
+    separacion = _sumar_por_indice(idx, np.concatenate([-separacion_par, separacion_par]), n)
+
+    con_vecinos = vecinos > 0
+    cuenta = vecinos[con_vecinos, None]
+    fuerza_total[con_vecinos] += cfg.K_COHESION * (cohesion[con_vecinos] / cuenta)
+    fuerza_total[con_vecinos] += cfg.K_ALIGNMENT * (alineacion[con_vecinos] / cuenta - velocidades[con_vecinos])
+    fuerza_total[con_vecinos] += cfg.K_SEPARATION * separacion[con_vecinos]
+
+    # --- 5. Fuerza de Repulsión de Obstáculos ---
+    if len(obst_posiciones) > 0:
+        if pares_obstaculos is None:
+            pares_obstaculos = pares_obstaculos_bruto(activos, len(obst_posiciones))
+        io, ko = pares_obstaculos
+        dist_vector_obs = posiciones[io] - obst_posiciones[ko] # Vector (r_i - r_obs)
+        distancia_obs = np.sqrt(dist_vector_obs[:, 0]**2 + dist_vector_obs[:, 1]**2)
+        distancia_efectiva_superficie = distancia_obs - obst_radios[ko] - radios[io]
+        reacciona = (distancia_efectiva_superficie < cfg.DISTANCIA_REACCION_OBSTACULO) & (distancia_obs > 0) & activos[io]
+        fuerza_obs = (cfg.K_OBSTACLE_REPULSION * dist_vector_obs[reacciona]
+                      / (distancia_obs[reacciona]**2 + cfg.EPSILON_FUERZA)[:, None])
+        fuerza_total += _sumar_por_indice(io[reacciona], fuerza_obs, n)
+
+    # --- 6. Fuerza de Repulsión de Bordes ---
+    fuerza_bordes = np.zeros((n, 2))
+    for eje, limite in ((0, cfg.ANCHO_PANTALLA), (1, cfg.ALTO_PANTALLA)):
+        coord = posiciones[:, eje]
+        cerca_inicio = coord < cfg.DISTANCIA_REACCION_BORDE
+        cerca_fin = coord > limite - cfg.DISTANCIA_REACCION_BORDE
+        fuerza_bordes[cerca_inicio, eje] += cfg.K_BORDE_REPULSION / (coord[cerca_inicio] + cfg.EPSILON_FUERZA)
+        fuerza_bordes[cerca_fin, eje] -= cfg.K_BORDE_REPULSION / (limite - coord[cerca_fin] + cfg.EPSILON_FUERZA)
+    fuerza_total += fuerza_bordes
+
+    # Limitar la magnitud de la fuerza total
+    norma_fuerza = np.sqrt(fuerza_total[:, 0]**2 + fuerza_total[:, 1]**2)
+    excede = norma_fuerza > cfg.MAX_FUERZA
+    fuerza_total[excede] = (fuerza_total[excede] / norma_fuerza[excede, None]) * cfg.MAX_FUERZA
+
+    fuerza_total[~activos] = 0.0 # Los drones inactivos no calculan ni aplican fuerzas
+    return fuerza_total
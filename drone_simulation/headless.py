@@ -0,0 +1,199 @@
+# drone_simulation/headless.py
+"""
+Ejecución sin ventana del simulador para corridas por lotes (Monte Carlo).
+Avanza SimulationEngine.paso tan rápido como permita la CPU (sin pygame ni límite de FPS) durante un tiempo
+simulado fijo o hasta alcanzar una cobertura objetivo, y escribe una línea JSON por corrida con las métricas
+finales: cobertura, critical_collisions, activaciones de la CBF y el tiempo simulado hasta cada hito de cobertura.
+
+Con --conjunto las corridas se avanzan juntas en un MotorConjunto (ver conjunto.py), con los mismos resultados.
+Con --memoria-compartida NOMBRE cada paso se publica en memoria compartida (ver memoria_compartida.py) para seguir
+las corridas en vivo desde otro proceso, y con --trayectoria RUTA cada paso se graba en un archivo (ver trayectoria.py).
+
+Uso: python headless.py [--segundos 60] [--cobertura-objetivo 90] [--hitos 50 75 90] [--corridas 1] [--conjunto]
+                        [--set NUM_DRONES_INICIAL=200 CBF_MODO=lote ...] [--salida metricas.jsonl] [--use-runtime-config]
+                        [--memoria-compartida NOMBRE] [--trayectoria corrida_{corrida}.tray]
+"""
+import sys, ast, copy, json, time, argparse
+from .rng_handler import load_config_runtime, init_rngs
+from .engine import SimulationEngine
+from .conjunto import MotorConjunto
+from .memoria_compartida import CanalCompartido
+from .trayectoria import GrabadorTrayectoria
+
+HITOS_COBERTURA = (50.0, 75.0, 90.0) # Porcentajes de cobertura cuyo tiempo de llegada se reporta por defecto
+
+def _valor_desde_texto(texto):
+    """Interpreta 'texto' como literal de Python (número, booleano, None, tupla...); si no lo es, lo deja como cadena."""
+    try:
+        return ast.literal_eval(texto)
+    except (ValueError, SyntaxError):
+        return texto
+
+def aplicar_asignaciones(cfg, asignaciones):
+    """Aplica asignaciones 'CLAVE=valor' sobre la configuración. Las claves deben existir en config.py."""
+    for asignacion in asignaciones:
+        clave, sep, texto = asignacion.partition("=")
+        clave = clave.strip()
+        if not sep or not clave:
+            raise ValueError(f"Asignación inválida: '{asignacion}'. Use CLAVE=valor.")
+        if not hasattr(cfg, clave):
+            raise ValueError(f"Parámetro de configuración desconocido: '{clave}'.")
+        setattr(cfg, clave, _valor_desde_texto(texto.strip()))
+    return cfg
+
+def semillas_corrida(cfg, corrida):
+    """
+    Desplaza las semillas de la configuración en 'corrida' para que cada corrida sea una muestra distinta.
+    Las semillas None (aleatorias) se dejan como están; la corrida 0 usa las semillas tal cual.
+    """
+    if cfg.GCL_SEED_ENTORNO is not None:
+        cfg.GCL_SEED_ENTORNO += corrida
+    if cfg.MIDDLE_SQUARE_SEED_DRONES is not None:
+        cfg.MIDDLE_SQUARE_SEED_DRONES = (cfg.MIDDLE_SQUARE_SEED_DRONES + corrida) % 10**cfg.N_DIGITS_MIDDLE_SQUARE
+    if cfg.GCL_SEED_OBSTACULOS_DYN is not None:
+        cfg.GCL_SEED_OBSTACULOS_DYN += corrida
+    return cfg
+
+def ejecutar_corrida(cfg, segundos, cobertura_objetivo=None, hitos=HITOS_COBERTURA, canal=None, trayectoria=None):
+    """
+    Simula hasta 'segundos' de tiempo simulado (o hasta que la cobertura llegue a 'cobertura_objetivo', en %)
+    y retorna un diccionario con las métricas finales. Los hitos no alcanzados se reportan como None.
+    Si se da 'canal' (CanalCompartido), el motor publica en él cada paso; si se da 'trayectoria' (ruta), cada
+    paso se graba en ese archivo.
+    """
+    rngs = init_rngs(cfg)
+    motor = SimulationEngine(cfg, rngs)
+    motor.canal_compartido = canal
+    if trayectoria:
+        motor.grabador_trayectoria = GrabadorTrayectoria.para_config(trayectoria, cfg)
+    pasos_max = max(1, round(segundos / cfg.DELTA_T))
+    pendientes = sorted(hitos)
+    tiempo_hitos = {}
+    pasos = 0
+    t0 = time.perf_counter()
+    while pasos < pasos_max:
+        motor.paso()
+        pasos += 1
+        while pendientes and motor.coverage >= pendientes[0]:
+            tiempo_hitos[pendientes.pop(0)] = motor.time
+        if cobertura_objetivo is not None and motor.coverage >= cobertura_objetivo:
+            break
+    reloj = time.perf_counter() - t0
+    if motor.grabador_trayectoria is not None:
+        motor.grabador_trayectoria.cerrar()
+    return _metricas(motor, rngs, pasos, cobertura_objetivo, hitos, tiempo_hitos, reloj)
+
+def ejecutar_conjunto(cfg, lista_rngs, segundos, cobertura_objetivo=None, hitos=HITOS_COBERTURA):
+    """
+    Como ejecutar_corrida, pero con un mundo por cada juego de RNG de 'lista_rngs' avanzados juntos en un
+    MotorConjunto. Las métricas de cada mundo se toman al alcanzar 'cobertura_objetivo' (o al final) y coinciden
+    con las de su corrida individual; el conjunto se detiene cuando todos los mundos terminaron.
+    Retorna una lista de diccionarios (uno por mundo); el tiempo de reloj es el del conjunto completo.
+    """
+    motor = MotorConjunto(cfg, lista_rngs)
+    pasos_max = max(1, round(segundos / cfg.DELTA_T))
+    pendientes = [sorted(hitos) for _ in motor.mundos]
+    tiempo_hitos = [{} for _ in motor.mundos]
+    terminados = {} # Mundo -> métricas al alcanzar el objetivo
+    pasos = 0
+    t0 = time.perf_counter()
+    while pasos < pasos_max and len(terminados) < len(motor.mundos):
+        motor.paso()
+        pasos += 1
+        for w, mundo in enumerate(motor.mundos):
+            if w in terminados:
+                continue
+            while pendientes[w] and mundo.coverage >= pendientes[w][0]:
+                tiempo_hitos[w][pendientes[w].pop(0)] = mundo.time
+            if cobertura_objetivo is not None and mundo.coverage >= cobertura_objetivo:
+                terminados[w] = _metricas(mundo, lista_rngs[w], pasos, cobertura_objetivo, hitos, tiempo_hitos[w], None)
+    reloj = time.perf_counter() - t0
+
+    resultados = []
+    for w, mundo in enumerate(motor.mundos):
+        metricas = terminados.get(w) or _metricas(mundo, lista_rngs[w], pasos, cobertura_objetivo, hitos, tiempo_hitos[w], None)
+        metricas["segundos_reloj"] = reloj
+        metricas["pasos_por_segundo"] = pasos / reloj if reloj > 0 else None # Pasos del conjunto (todos los mundos)
+        resultados.append(metricas)
+    return resultados
+
+def _metricas(motor, rngs, pasos, cobertura_objetivo, hitos, tiempo_hitos, reloj):
+    """Diccionario de métricas de una corrida (o de un mundo de un conjunto) en su estado actual."""
+    return {
+        "semillas": {
+            "GCL_SEED_ENTORNO": rngs[0].initial_seed, # Las semillas aleatorias se reportan para poder repetir la corrida
+            "MIDDLE_SQUARE_SEED_DRONES": rngs[1].initial_seed,
+            "GCL_SEED_OBSTACULOS_DYN": rngs[2].initial_seed,
+        },
+        "pasos": pasos,
+        "tiempo_simulado": motor.time,
+        "coverage": motor.coverage,
+        "critical_collisions": motor.critical_collisions,
+        "cbf_activaciones": motor.cbf_activaciones_total,
+        "rng_drones_ciclo": None if motor.ciclo_rng_drones is None else { # Ciclo de Cuadrados Medios desde el inicio
+            "valores_previos": motor.ciclo_rng_drones[0], "largo": motor.ciclo_rng_drones[1], "alcanzado": motor.rng_drones.en_ciclo(),
+        },
+        "drones_activos": int(motor.estado.activos.sum()),
+        "drones_totales": motor.estado.n,
+        "objetivo_alcanzado": None if cobertura_objetivo is None else bool(motor.coverage >= cobertura_objetivo),
+        "tiempo_hasta_cobertura": {f"{h:g}": tiempo_hitos.get(h) for h in sorted(hitos)},
+        "segundos_reloj": reloj,
+        "pasos_por_segundo": pasos / reloj if reloj else None,
+    }
+
+def _configuracion(parser, args):
+    """Configuración base de main: config.py (o config_runtime.json) con las asignaciones de --set."""
+    cfg = load_config_runtime() # Lee --use-runtime-config de sys.argv
+    try:
+        aplicar_asignaciones(cfg, args.asignaciones)
+    except ValueError as e:
+        parser.error(str(e))
+    cfg.VERBOSE = args.verbose and cfg.VERBOSE
+    return cfg
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--segundos', type=float, default=60.0, help="Tiempo simulado máximo por corrida (s)")
+    parser.add_argument('--cobertura-objetivo', type=float, default=None, help="Detener la corrida al alcanzar esta cobertura (%%)")
+    parser.add_argument('--hitos', type=float, nargs='+', default=list(HITOS_COBERTURA), help="Coberturas (%%) cuyo tiempo de llegada se reporta")
+    parser.add_argument('--corridas', type=int, default=1, help="Corridas a ejecutar; la corrida k desplaza las semillas en k")
+    parser.add_argument('--conjunto', action='store_true', help="Avanzar todas las corridas juntas en un MotorConjunto (mismos resultados)")
+    parser.add_argument('--set', dest='asignaciones', nargs='+', default=[], metavar='CLAVE=valor', help="Sobrescribe parámetros de config.py")
+    parser.add_argument('--salida', default=None, help="Archivo JSONL de salida (por defecto, la salida estándar)")
+    parser.add_argument('--verbose', action='store_true', help="Mantener los mensajes de config.VERBOSE (se mezclan con la salida)")
+    parser.add_argument('--use-runtime-config', action='store_true', help="Partir de config_runtime.json (como main.py)")
+    parser.add_argument('--memoria-compartida', default=None, metavar='NOMBRE', help="Publicar cada paso en este bloque de memoria compartida")
+    parser.add_argument('--trayectoria', default=None, metavar='RUTA', help="Grabar cada paso en este archivo ({corrida} se reemplaza por el número de corrida)")
+    args = parser.parse_args(argv)
+    if args.memoria_compartida and args.conjunto:
+        parser.error("--memoria-compartida publica un solo motor; no se combina con --conjunto.")
+    if args.trayectoria and args.conjunto:
+        parser.error("--trayectoria graba un solo motor; no se combina con --conjunto.")
+    if args.trayectoria and args.corridas > 1 and "{corrida}" not in args.trayectoria:
+        parser.error("Con varias corridas, --trayectoria debe incluir {corrida} (p. ej. corrida_{corrida}.tray).")
+
+    salida = open(args.salida, "w") if args.salida else sys.stdout
+    canal = CanalCompartido.para_config(_configuracion(parser, args), args.memoria_compartida) if args.memoria_compartida else None
+    try:
+        if args.conjunto:
+            cfg = _configuracion(parser, args)
+            lista_rngs = [init_rngs(semillas_corrida(copy.copy(cfg), corrida)) for corrida in range(args.corridas)]
+            resultados = ejecutar_conjunto(cfg, lista_rngs, args.segundos, args.cobertura_objetivo, args.hitos)
+            for corrida, metricas in enumerate(resultados):
+                salida.write(json.dumps({"corrida": corrida, **metricas}) + "\n")
+            return
+        for corrida in range(args.corridas):
+            cfg = semillas_corrida(_configuracion(parser, args), corrida)
+            metricas = {"corrida": corrida}
+            trayectoria = args.trayectoria.format(corrida=corrida) if args.trayectoria else None
+            metricas.update(ejecutar_corrida(cfg, args.segundos, args.cobertura_objetivo, args.hitos, canal, trayectoria))
+            salida.write(json.dumps(metricas) + "\n")
+            salida.flush() # Cada corrida queda escrita aunque se interrumpa el lote
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+        if canal is not None:
+            canal.cerrar()
+
+if __name__ == "__main__":
+    main()
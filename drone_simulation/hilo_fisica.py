@@ -0,0 +1,180 @@
+# drone_simulation/hilo_fisica.py
+"""
+Física en un hilo propio, desacoplada del dibujo.
+HiloFisica avanza el SimulationEngine a paso fijo (DELTA_T) al ritmo multiplicador * tiempo real, o tan rápido como
+pueda si la máquina no alcanza, y publica Instantaneas inmutables del estado. La interfaz dibuja interpolando entre
+las dos últimas, así un fotograma lento no frena la física ni un paso lento congela la ventana.
+El motor solo lo toca el hilo de física: las acciones de la interfaz (resetear, añadir o quitar drones) se encolan
+y se aplican entre pasos. No importa pygame.
+"""
+import time
+import queue
+import threading
+import numpy as np
+
+def _solo_lectura(arreglo):
+    arreglo.flags.writeable = False
+    return arreglo
+
+class Instantanea:
+    """
+    Copia inmutable de lo que la interfaz necesita para dibujar un fotograma: grilla de cobertura, drones
+    (posición, radio, color, ID, actividad), obstáculos activos y métricas. Los nombres coinciden con los del
+    motor (grilla, celdas_cubiertas, time, coverage, critical_collisions), así las capas de render.py aceptan ambos.
+    """
+    __slots__ = ('paso', 'instante', 'grilla', 'celdas_cubiertas', 'time', 'coverage', 'critical_collisions',
+                 'posiciones', 'radios', 'activos', 'colores', 'ids', 'obstaculos', '_origen')
+
+    @classmethod
+    def de_motor(cls, engine, paso=0, anterior=None):
+        """
+        Toma la instantánea del estado actual del motor. La grilla solo se copia si cambió desde 'anterior'
+        (misma grilla de origen y mismo número de celdas cubiertas: las celdas únicamente pasan de 0 a 1).
+        """
+        ins = cls()
+        ins.paso = paso # Pasos de física desde que arrancó el hilo
+        ins.instante = time.perf_counter() # Tiempo de reloj de la publicación (para interpolar)
+        ins._origen = engine.grilla # Otra grilla de origen implica que el motor se reseteó
+        if anterior is not None and anterior._origen is engine.grilla and anterior.celdas_cubiertas == engine.celdas_cubiertas:
+            ins.grilla = anterior.grilla
+        else:
+            ins.grilla = _solo_lectura(engine.grilla.copy())
+        ins.celdas_cubiertas = engine.celdas_cubiertas
+        ins.time = engine.time
+        ins.coverage = engine.coverage
+        ins.critical_collisions = engine.critical_collisions
+        ins.posiciones = _solo_lectura(engine.estado.posiciones.copy())
+        ins.radios = _solo_lectura(engine.estado.radios.copy())
+        ins.activos = _solo_lectura(engine.estado.activos.copy())
+        ins.colores = tuple(dron.color for dron in engine.drones)
+        ins.ids = tuple(dron.id for dron in engine.drones)
+        # (x, y, radio, color) de los obstáculos activos (los dinámicos desaparecen mientras esperan reaparecer)
+        ins.obstaculos = tuple((float(obs.posicion[0]), float(obs.posicion[1]), obs.radio, obs.color)
+                               for obs in engine.obstaculos if obs.esta_activo)
+        return ins
+
+    def interpolar(self, siguiente, alfa):
+        """
+        Instantánea con las posiciones de los drones en alfa (0 = self, 1 = siguiente) y el resto de 'siguiente'.
+        Si entre ambas se reseteó el motor o cambió el número de drones se devuelve 'siguiente' sin interpolar.
+        """
+        if alfa >= 1 or siguiente._origen is not self._origen or len(siguiente.posiciones) != len(self.posiciones):
+            return siguiente
+        ins = Instantanea()
+        for nombre in Instantanea.__slots__:
+            setattr(ins, nombre, getattr(siguiente, nombre))
+        ins.posiciones = _solo_lectura(self.posiciones + max(alfa, 0.0) * (siguiente.posiciones - self.posiciones))
+        return ins
+
+class HiloFisica:
+    """
+    Avanza el motor en un hilo de fondo a paso fijo y publica instantáneas.
+    Con multiplicador m se intentan m * FPS pasos por segundo de reloj; si el hilo se atrasa más de
+    config.MAX_ATRASO_FISICA segundos, el atraso se descarta (la simulación va tan rápido como la máquina permite).
+    Se publica una instantánea al alcanzar el ritmo y, mientras se corre para alcanzarlo, como mucho una cada
+    config.PERIODO_INSTANTANEAS segundos.
+    """
+    def __init__(self, engine, multiplicador=1.0):
+        self.engine = engine
+        self.multiplicador = multiplicador # Pasos de simulación por paso de tiempo real (lo cambia la interfaz)
+        self.pausado = False
+        self.periodo_publicacion = engine.config.PERIODO_INSTANTANEAS
+        self.max_atraso = engine.config.MAX_ATRASO_FISICA
+        self.pasos = 0 # Pasos de física ejecutados por el hilo
+        self.error = None # Excepción que detuvo el hilo, si la hubo
+        self._comandos = queue.SimpleQueue() # Funciones sin argumentos que se ejecutan en el hilo de física
+        self._candado = threading.Lock()
+        self._detener = threading.Event()
+        inicial = Instantanea.de_motor(engine)
+        self._anterior, self._actual = inicial, inicial
+        self._hilo = threading.Thread(target=self._bucle, name="fisica", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def detener(self, espera=None):
+        """
+        Pide al hilo que termine y espera a que lo haga (como mucho 'espera' segundos; None: sin límite, el paso en
+        curso termina). Retorna True si el hilo terminó: solo entonces se pueden liberar el motor y lo que este
+        publica o graba en cada paso (canal_compartido, grabador_trayectoria).
+        """
+        self._detener.set()
+        self._hilo.join(espera)
+        return not self._hilo.is_alive()
+
+    def encolar(self, comando):
+        """Ejecuta comando() en el hilo de física antes del próximo paso (p. ej. engine._init_state)."""
+        self._comandos.put(comando)
+
+    def ultimas(self):
+        """(anterior, actual): las dos últimas instantáneas publicadas."""
+        with self._candado:
+            return self._anterior, self._actual
+
+    def instantanea_interpolada(self, ahora=None):
+        """
+        Instantánea para dibujar ahora: se dibuja un intervalo de publicación por detrás de la última, interpolando
+        entre las dos últimas según el tiempo de reloj transcurrido desde que se publicó.
+        """
+        anterior, actual = self.ultimas()
+        intervalo = actual.instante - anterior.instante
+        if intervalo <= 0:
+            return actual
+        ahora = time.perf_counter() if ahora is None else ahora
+        return anterior.interpolar(actual, (ahora - actual.instante) / intervalo)
+
+    def _publicar(self):
+        instantanea = Instantanea.de_motor(self.engine, self.pasos, self._actual)
+        with self._candado:
+            self._anterior, self._actual = self._actual, instantanea
+
+    def _aplicar_comandos(self):
+        aplicados = False
+        while True:
+            try:
+                comando = self._comandos.get_nowait()
+            except queue.Empty:
+                return aplicados
+            comando()
+            aplicados = True
+
+    def _bucle(self):
+        try:
+            self._bucle_pasos()
+        except Exception as e: # La interfaz lo muestra; el hilo no debe morir en silencio
+            self.error = e
+            raise
+
+    def _bucle_pasos(self):
+        dt = self.engine.config.DELTA_T
+        ancla, pasos_ancla, multiplicador = time.perf_counter(), 0, self.multiplicador # Ritmo medido desde el ancla
+        ultima_publicacion, sin_publicar = 0.0, False
+        while not self._detener.is_set():
+            if self._aplicar_comandos():
+                self._publicar() # Publicar ya: el cambio (reseteo, drones) se ve aunque esté en pausa
+                ultima_publicacion, sin_publicar = time.perf_counter(), False
+            ahora = time.perf_counter()
+            if self.pausado or self.multiplicador != multiplicador: # Reanclar: no recuperar el tiempo en pausa
+                ancla, pasos_ancla, multiplicador = ahora, 0, self.multiplicador
+            if self.pausado:
+                time.sleep(0.01)
+                continue
+
+            periodo_paso = dt / multiplicador # Segundos de reloj por paso de simulación
+            objetivo = (ahora - ancla) / periodo_paso # Pasos que ya deberían haberse ejecutado desde el ancla
+            if pasos_ancla >= objetivo: # Al día: publicar lo pendiente y esperar hasta el próximo paso
+                if sin_publicar:
+                    self._publicar()
+                    ultima_publicacion, sin_publicar = ahora, False
+                time.sleep(min((pasos_ancla + 1 - objetivo) * periodo_paso, 0.01))
+                continue
+            if (objetivo - pasos_ancla) * periodo_paso > self.max_atraso: # La máquina no alcanza: descartar el atraso
+                ancla = ahora - pasos_ancla * periodo_paso
+
+            self.engine.paso()
+            self.pasos += 1
+            pasos_ancla += 1
+            sin_publicar = True
+            if ahora - ultima_publicacion >= self.periodo_publicacion:
+                self._publicar()
+                ultima_publicacion, sin_publicar = time.perf_counter(), False
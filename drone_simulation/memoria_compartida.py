@@ -0,0 +1,205 @@
+# drone_simulation/memoria_compartida.py
+"""
+Publicación del estado del motor en memoria compartida, para que otros procesos (un dashboard, un visor) lo sigan
+en vivo sin frenar la simulación ni copiar datos por tuberías.
+CanalCompartido crea un bloque multiprocessing.shared_memory con un anillo de NUM frames; SimulationEngine.paso
+escribe en el frame siguiente posiciones, velocidades, drones activos y la grilla de cobertura. Cada frame tiene un
+contador tipo seqlock (impar mientras se escribe, par cuando está completo): LectorCompartido entrega vistas NumPy
+sobre el frame más reciente sin copiarlo, y FrameCompartido.vigente() dice si el escritor ya lo reutilizó.
+Con un anillo de K frames, un frame leído sigue vigente durante los K - 1 pasos siguientes.
+
+Disposición del bloque (todo int64 / float64 alineado a 8 bytes; ver _disposicion):
+    cabecera global: MAGIA, VERSION, num_frames, capacidad, nx, ny, último frame publicado, bytes por frame,
+                     pid del resource_tracker del escritor
+    por frame: cabecera (seq, número, n, celdas_cubiertas, t_ns de publicación, time), posiciones (cap, 2) float64,
+               velocidades (cap, 2) float64, activos (cap,) uint8, grilla (nx, ny) uint8
+
+El orden de las escrituras (seq impar, datos, seq par, último) lo preserva el modelo de memoria de x86; es la
+plataforma en que se usa el simulador.
+"""
+import time
+import warnings
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+MAGIA = 0x4452_4F4E_4553 # "DRONES"
+VERSION = 1
+# Índices de la cabecera global
+_G_MAGIA, _G_VERSION, _G_FRAMES, _G_CAPACIDAD, _G_NX, _G_NY, _G_ULTIMO, _G_BYTES_FRAME, _G_TRACKER = range(9)
+_ENTEROS_GLOBALES = 16
+# Índices de la cabecera de cada frame (time se guarda como float64 en la posición _F_TIME)
+_F_SEQ, _F_NUMERO, _F_N, _F_CUBIERTAS, _F_T_NS, _F_TIME = range(6)
+_ENTEROS_CABECERA = 8
+
+def _alinear(bytes_):
+    return (bytes_ + 7) // 8 * 8
+
+def _disposicion(capacidad, nx, ny):
+    """Desplazamientos (bytes) de cada arreglo dentro de un frame y el tamaño del frame."""
+    desplazamientos = {}
+    cursor = 0
+    for nombre, tamano in (("cabecera", _ENTEROS_CABECERA * 8), ("posiciones", capacidad * 2 * 8),
+                           ("velocidades", capacidad * 2 * 8), ("activos", capacidad), ("grilla", nx * ny)):
+        desplazamientos[nombre] = cursor
+        cursor += _alinear(tamano)
+    return desplazamientos, cursor
+
+def _pid_resource_tracker():
+    """PID del proceso resource_tracker de este proceso (lo heredan los procesos hijos), o 0 si no se conoce."""
+    return getattr(resource_tracker._resource_tracker, "_pid", None) or 0
+
+class _Frame:
+    """Vistas NumPy (sin copia) sobre un frame del anillo."""
+    def __init__(self, buf, inicio, capacidad, nx, ny):
+        desplazamientos, _ = _disposicion(capacidad, nx, ny)
+        vista = lambda nombre, dtype, forma: np.ndarray(forma, dtype, buf, inicio + desplazamientos[nombre])
+        self.cabecera = vista("cabecera", np.int64, (_ENTEROS_CABECERA,))
+        self.time = np.ndarray((1,), np.float64, buf, inicio + _F_TIME * 8) # Comparte la posición _F_TIME de la cabecera
+        self.posiciones = vista("posiciones", np.float64, (capacidad, 2))
+        self.velocidades = vista("velocidades", np.float64, (capacidad, 2))
+        self.activos = vista("activos", np.uint8, (capacidad,))
+        self.grilla = vista("grilla", np.uint8, (nx, ny))
+
+class CanalCompartido:
+    """
+    Escritor del anillo de frames. Un solo proceso (el del motor) escribe; se asigna al motor con
+    engine.canal_compartido = canal y SimulationEngine.paso llama a publicar(engine) al final de cada paso.
+    Drones por encima de 'capacidad' no se exportan (se advierte una vez).
+    """
+    def __init__(self, capacidad, forma_grilla, num_frames=4, nombre=None):
+        self.capacidad, (self.nx, self.ny), self.num_frames = int(capacidad), forma_grilla, int(num_frames)
+        _, bytes_frame = _disposicion(self.capacidad, self.nx, self.ny)
+        bytes_cabecera = _ENTEROS_GLOBALES * 8
+        self.memoria = shared_memory.SharedMemory(name=nombre, create=True, size=bytes_cabecera + self.num_frames * bytes_frame)
+        self.nombre = self.memoria.name
+        self._global = np.ndarray((_ENTEROS_GLOBALES,), np.int64, self.memoria.buf, 0)
+        self._frames = [_Frame(self.memoria.buf, bytes_cabecera + k * bytes_frame, self.capacidad, self.nx, self.ny)
+                        for k in range(self.num_frames)]
+        # Grilla y celdas cubiertas que tiene escritas cada frame: si no cambiaron no hace falta volver a copiarla
+        self._grilla_escrita = [(None, -1)] * self.num_frames
+        self.numero = -1 # Número del último frame publicado
+        self._advertir_capacidad = True
+        self._global[:_G_TRACKER + 1] = (MAGIA, VERSION, self.num_frames, self.capacidad, self.nx, self.ny, -1,
+                                         bytes_frame, _pid_resource_tracker())
+
+    @classmethod
+    def para_config(cls, config, nombre=None):
+        """Canal con la capacidad y el anillo de la configuración, para la grilla de cobertura que crea el motor con ella."""
+        forma_grilla = (config.ANCHO_PANTALLA // config.TAMANO_CELDA_COBERTURA, config.ALTO_PANTALLA // config.TAMANO_CELDA_COBERTURA)
+        return cls(config.MEMORIA_COMPARTIDA_CAPACIDAD, forma_grilla, config.MEMORIA_COMPARTIDA_FRAMES, nombre)
+
+    def publicar(self, engine):
+        """Escribe el estado actual del motor en el siguiente frame del anillo."""
+        numero = self.numero + 1
+        k = numero % self.num_frames
+        frame = self._frames[k]
+        estado = engine.estado
+        n = estado.n
+        if n > self.capacidad:
+            if self._advertir_capacidad:
+                self._advertir_capacidad = False
+                warnings.warn(f"El enjambre ({n} drones) supera MEMORIA_COMPARTIDA_CAPACIDAD ({self.capacidad}): "
+                              f"solo se publican los primeros {self.capacidad}.", RuntimeWarning)
+            n = self.capacidad
+
+        frame.cabecera[_F_SEQ] += 1 # Impar: el frame se está escribiendo
+        frame.posiciones[:n] = estado.posiciones[:n]
+        frame.velocidades[:n] = estado.velocidades[:n]
+        frame.activos[:n] = estado.activos[:n]
+        grilla_escrita, cubiertas_escritas = self._grilla_escrita[k]
+        if grilla_escrita is not engine.grilla or cubiertas_escritas != engine.celdas_cubiertas: # Las celdas solo pasan de 0 a 1
+            np.copyto(frame.grilla, engine.grilla, casting='unsafe')
+            self._grilla_escrita[k] = (engine.grilla, engine.celdas_cubiertas)
+        frame.cabecera[_F_NUMERO] = numero
+        frame.cabecera[_F_N] = n
+        frame.cabecera[_F_CUBIERTAS] = engine.celdas_cubiertas
+        frame.time[0] = engine.time
+        frame.cabecera[_F_T_NS] = time.perf_counter_ns()
+        frame.cabecera[_F_SEQ] += 1 # Par: completo
+        self._global[_G_ULTIMO] = numero
+        self.numero = numero
+
+    def cerrar(self):
+        """Libera el bloque (los lectores conectados dejan de recibir frames nuevos)."""
+        self._global, self._frames = None, None # Soltar las vistas antes de cerrar el buffer
+        self.memoria.close()
+        self.memoria.unlink()
+
+class FrameCompartido:
+    """
+    Frame publicado, visto sin copia. 'posiciones', 'velocidades', 'activos' (bool) y 'grilla' son vistas sobre la
+    memoria compartida: el escritor las reutiliza al dar la vuelta al anillo, así que tras usarlas hay que confirmar
+    vigente() (o pedir una copia con LectorCompartido.leer).
+    """
+    def __init__(self, frame, seq):
+        self._frame, self._seq = frame, seq
+        self.numero = int(frame.cabecera[_F_NUMERO]) # Pasos publicados desde que se creó el canal (desde 0)
+        self.n = n = int(frame.cabecera[_F_N])
+        self.celdas_cubiertas = int(frame.cabecera[_F_CUBIERTAS])
+        self.t_ns = int(frame.cabecera[_F_T_NS]) # time.perf_counter_ns() al publicarlo (mismo reloj en todos los procesos)
+        self.time = float(frame.time[0]) # Tiempo simulado
+        self.posiciones = frame.posiciones[:n]
+        self.velocidades = frame.velocidades[:n]
+        self.activos = frame.activos[:n].view(bool)
+        self.grilla = frame.grilla
+
+    def vigente(self):
+        """True si el escritor no empezó a sobrescribir este frame desde que se leyó."""
+        return self._frame.cabecera[_F_SEQ] == self._seq
+
+class LectorCompartido:
+    """
+    Se conecta al bloque de un CanalCompartido por su nombre (solo lectura: no escribe ni lo libera).
+    ultimo() da el frame más reciente sin copiarlo; leer() da una copia consistente.
+    """
+    def __init__(self, nombre):
+        self.memoria = shared_memory.SharedMemory(name=nombre)
+        self._global = np.ndarray((_ENTEROS_GLOBALES,), np.int64, self.memoria.buf, 0)
+        if self._global[_G_MAGIA] != MAGIA or self._global[_G_VERSION] != VERSION:
+            self.cerrar()
+            raise ValueError(f"'{nombre}' no es un canal de la simulación (versión {VERSION}).")
+        # Python < 3.13 registra también al lector en su resource_tracker, que liberaría el bloque al terminar este
+        # proceso (el dueño es el escritor). Si el lector comparte el tracker del escritor (proceso hijo) no hace falta
+        if _pid_resource_tracker() != self._global[_G_TRACKER]:
+            resource_tracker.unregister(self.memoria._name, "shared_memory")
+        self.num_frames, self.capacidad, self.nx, self.ny, bytes_frame = (
+            int(self._global[i]) for i in (_G_FRAMES, _G_CAPACIDAD, _G_NX, _G_NY, _G_BYTES_FRAME))
+        self._frames = [_Frame(self.memoria.buf, _ENTEROS_GLOBALES * 8 + k * bytes_frame, self.capacidad, self.nx, self.ny)
+                        for k in range(self.num_frames)]
+        self.reintentos = 0 # Lecturas descartadas porque el escritor estaba en el frame
+
+    def ultimo(self):
+        """Frame más reciente (FrameCompartido), o None si aún no se publicó ninguno."""
+        while True:
+            numero = int(self._global[_G_ULTIMO])
+            if numero < 0:
+                return None
+            frame = self._frames[numero % self.num_frames]
+            seq = int(frame.cabecera[_F_SEQ])
+            if seq % 2 == 0:
+                leido = FrameCompartido(frame, seq)
+                if leido.vigente() and leido.numero >= numero: # Cabecera consistente y no de una vuelta anterior
+                    return leido
+            self.reintentos += 1
+
+    def leer(self):
+        """Copia consistente del frame más reciente (FrameCompartido con arreglos propios), o None."""
+        while True:
+            leido = self.ultimo()
+            if leido is None:
+                return None
+            copias = [leido.posiciones.copy(), leido.velocidades.copy(), leido.activos.copy(), leido.grilla.copy()]
+            if leido.vigente():
+                leido.posiciones, leido.velocidades, leido.activos, leido.grilla = copias
+                return leido
+            self.reintentos += 1
+
+    def esperar(self, numero_anterior=-1, espera=1e-4):
+        """Espera activa (con pausas de 'espera' s) hasta que haya un frame posterior a 'numero_anterior' y lo retorna."""
+        while int(self._global[_G_ULTIMO]) <= numero_anterior:
+            time.sleep(espera)
+        return self.ultimo()
+
+    def cerrar(self):
+        self._global, self._frames = None, None
+        self.memoria.close()
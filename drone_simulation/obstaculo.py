@@ -1,5 +1,4 @@
 # drone_simulation/obstaculo.py
-import pygame
 import numpy as np
 import random # Para la decisión inicial si no se pasa rng_propio
 # from . import config # YA NO IMPORTAMOS EL CONFIG GLOBAL AQUÍ
@@ -41,8 +40,9 @@ class Obstaculo:
             self.contador_tiempo_estado = float('inf')
 
     def actualizar(self, delta_t, rng_para_nuevos_tiempos=None):
+        """Avanza el ciclo de vida del obstáculo dinámico. Retorna True si cambió su actividad o su posición."""
         if not self.es_dinamico:
-            return
+            return False
 
         rng_usar = rng_para_nuevos_tiempos if rng_para_nuevos_tiempos else self.rng_propio
         if rng_usar is None: rng_usar = random # Último fallback
@@ -55,6 +55,7 @@ class Obstaculo:
                                          (self.config_propia.TIEMPO_RESPAWN_OBSTACULO_MAX - self.config_propia.TIEMPO_RESPAWN_OBSTACULO_MIN) + \
                                          self.config_propia.TIEMPO_RESPAWN_OBSTACULO_MIN
             self.tiempo_respawn_configurado = self.contador_tiempo_estado
+            return True
         elif not self.esta_activo and self.contador_tiempo_estado <= 0:
             self.esta_activo = True
             
@@ -70,9 +71,9 @@ class Obstaculo:
                                          (self.config_propia.TIEMPO_VIDA_OBSTACULO_MAX - self.config_propia.TIEMPO_VIDA_OBSTACULO_MIN) + \
                                          self.config_propia.TIEMPO_VIDA_OBSTACULO_MIN
             self.tiempo_vida_configurado = self.contador_tiempo_estado
+            return True
+        return False
 
     def dibujar(self, pantalla):
-        if self.esta_activo:
-            pygame.draw.circle(pantalla, self.color, 
-                               (int(self.posicion[0]), int(self.posicion[1])), 
-                               int(self.radio))
\ No newline at end of file
+        from .render import dibujar_obstaculo # Solo la interfaz dibuja; el modelo no carga pygame
+        dibujar_obstaculo(pantalla, self)
@@ -0,0 +1,187 @@
+# drone_simulation/render.py
+"""
+Capa de dibujo y de teclado de la interfaz pygame.
+Es el único módulo del paquete (junto con ui.py) que importa pygame: el modelo (engine, drone, obstaculo, cbf, rng,
+rng_handler) no lo carga, y Drone.dibujar / Obstaculo.dibujar importan este módulo solo cuando se llaman.
+"""
+from collections import OrderedDict
+import numpy as np
+import pygame
+
+# Acciones de la interfaz asociadas a teclas (ver teclas_acciones)
+PAUSA, RESETEAR, ANADIR_DRON, QUITAR_DRON, RNG_TESTS, ACELERAR, DESACELERAR = (
+    "pausa", "resetear", "anadir_dron", "quitar_dron", "rng_tests", "acelerar", "desacelerar"
+)
+
+def teclas_acciones(config):
+    """Código de tecla de pygame -> acción. Las teclas editables vienen de config (TECLA_*, códigos enteros)."""
+    return {
+        config.TECLA_PAUSA_REANUDAR: PAUSA,
+        config.TECLA_RESETEAR: RESETEAR,
+        config.TECLA_ANADIR_DRON: ANADIR_DRON,
+        config.TECLA_QUITAR_DRON: QUITAR_DRON,
+        config.TECLA_EJECUTAR_RNG_TESTS: RNG_TESTS,
+        # Velocidad de simulación: teclado principal o numérico
+        pygame.K_PLUS: ACELERAR, pygame.K_KP_PLUS: ACELERAR,
+        pygame.K_MINUS: DESACELERAR, pygame.K_KP_MINUS: DESACELERAR,
+    }
+
+class CapaCobertura:
+    """
+    Superficie persistente con la grilla de cobertura, dibujada con un solo blit por fotograma.
+    Solo se redibujan las celdas que cambiaron desde el último fotograma: si la grilla es la misma (el motor, o la
+    copia que una Instantanea reutiliza mientras no cambia) y tiene las mismas celdas cubiertas, no hay nada que
+    hacer; si no, se comparan con las dibujadas. Si cambian muchas celdas a la vez (p. ej. al resetear), la
+    superficie se reconstruye desde el arreglo (surfarray, un píxel por celda, escalado al tamaño de celda).
+    """
+    FRACCION_RECONSTRUIR = 0.25 # Con más celdas cambiadas que esta fracción conviene reconstruir la superficie entera
+
+    def __init__(self, config):
+        self.tamano_celda = config.TAMANO_CELDA_COBERTURA
+        # Paleta: índice 0 = no cubierta, 1 = cubierta (RGB; las superficies de la pantalla no usan alfa)
+        self.paleta = np.array([config.COLOR_CELDA_NO_CUBIERTA[:3], config.COLOR_CELDA_CUBIERTA[:3]], dtype=np.uint8)
+        self.colores = (config.COLOR_CELDA_NO_CUBIERTA, config.COLOR_CELDA_CUBIERTA)
+        self.superficie = None # Superficie (nx * tamaño, ny * tamaño) con la grilla dibujada
+        self._grilla = None # Última grilla dibujada
+        self._dibujada = None # Copia de la grilla tal como está dibujada
+        self._cubiertas = 0 # Celdas cubiertas ya dibujadas
+
+    def _reconstruir(self, grilla):
+        celdas = pygame.surfarray.make_surface(self.paleta[(grilla != 0).astype(np.intp)]) # (nx, ny, 3): un píxel por celda
+        nx, ny = grilla.shape
+        self.superficie = pygame.transform.scale(celdas, (nx * self.tamano_celda, ny * self.tamano_celda))
+        self._dibujada = grilla != 0
+
+    def actualizar(self, fuente):
+        """
+        Lleva la superficie al estado de fuente.grilla, tocando solo las celdas que cambiaron.
+        'fuente' es el SimulationEngine o una Instantanea (ambos tienen grilla y celdas_cubiertas).
+        """
+        grilla = fuente.grilla
+        if self._dibujada is None or grilla.shape != self._dibujada.shape: # Primer fotograma u otra resolución
+            self._reconstruir(grilla)
+        elif grilla is not self._grilla or fuente.celdas_cubiertas != self._cubiertas:
+            cambiadas = np.flatnonzero((grilla != 0).reshape(-1) != self._dibujada.reshape(-1))
+            if len(cambiadas) > self.FRACCION_RECONSTRUIR * grilla.size:
+                self._reconstruir(grilla)
+            else:
+                ny = grilla.shape[1]
+                tamano = self.tamano_celda
+                for plano in cambiadas.tolist():
+                    i, j = divmod(plano, ny)
+                    cubierta = bool(grilla[i, j])
+                    self.superficie.fill(self.colores[cubierta], (i * tamano, j * tamano, tamano, tamano))
+                    self._dibujada[i, j] = cubierta
+        self._grilla = grilla
+        self._cubiertas = fuente.celdas_cubiertas
+
+    def dibujar(self, pantalla, fuente):
+        """Actualiza la superficie si hace falta y la copia a la pantalla."""
+        self.actualizar(fuente)
+        pantalla.blit(self.superficie, (0, 0))
+
+class CacheSprites:
+    """
+    Sprites pre-renderizados con expulsión LRU: círculos por (radio, color) y etiquetas de ID por número.
+    Cada círculo se dibuja una vez con pygame.draw.circle sobre una superficie con colorkey, así copiarlo con blit
+    da exactamente los mismos píxeles que dibujarlo en la pantalla.
+    """
+    def __init__(self, capacidad, color_texto):
+        self.capacidad = capacidad
+        self.color_texto = color_texto
+        self._sprites = OrderedDict() # Clave -> (superficie, desplazamiento x, desplazamiento y)
+        self._fuente = None # Fuente de las etiquetas; se crea con la primera etiqueta (requiere pygame.font.init)
+
+    def _obtener(self, clave, crear):
+        sprite = self._sprites.get(clave)
+        if sprite is None:
+            sprite = self._sprites[clave] = crear()
+            if len(self._sprites) > self.capacidad:
+                self._sprites.popitem(last=False) # Expulsar el de uso más antiguo
+        else:
+            self._sprites.move_to_end(clave)
+        return sprite
+
+    def circulo(self, radio, color):
+        """(superficie, dx, dy): el círculo de centro (x, y) se obtiene copiando la superficie en (x + dx, y + dy)."""
+        def crear():
+            lado = 2 * radio + 3 # Margen de un píxel a cada lado del círculo de pygame
+            fondo = (255, 0, 255) if tuple(color[:3]) != (255, 0, 255) else (0, 255, 0) # Colorkey distinto del color
+            superficie = pygame.Surface((lado, lado))
+            superficie.fill(fondo)
+            pygame.draw.circle(superficie, color, (radio + 1, radio + 1), radio)
+            superficie.set_colorkey(fondo, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                superficie = superficie.convert() # Mismo formato que la pantalla: blits más rápidos
+            return superficie, -radio - 1, -radio - 1
+        return self._obtener(("circulo", radio, tuple(color)), crear)
+
+    def etiqueta(self, id_dron):
+        """Superficie con el ID del dron."""
+        def crear():
+            if self._fuente is None:
+                self._fuente = pygame.font.SysFont(None, 18)
+            return self._fuente.render(str(id_dron), True, self.color_texto)
+        return self._obtener(("etiqueta", id_dron), crear)
+
+    def __len__(self):
+        return len(self._sprites)
+
+_cache_por_defecto = None # CacheSprites de dibujar_dron / dibujar_obstaculo (llamadas sueltas, fuera de CapaEnjambre)
+
+def _cache(config):
+    global _cache_por_defecto
+    if _cache_por_defecto is None:
+        _cache_por_defecto = CacheSprites(config.CAPACIDAD_CACHE_SPRITES, config.NEGRO)
+    return _cache_por_defecto
+
+def _sprites_obstaculo(cache, x, y, radio, color, lote):
+    superficie, dx, dy = cache.circulo(int(radio), color)
+    lote.append((superficie, (int(x) + dx, int(y) + dy)))
+
+def _sprites_dron(cache, x, y, radio, color, id_dron, con_etiqueta, lote):
+    superficie, dx, dy = cache.circulo(int(radio), color)
+    lote.append((superficie, (int(x) + dx, int(y) + dy)))
+    if con_etiqueta: # ID centrado encima del círculo
+        texto = cache.etiqueta(id_dron)
+        lote.append((texto, (int(x - texto.get_width() / 2), int(y - radio - texto.get_height() - 2))))
+
+class CapaEnjambre:
+    """
+    Dibuja obstáculos y drones de una Instantanea con un solo Surface.blits por fotograma, a partir de sprites
+    cacheados (CacheSprites). Solo los drones activos llevan su ID; nivel de detalle: con más de
+    config.MAX_DRONES_CON_ETIQUETA drones activos se omiten las etiquetas.
+    """
+    def __init__(self, config):
+        self.cache = CacheSprites(config.CAPACIDAD_CACHE_SPRITES, config.NEGRO)
+        self.max_drones_con_etiqueta = config.MAX_DRONES_CON_ETIQUETA
+
+    def dibujar(self, pantalla, instantanea):
+        lote = [] # (superficie, posición) en orden de dibujo: obstáculos, y cada dron seguido de su etiqueta
+        for x, y, radio, color in instantanea.obstaculos:
+            _sprites_obstaculo(self.cache, x, y, radio, color, lote)
+        etiquetas = int(np.count_nonzero(instantanea.activos)) <= self.max_drones_con_etiqueta
+        for (x, y), radio, color, id_dron, activo in zip(instantanea.posiciones.tolist(), instantanea.radios.tolist(),
+                                                         instantanea.colores, instantanea.ids, instantanea.activos.tolist()):
+            _sprites_dron(self.cache, x, y, radio, color, id_dron, etiquetas and activo, lote)
+        pantalla.blits(lote, doreturn=False)
+
+def dibujar_dron(pantalla, dron):
+    """
+    Dibuja el dron en la pantalla de Pygame.
+    Los drones activos se muestran con su color original y su ID; los inactivos con el color de dron inactivo
+    (Drone.manejar_colision cambia dron.color). Para dibujar todo el enjambre, CapaEnjambre agrupa los blits.
+    """
+    lote = []
+    _sprites_dron(_cache(dron.config_propia), dron.posicion[0], dron.posicion[1], dron.radio, dron.color, dron.id,
+                  dron.esta_activo, lote)
+    pantalla.blits(lote, doreturn=False)
+
+def dibujar_obstaculo(pantalla, obstaculo):
+    """Dibuja el obstáculo si está activo (los dinámicos desaparecen mientras esperan reaparecer)."""
+    if not obstaculo.esta_activo:
+        return
+    lote = []
+    _sprites_obstaculo(_cache(obstaculo.config_propia), obstaculo.posicion[0], obstaculo.posicion[1],
+                       obstaculo.radio, obstaculo.color, lote)
+    pantalla.blits(lote, doreturn=False)
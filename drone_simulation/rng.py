@@ -1,5 +1,14 @@
 # drone_simulation/rng.py
 import time # Solo para generar una semilla inicial si no se proporciona
+import numpy as np
+
+# Módulo máximo para generar bloques del LCG en uint64: (m - 1)^2 + (m - 1) < 2^64 y los estados caben exactos en float64
+MAX_MODULO_VECTORIZADO = 2**32
+# Cuadrados Medios: dígitos máximos para bloques en int64 (10^N exacto en float64), pasos máximos al buscar un ciclo
+# y tamaño de bloque desde el que next_floats busca el ciclo antes de generar
+MAX_DIGITOS_VECTORIZADO = 15
+MAX_PASOS_CICLO = 10**6
+MIN_BLOQUE_BUSCAR_CICLO = 1000
 
 class LCG:
     """Generador Congruencial Lineal: X_n+1 = (a * X_n + c) mod m."""
@@ -45,12 +54,76 @@ class LCG:
         range_width = upper_bound - lower_bound + 1
         return lower_bound + (self._next_raw() % range_width)
 
+    def _mapa_afin(self, n):
+        """
+        (A, C) tales que n pasos del generador equivalen a X -> (A * X + C) mod m, por exponenciación binaria
+        del mapa afín X -> a * X + c (componer f(X) = A1 X + C1 con g(X) = A2 X + C2 da A1 A2 X + A2 C1 + C2).
+        """
+        m = self.modulus
+        A, C = 1, 0 # Identidad
+        a, c = self.multiplier % m, self.increment % m # Mapa de 2^k pasos
+        while n > 0:
+            if n & 1:
+                A, C = (a * A) % m, (a * C + c) % m
+            a, c = (a * a) % m, (a * c + c) % m
+            n >>= 1
+        return A, C
+
+    def _next_raw_bloque(self, n):
+        """
+        Los próximos n estados (uint64), iguales a n llamadas a _next_raw. El bloque se duplica en cada vuelta:
+        con X_1..X_L calculados, X_L+1..X_2L = (A_L * X_1..X_L + C_L) mod m con el mapa afín de L pasos.
+        Requiere modulus <= MAX_MODULO_VECTORIZADO.
+        """
+        estados = np.empty(n, dtype=np.uint64)
+        if n <= 0:
+            return estados
+        m = self.modulus
+        A, C = self.multiplier % m, self.increment % m # Mapa de 'largo' pasos
+        estados[0] = (A * self.current_value + C) % m
+        largo = 1
+        while largo < n:
+            k = min(largo, n - largo)
+            estados[largo:largo + k] = (np.uint64(A) * estados[:k] + np.uint64(C)) % np.uint64(m)
+            A, C = (A * A) % m, (A * C + C) % m
+            largo += k
+        self.current_value = int(estados[-1])
+        return estados
+
+    def next_floats(self, n):
+        """
+        Arreglo con los próximos n flotantes en [0.0, 1.0), idéntico bit a bit a n llamadas a next_float
+        (los estados y el módulo son exactos en float64 y la división es la misma).
+        """
+        if self.modulus > MAX_MODULO_VECTORIZADO:
+            return np.array([self.next_float() for _ in range(n)], dtype=float)
+        return self._next_raw_bloque(n) / float(self.modulus)
+
+    def saltar(self, n):
+        """Avanza el generador n pasos en O(log n), como si se hubieran generado y descartado n valores."""
+        A, C = self._mapa_afin(n)
+        self.current_value = (A * self.current_value + C) % self.modulus
+
+    def subflujo(self, indice, longitud):
+        """
+        Nuevo LCG con los mismos parámetros que empieza 'indice * longitud' pasos después del estado actual.
+        Los subflujos 0, 1, 2... con la misma longitud no se solapan mientras cada uno genere a lo sumo 'longitud'
+        valores, así que procesos paralelos pueden repartirse un único flujo sin coordinarse.
+        """
+        sub = LCG(self.current_value, self.multiplier, self.increment, self.modulus)
+        sub.saltar(indice * longitud)
+        sub.initial_seed = sub.current_value
+        return sub
+
 class MiddleSquareRNG:
     """Generador de Cuadrados Medios."""
     def __init__(self, seed=None, num_digits=4):
         self.num_digits = num_digits
         self.max_seed_val = (10**self.num_digits) -1
         self.initial_seed = seed
+        self._divisor = 10**(self.num_digits - self.num_digits // 2) # Quita los dígitos de la derecha del cuadrado
+        self._modulo = 10**self.num_digits
+        self._ciclo = None # (estados del ciclo, {estado: posición}) encontrado por detectar_ciclo
 
         if seed is None:
             # Generar una semilla aleatoria de num_digits si no se provee
@@ -88,17 +161,9 @@ class MiddleSquareRNG:
             self.initial_seed = self.current_seed_int
 
     def _next_raw_int(self):
-        squared = self.current_seed_int ** 2
-        s_squared = str(squared).zfill(self.num_digits * 2) # Asegurar 2N dígitos con ceros a la izquierda
-        
-        # Extraer los N dígitos del medio
-        start_index = self.num_digits // 2 
-        # Si num_digits es par, ej 4: 2*N=8, start=2, end=2+4=6 -> s_squared[2:6]
-        # Si num_digits es impar, ej 3: 2*N=6, start=1, end=1+3=4 -> s_squared[1:4]
-        # La fórmula para el inicio del segmento medio de longitud N en una cadena de 2N es (2N - N) / 2 = N/2
-        middle_digits_str = s_squared[start_index : start_index + self.num_digits]
-        
-        self.current_seed_int = int(middle_digits_str)
+        # Los N dígitos del medio del cuadrado, escrito con 2N dígitos (ceros a la izquierda), son el cuadrado
+        # sin sus N - N//2 dígitos de la derecha, módulo 10^N. Ej. N=4: 2N=8, dígitos [2:6] -> (x^2 // 10^2) % 10^4
+        self.current_seed_int = (self.current_seed_int * self.current_seed_int // self._divisor) % self._modulo
         return self.current_seed_int
 
     def next_float(self):
@@ -106,6 +171,78 @@ class MiddleSquareRNG:
         # El entero raw es de 0 a 10^N - 1
         return self._next_raw_int() / (10**self.num_digits)
 
+    def next_floats(self, n):
+        """
+        Arreglo con los próximos n flotantes en [0.0, 1.0), idéntico bit a bit a n llamadas a next_float.
+        Los valores se generan uno a uno hasta que el estado entra en un ciclo ya conocido (ver detectar_ciclo);
+        desde ahí la secuencia es la repetición del ciclo y se completa sin iterar. Para bloques grandes se
+        busca el ciclo primero.
+        """
+        if n > MIN_BLOQUE_BUSCAR_CICLO and self._ciclo is None:
+            self.detectar_ciclo(max_pasos=n)
+        if self.num_digits > MAX_DIGITOS_VECTORIZADO:
+            return np.array([self.next_float() for _ in range(n)], dtype=float)
+
+        crudos = np.empty(n, dtype=np.int64)
+        divisor, modulo = self._divisor, self._modulo
+        posicion = self._ciclo[1] if self._ciclo is not None else {}
+        x = self.current_seed_int
+        k = 0
+        while k < n and x not in posicion:
+            x = (x * x // divisor) % modulo
+            crudos[k] = x
+            k += 1
+        if k < n:
+            estados = self._ciclo[0]
+            siguiente = (posicion[x] + 1) % len(estados)
+            crudos[k:] = np.resize(np.roll(estados, -siguiente), n - k)
+            x = int(crudos[-1])
+        self.current_seed_int = x
+        return crudos / float(modulo)
+
+    def detectar_ciclo(self, max_pasos=MAX_PASOS_CICLO):
+        """
+        Algoritmo de Brent desde el estado actual (sin avanzar el generador): retorna (mu, lam), donde mu es la
+        cantidad de valores antes de entrar al ciclo y lam su largo, o None si no se encuentra en ~max_pasos pasos.
+        Un ciclo de largo 1 en 0 es el colapso típico de Cuadrados Medios. El ciclo queda guardado para en_ciclo
+        y next_floats.
+        """
+        divisor, modulo = self._divisor, self._modulo
+        siguiente = lambda x: (x * x // divisor) % modulo
+        x0 = self.current_seed_int
+        # Fase 1: largo del ciclo, con la tortuga en potencias de 2
+        potencia = lam = 1
+        tortuga, liebre = x0, siguiente(x0)
+        pasos = 1
+        while tortuga != liebre:
+            if potencia == lam:
+                tortuga = liebre
+                potencia *= 2
+                lam = 0
+            liebre = siguiente(liebre)
+            lam += 1
+            pasos += 1
+            if pasos > max_pasos:
+                return None
+        # Fase 2: inicio del ciclo, con la liebre lam pasos adelante
+        tortuga = liebre = x0
+        for _ in range(lam):
+            liebre = siguiente(liebre)
+        mu = 0
+        while tortuga != liebre:
+            tortuga, liebre = siguiente(tortuga), siguiente(liebre)
+            mu += 1
+
+        estados = [tortuga]
+        for _ in range(lam - 1):
+            estados.append(siguiente(estados[-1]))
+        self._ciclo = (np.array(estados, dtype=np.int64), {x: i for i, x in enumerate(estados)})
+        return mu, lam
+
+    def en_ciclo(self):
+        """True si el estado actual está en el último ciclo encontrado por detectar_ciclo."""
+        return self._ciclo is not None and self.current_seed_int in self._ciclo[1]
+
     def next_int(self, lower_bound, upper_bound):
         """Genera un entero en [lower_bound, upper_bound]."""
         if lower_bound > upper_bound:
@@ -113,3 +250,49 @@ class MiddleSquareRNG:
         range_width = upper_bound - lower_bound + 1
         # Usamos el flotante para obtener una distribución más uniforme en el rango
         return lower_bound + int(self.next_float() * range_width)
+
+
+MASCARA_64 = (1 << 64) - 1
+
+class SplitMix64:
+    """
+    Generador SplitMix64: X_n+1 = X_n + 0x9E3779B97F4A7C15 (mod 2^64), con una mezcla de bits sobre cada estado.
+    Se usa para derivar semillas independientes a partir de una semilla maestra (ver derivar_semilla).
+    """
+    def __init__(self, seed=None):
+        self.set_seed(seed)
+
+    def set_seed(self, seed):
+        if seed is None:
+            seed = int(time.time() * 1000)
+        self.initial_seed = seed & MASCARA_64
+        self.current_value = self.initial_seed
+
+    def _next_raw(self):
+        self.current_value = (self.current_value + 0x9E3779B97F4A7C15) & MASCARA_64
+        z = self.current_value
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASCARA_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASCARA_64
+        return z ^ (z >> 31)
+
+    def next_float(self):
+        """Genera un flotante en [0.0, 1.0) con los 53 bits altos."""
+        return (self._next_raw() >> 11) / float(1 << 53)
+
+    def next_int(self, lower_bound, upper_bound):
+        """Genera un entero en [lower_bound, upper_bound]."""
+        if lower_bound > upper_bound:
+            raise ValueError("El límite inferior no puede ser mayor que el superior.")
+        range_width = upper_bound - lower_bound + 1
+        return lower_bound + (self._next_raw() % range_width)
+
+def derivar_semilla(semilla_maestra, *claves):
+    """
+    Semilla de 64 bits determinada por (semilla_maestra, claves...), con claves enteras no negativas.
+    Claves distintas dan semillas sin relación aparente entre sí, de modo que cada corrida de un barrido
+    tiene flujos independientes y el barrido completo se reproduce con la misma semilla maestra.
+    """
+    valor = SplitMix64(semilla_maestra)._next_raw()
+    for clave in claves:
+        valor = SplitMix64(valor ^ (clave & MASCARA_64))._next_raw()
+    return valor
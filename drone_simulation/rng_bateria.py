@@ -0,0 +1,334 @@
+# drone_simulation/rng_bateria.py
+"""
+Batería extendida de pruebas de calidad para los generadores de la simulación (complementa rng_validator.py).
+Además de Chi-cuadrado y K-S, mide la estructura entre valores consecutivos, que es la que importa cuando dos
+valores seguidos son las coordenadas (x, y) de un dron u obstáculo nuevo:
+- serial 2D / 3D: Chi-cuadrado sobre pares / tríos no solapados en una grilla de k^d celdas,
+- huecos (gap): largo de los huecos entre valores en [alfa, beta), geométrico bajo H0,
+- rachas arriba/abajo: número de rachas de diferencias de igual signo (aproximación normal),
+- póker: cantidad de dígitos distintos en manos de 5 dígitos decimales,
+- autocorrelación para los retardos 1..L vía FFT, con el estadístico de Ljung-Box,
+- prueba espectral de los LCG (a, m): distancia entre los hiperplanos que contienen a las t-uplas consecutivas.
+Las pruebas de cada generador se reparten en un pool de procesos (cada tarea regenera sus muestras desde la
+semilla) y el resultado es un único reporte JSON.
+
+Uso: python bateria_rng.py [--muestras 1000000] [--pruebas serial_2d huecos ...] [--procesos 8] [--salida reporte.json]
+                           [--dimensiones-espectral 2 3 4 5 6] [--use-runtime-config]
+"""
+import os, sys, copy, json, math, time, argparse, multiprocessing
+from fractions import Fraction
+import numpy as np
+from .rng_handler import load_config_runtime, init_rngs
+from .rng_validator import (chi2_sf, generate_samples_from_rng_instance, run_chi_squared_test_uniform_floats_from_scratch,
+                            run_kolmogorov_smirnov_test_uniform_floats_from_scratch)
+
+NOMBRES_GENERADORES = ("LCG - Entorno", "Middle Square - Drones", "LCG - Obstáculos") # Mismo orden que init_rngs
+# Constante de Hermite γ_t^t (t = 2..8): cota de ν_t² <= γ_t m^(2/t) para la red dual de un LCG
+HERMITE_POTENCIA_T = {2: 4 / 3, 3: 2.0, 4: 4.0, 5: 8.0, 6: 64 / 3, 7: 64.0, 8: 256.0}
+
+def _chi2(observados, esperados, nombre, **extra):
+    """Resultado de una prueba Chi-cuadrado (conteos observados vs esperados, ambos por clase)."""
+    observados = np.asarray(observados, dtype=float)
+    esperados = np.asarray(esperados, dtype=float)
+    resultado = {'test_name': nombre, **extra}
+    if esperados.min() < 5:
+        resultado['warning'] = f"Frecuencia esperada mínima ({esperados.min():.2f}) es < 5. Resultados pueden ser menos precisos."
+    estadistico = float(((observados - esperados)**2 / esperados).sum())
+    resultado['statistic'] = estadistico
+    resultado['degrees_freedom'] = len(observados) - 1
+    resultado['p_value'] = chi2_sf(estadistico, len(observados) - 1)
+    return resultado
+
+def prueba_serial(muestras, dimension=2, divisiones=8):
+    """
+    Prueba serial: las muestras se agrupan en d-uplas no solapadas (x_1..x_d), (x_d+1..x_2d), ... y se cuentan en
+    una grilla de divisiones^d celdas del cubo [0, 1)^d; bajo H0 todas las celdas son equiprobables.
+    """
+    nombre = f'Serial {dimension}D ({divisiones}^{dimension} celdas)'
+    m = len(muestras) // dimension
+    celdas = divisiones**dimension
+    if m < 5 * celdas:
+        return {'test_name': nombre, 'error': f'No suficientes muestras: se necesitan al menos {5 * celdas * dimension}.'}
+    indices = np.minimum((muestras[:m * dimension] * divisiones).astype(np.int64), divisiones - 1).reshape(m, dimension)
+    celda = indices @ (divisiones ** np.arange(dimension, dtype=np.int64))
+    conteos = np.bincount(celda, minlength=celdas)
+    return _chi2(conteos, np.full(celdas, m / celdas), nombre, tuplas=m)
+
+def prueba_huecos(muestras, alfa=0.0, beta=0.5, max_hueco=20):
+    """
+    Prueba de huecos (Knuth): largo r de cada hueco entre dos valores en [alfa, beta), con P(r) = p (1 - p)^r y
+    p = beta - alfa. Los huecos de largo >= t se agrupan; t es el mayor (<= max_hueco) con al menos 5 esperados.
+    """
+    nombre = f'Huecos en [{alfa:g}, {beta:g})'
+    p = beta - alfa
+    posiciones = np.flatnonzero((muestras >= alfa) & (muestras < beta))
+    huecos = np.diff(posiciones) - 1 # Los valores antes del primer acierto no forman un hueco completo
+    if len(huecos) < 50:
+        return {'test_name': nombre, 'error': 'No suficientes huecos para la prueba.'}
+    t = 1
+    while t < max_hueco and len(huecos) * (1 - p)**(t + 1) >= 5:
+        t += 1
+    observados = np.bincount(np.minimum(huecos, t), minlength=t + 1)
+    probabilidades = p * (1 - p)**np.arange(t + 1)
+    probabilidades[t] = (1 - p)**t # Cola: huecos de largo >= t
+    return _chi2(observados, len(huecos) * probabilidades, nombre, huecos=int(len(huecos)), largo_agrupado_desde=t)
+
+def prueba_rachas(muestras):
+    """
+    Rachas arriba/abajo: número R de tramos maximales con diferencias x_i+1 - x_i del mismo signo (se descartan las
+    diferencias nulas). Bajo H0, E[R] = (2n - 1)/3 y Var[R] = (16n - 29)/90, con R aproximadamente normal.
+    """
+    nombre = 'Rachas arriba/abajo'
+    signos = np.sign(np.diff(muestras))
+    signos = signos[signos != 0]
+    n = len(signos) + 1
+    if n < 20:
+        return {'test_name': nombre, 'error': 'No suficientes muestras para la prueba de rachas.'}
+    rachas = 1 + int((signos[1:] != signos[:-1]).sum())
+    media = (2 * n - 1) / 3
+    varianza = (16 * n - 29) / 90
+    z = (rachas - media) / math.sqrt(varianza)
+    return {'test_name': nombre, 'runs': rachas, 'expected_runs': media, 'z_score': z,
+            'p_value': math.erfc(abs(z) / math.sqrt(2))} # Bilateral
+
+def _stirling2(k, r):
+    """Números de Stirling de segunda especie S(k, r) (particiones de k elementos en r bloques)."""
+    tabla = [[1] + [0] * r]
+    for i in range(1, k + 1):
+        fila = [0] * (r + 1)
+        for j in range(1, min(i, r) + 1):
+            fila[j] = j * tabla[-1][j] + tabla[-1][j - 1]
+        tabla.append(fila)
+    return tabla[k][r]
+
+def prueba_poker(muestras, cartas=5, digitos=10):
+    """
+    Prueba de póker: manos de 'cartas' dígitos (floor(digitos * x)) y cantidad r de dígitos distintos en cada una,
+    con P(r) = digitos (digitos-1) ... (digitos-r+1) S(cartas, r) / digitos^cartas. Las clases con menos de 5
+    esperados se agrupan con la siguiente.
+    """
+    nombre = f'Póker ({cartas} cartas, {digitos} dígitos)'
+    manos = len(muestras) // cartas
+    if manos < 100:
+        return {'test_name': nombre, 'error': 'No suficientes muestras para la prueba de póker.'}
+    valores = np.minimum((muestras[:manos * cartas] * digitos).astype(np.int64), digitos - 1).reshape(manos, cartas)
+    valores.sort(axis=1)
+    distintos = 1 + (np.diff(valores, axis=1) != 0).sum(axis=1)
+    observados = np.bincount(distintos, minlength=cartas + 1)[1:].astype(float)
+    probabilidades = np.array([math.perm(digitos, r) * _stirling2(cartas, r) / digitos**cartas for r in range(1, cartas + 1)])
+    esperados = manos * probabilidades
+    clases = [[r] for r in range(1, cartas + 1)]
+    while len(esperados) > 2 and esperados[0] < 5: # Agrupar las clases poco probables (pocos dígitos distintos)
+        observados = np.concatenate([[observados[0] + observados[1]], observados[2:]])
+        esperados = np.concatenate([[esperados[0] + esperados[1]], esperados[2:]])
+        clases = [clases[0] + clases[1]] + clases[2:]
+    return _chi2(observados, esperados, nombre, hands=manos, classes=[f"{c[0]}-{c[-1]}" if len(c) > 1 else str(c[0]) for c in clases])
+
+def prueba_autocorrelacion_fft(muestras, max_retardo=50):
+    """
+    Autocorrelación r_k para k = 1..max_retardo con una FFT (O(n log n) para todos los retardos) y estadístico de
+    Ljung-Box Q = n (n + 2) Σ r_k² / (n - k), Chi-cuadrado con max_retardo grados de libertad bajo H0.
+    """
+    nombre = f'Autocorrelación retardos 1..{max_retardo} (FFT, Ljung-Box)'
+    n = len(muestras)
+    if n <= 2 * max_retardo:
+        return {'test_name': nombre, 'error': 'No suficientes muestras para los retardos pedidos.'}
+    x = muestras - muestras.mean()
+    tamano = 1 << (2 * n - 1).bit_length() # Relleno con ceros: correlación lineal, no circular
+    espectro = np.fft.rfft(x, tamano)
+    autocov = np.fft.irfft(espectro * np.conj(espectro), tamano)[:max_retardo + 1]
+    r = autocov[1:] / autocov[0]
+    retardos = np.arange(1, max_retardo + 1)
+    q = float(n * (n + 2) * (r**2 / (n - retardos)).sum())
+    k_max = int(np.abs(r).argmax())
+    return {'test_name': nombre, 'autocorrelations': r.tolist(), 'max_abs': float(abs(r[k_max])), 'lag_of_max': k_max + 1,
+            'max_abs_z': float(abs(r[k_max]) * math.sqrt(n)), 'statistic': q, 'degrees_freedom': max_retardo,
+            'p_value': chi2_sf(q, max_retardo)}
+
+def _reducir_lll(base, delta=Fraction(3, 4)):
+    """Reducción LLL exacta (aritmética racional) de una base de enteros (lista de filas); retorna la base reducida."""
+    b = [list(fila) for fila in base]
+    t = len(b)
+    producto = lambda u, v: sum(x * y for x, y in zip(u, v))
+
+    def gram_schmidt():
+        estrellas, mu = [], [[Fraction(0)] * t for _ in range(t)]
+        for i in range(t):
+            v = [Fraction(x) for x in b[i]]
+            for j in range(i):
+                mu[i][j] = producto(b[i], estrellas[j]) / producto(estrellas[j], estrellas[j])
+                v = [x - mu[i][j] * y for x, y in zip(v, estrellas[j])]
+            estrellas.append(v)
+        return estrellas, mu
+
+    estrellas, mu = gram_schmidt()
+    k = 1
+    while k < t:
+        for j in range(k - 1, -1, -1): # Reducción de tamaño
+            q = round(mu[k][j])
+            if q:
+                b[k] = [x - q * y for x, y in zip(b[k], b[j])]
+                estrellas, mu = gram_schmidt()
+        if producto(estrellas[k], estrellas[k]) >= (delta - mu[k][k - 1]**2) * producto(estrellas[k - 1], estrellas[k - 1]):
+            k += 1
+        else: # Condición de Lovász: intercambiar
+            b[k], b[k - 1] = b[k - 1], b[k]
+            estrellas, mu = gram_schmidt()
+            k = max(k - 1, 1)
+    return b
+
+def _vector_mas_corto(base):
+    """
+    Norma al cuadrado del vector no nulo más corto de la red generada por 'base' (ya reducida con LLL), por
+    enumeración de Fincke-Pohst: los coeficientes se recorren dentro del elipsoide de la norma del mejor vector
+    encontrado y las normas se verifican con enteros exactos.
+    """
+    t = len(base)
+    b = np.array(base, dtype=float)
+    estrellas = np.zeros_like(b)
+    mu = np.zeros((t, t))
+    for i in range(t):
+        estrellas[i] = b[i]
+        for j in range(i):
+            mu[i, j] = b[i] @ estrellas[j] / (estrellas[j] @ estrellas[j])
+            estrellas[i] -= mu[i, j] * estrellas[j]
+    normas_estrella = (estrellas**2).sum(axis=1)
+    mejor = min(sum(x * x for x in fila) for fila in base)
+    coef = [0] * t
+
+    def enumerar(i, resto):
+        nonlocal mejor
+        centro = -sum(mu[j, i] * coef[j] for j in range(i + 1, t))
+        radio = math.sqrt(max(resto, 0.0) / normas_estrella[i]) + 1e-9
+        for c in range(math.ceil(centro - radio), math.floor(centro + radio) + 1):
+            coef[i] = c
+            parcial = resto - normas_estrella[i] * (c - centro)**2
+            if parcial < -1e-6 * mejor:
+                continue
+            if i > 0:
+                enumerar(i - 1, parcial)
+            elif any(coef):
+                vector = [sum(coef[r] * base[r][s] for r in range(t)) for s in range(t)]
+                norma = sum(x * x for x in vector)
+                if 0 < norma < mejor:
+                    mejor = norma
+        coef[i] = 0
+
+    enumerar(t - 1, float(mejor))
+    return mejor
+
+def prueba_espectral(multiplicador, modulo, dimensiones=(2, 3, 4, 5, 6)):
+    """
+    Prueba espectral de un LCG x_n+1 = (a x_n + c) mod m: para cada dimensión t, ν_t es la norma del vector más
+    corto de la red dual {s : s_1 + s_2 a + ... + s_t a^(t-1) ≡ 0 (mod m)}. Las t-uplas consecutivas (normalizadas
+    a [0, 1)^t) están sobre hiperplanos paralelos separados 1/ν_t; S_t = ν_t / (γ_t^(1/2) m^(1/t)) ∈ (0, 1] compara
+    con la mejor red posible (se suele pedir S_t >= ~0.7). No depende del incremento c.
+    """
+    resultado = {'test_name': 'Espectral (LCG)', 'multiplier': multiplicador, 'modulus': modulo, 'dimensions': {}}
+    a = multiplicador % modulo
+    for t in dimensiones:
+        base = [[modulo] + [0] * (t - 1)]
+        for k in range(1, t):
+            fila = [-pow(a, k, modulo)] + [0] * (t - 1)
+            fila[k] = 1
+            base.append(fila)
+        nu_cuadrado = _vector_mas_corto(_reducir_lll(base))
+        nu = math.sqrt(nu_cuadrado)
+        dimension = {'nu_squared': nu_cuadrado, 'nu': nu, 'hyperplane_spacing': 1 / nu}
+        if t in HERMITE_POTENCIA_T:
+            dimension['normalized_S'] = nu / (HERMITE_POTENCIA_T[t]**(1 / (2 * t)) * modulo**(1 / t))
+        resultado['dimensions'][str(t)] = dimension
+    normalizados = [d['normalized_S'] for d in resultado['dimensions'].values() if 'normalized_S' in d]
+    if normalizados:
+        resultado['min_normalized_S'] = min(normalizados)
+    return resultado
+
+# Pruebas sobre muestras: nombre -> función(muestras) -> diccionario de resultado
+PRUEBAS = {
+    "chi_cuadrado": lambda x: run_chi_squared_test_uniform_floats_from_scratch(x, 10),
+    "kolmogorov_smirnov": run_kolmogorov_smirnov_test_uniform_floats_from_scratch,
+    "serial_2d": lambda x: prueba_serial(x, 2, 16),
+    "serial_3d": lambda x: prueba_serial(x, 3, 8),
+    "huecos": prueba_huecos,
+    "rachas": prueba_rachas,
+    "poker": prueba_poker,
+    "autocorrelacion_fft": prueba_autocorrelacion_fft,
+}
+PRUEBA_ESPECTRAL = "espectral" # Solo para generadores LCG (usa multiplier y modulus, no muestras)
+
+def _ejecutar_tarea(tarea):
+    """Una prueba sobre un generador, en un proceso del pool; los errores quedan en el resultado."""
+    nombre_generador, prueba, rng, num_muestras, dimensiones = tarea
+    t0 = time.perf_counter()
+    try:
+        if prueba == PRUEBA_ESPECTRAL:
+            resultado = prueba_espectral(rng.multiplier, rng.modulus, dimensiones)
+        else:
+            muestras = generate_samples_from_rng_instance(copy.deepcopy(rng), num_muestras) # Desde el estado inicial
+            resultado = PRUEBAS[prueba](muestras)
+    except Exception as e:
+        resultado = {'error': f"{type(e).__name__}: {e}"}
+    resultado['seconds'] = time.perf_counter() - t0
+    return nombre_generador, prueba, resultado
+
+def tareas_bateria(generadores, pruebas, num_muestras, dimensiones):
+    """Una tarea por (generador, prueba); la espectral solo para los generadores con multiplier y modulus."""
+    tareas = []
+    for nombre, rng in generadores.items():
+        for prueba in pruebas:
+            if prueba == PRUEBA_ESPECTRAL and not hasattr(rng, 'multiplier'):
+                continue
+            tareas.append((nombre, prueba, rng, num_muestras, dimensiones))
+    return tareas
+
+def ejecutar_bateria(generadores, pruebas=None, num_muestras=1_000_000, procesos=None, dimensiones=(2, 3, 4, 5, 6)):
+    """
+    Ejecuta las pruebas sobre cada generador ({nombre: instancia}, cada uno desde su estado actual) repartiendo las
+    tareas en 'procesos' procesos, y retorna el reporte {generador: {"rng_type", "initial_seed", "tests": {...}}}.
+    """
+    pruebas = list(pruebas or list(PRUEBAS) + [PRUEBA_ESPECTRAL])
+    tareas = tareas_bateria(generadores, pruebas, num_muestras, tuple(dimensiones))
+    reporte = {nombre: {'rng_type': type(rng).__name__, 'initial_seed': getattr(rng, 'initial_seed', None),
+                        'num_samples': num_muestras, 'tests': {}} for nombre, rng in generadores.items()}
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(tareas) > 1:
+        with multiprocessing.Pool(min(procesos, len(tareas))) as pool:
+            resultados = pool.map(_ejecutar_tarea, tareas)
+    else:
+        resultados = map(_ejecutar_tarea, tareas)
+    for nombre, prueba, resultado in resultados:
+        reporte[nombre]['tests'][prueba] = resultado
+    for nombre in reporte: # Orden estable de las pruebas en el reporte
+        reporte[nombre]['tests'] = {p: reporte[nombre]['tests'][p] for p in pruebas if p in reporte[nombre]['tests']}
+    return reporte
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--muestras', type=int, default=1_000_000, help="Muestras por generador para cada prueba")
+    parser.add_argument('--pruebas', nargs='+', default=None, choices=list(PRUEBAS) + [PRUEBA_ESPECTRAL], help="Por defecto, todas")
+    parser.add_argument('--dimensiones-espectral', type=int, nargs='+', default=[2, 3, 4, 5, 6], help="Dimensiones t de la prueba espectral")
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1, help="Procesos del pool (1: sin pool)")
+    parser.add_argument('--salida', default=None, help="Archivo JSON del reporte (por defecto, la salida estándar)")
+    parser.add_argument('--use-runtime-config', action='store_true', help="Partir de config_runtime.json (como main.py)")
+    args = parser.parse_args(argv)
+
+    cfg = load_config_runtime() # Lee --use-runtime-config de sys.argv
+    generadores = dict(zip(NOMBRES_GENERADORES, init_rngs(cfg)))
+    t0 = time.perf_counter()
+    reporte = ejecutar_bateria(generadores, args.pruebas, args.muestras, args.procesos, args.dimensiones_espectral)
+    print(f"Batería: {len(generadores)} generadores, {args.muestras} muestras, {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    for nombre, datos in reporte.items():
+        for prueba, resultado in datos['tests'].items():
+            estado = resultado.get('error') or (f"p = {resultado['p_value']:.4g}" if 'p_value' in resultado else
+                                                f"S_t mínimo = {resultado.get('min_normalized_S', float('nan')):.3f}")
+            print(f"  {nombre:<24} {prueba:<20} {estado}", file=sys.stderr)
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -1,146 +1,321 @@
 # drone_simulation/rng_validator.py
+import math
 import numpy as np
 from . import config # Para parámetros de prueba como RNG_TEST_NUM_BINS_CHI2
 
+# Muestras por bloque al generar y probar: hasta este tamaño las pruebas son exactas sobre el arreglo completo;
+# por encima se procesan bloque a bloque con memoria acotada (ver AcumuladorUniformidad)
+TAMANO_BLOQUE_VALIDACION = 2**22
+# Intervalos del histograma fino con que se acota el estadístico K-S en el modo por bloques (ancho 2^-22)
+BINS_KS_POR_BLOQUES = 2**22
+
+_EPS_GAMMA = 1e-15
+_MIN_FLOTANTE_GAMMA = 1e-300
+
+def _gamma_regularizada_superior(a, x):
+    """
+    Q(a, x) = Γ(a, x) / Γ(a), función gamma incompleta superior regularizada.
+    Serie de P(a, x) para x < a + 1 y fracción continua (Lentz) para Q en otro caso.
+    """
+    if x <= 0:
+        return 1.0
+    prefactor = math.exp(-x + a * math.log(x) - math.lgamma(a))
+    max_iter = 10000 + 10 * int(math.sqrt(a)) # Ambas convergen en O(sqrt(a)) términos cerca de x ~ a
+    if x < a + 1:
+        termino = suma = 1.0 / a
+        ap = a
+        for _ in range(max_iter):
+            ap += 1
+            termino *= x / ap
+            suma += termino
+            if abs(termino) < abs(suma) * _EPS_GAMMA:
+                break
+        return max(0.0, 1.0 - suma * prefactor)
+    b = x + 1 - a
+    c = 1.0 / _MIN_FLOTANTE_GAMMA
+    d = 1.0 / b
+    h = d
+    for i in range(1, max_iter):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = d if abs(d) >= _MIN_FLOTANTE_GAMMA else _MIN_FLOTANTE_GAMMA
+        c = b + an / c
+        c = c if abs(c) >= _MIN_FLOTANTE_GAMMA else _MIN_FLOTANTE_GAMMA
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < _EPS_GAMMA:
+            break
+    return prefactor * h
+
 def chi2_cdf(chi2_stat, df):
     """
     P(X <= chi2_stat) donde X sigue una distribución Chi2 con df grados de libertad.
-    p_value = 1 - CDF(chi2_stat, df)
+    p_value = 1 - CDF(chi2_stat, df) (ver chi2_sf, que lo calcula sin cancelación)
     """
     if df <= 0: return np.nan
-    if df == 9 and chi2_stat > 16.919: return 0.04
-    if df == 9 and chi2_stat <= 16.919: return 0.10
-    return np.nan 
+    return 1.0 - chi2_sf(chi2_stat, df)
+
+def chi2_sf(chi2_stat, df):
+    """P(X > chi2_stat) para X ~ Chi2(df): el p-value de la prueba, Q(df/2, chi2_stat/2)."""
+    if df <= 0: return np.nan
+    return _gamma_regularizada_superior(df / 2.0, chi2_stat / 2.0)
 
-def run_chi_squared_test_uniform_floats_from_scratch(float_samples: list, num_bins: int) -> dict:
+def ks_sf(d_stat, n):
     """
-    Prueba de Chi-cuadrado para uniformidad de flotantes en [0,1), implementada desde cero.
-    Retorna el estadístico Chi2 y grados de libertad. El p-value es un placeholder.
+    P(D_n > d_stat) para el estadístico K-S de n muestras: distribución asintótica de Kolmogorov,
+    Q(λ) = 2 Σ (-1)^(k-1) exp(-2 k² λ²), con la corrección de Stephens λ = (√n + 0.12 + 0.11/√n) d.
+    Aproximación buena para n >= ~35 (sobreestima levemente el p-value con n menores).
     """
-    results = {'test_name': 'Chi-Cuadrado para Uniformidad (desde cero)'}
-    n_samples = len(float_samples)
+    if n <= 0: return np.nan
+    raiz_n = math.sqrt(n)
+    lam = (raiz_n + 0.12 + 0.11 / raiz_n) * d_stat
+    if lam < 0.2:
+        return 1.0 # La serie converge lentamente y Q(λ) = 1 hasta la precisión doble
+    suma, signo, previo = 0.0, 1.0, 0.0
+    for k in range(1, 101):
+        termino = signo * math.exp(-2.0 * k * k * lam * lam)
+        suma += termino
+        if abs(termino) <= 1e-10 * previo or abs(termino) <= 1e-16 * suma:
+            break
+        signo = -signo
+        previo = abs(termino)
+    return min(1.0, max(0.0, 2.0 * suma))
 
-    if not float_samples or n_samples < num_bins * 5:
-        results['error'] = 'No suficientes muestras o bins para Chi-cuadrado confiable.'
-        return results
-    
-    observed_counts = [0] * num_bins
+def _conteos_por_bin(float_samples, num_bins):
+    """Cuenta las muestras de cada intervalo de ancho 1/num_bins en [0, 1); 1.0 va al último y las de fuera no cuentan."""
+    muestras = np.asarray(float_samples, dtype=float)
     bin_width = 1.0 / num_bins
-    for sample in float_samples:
-        if 0.0 <= sample < 1.0:
-            bin_index = int(sample / bin_width)
-            observed_counts[bin_index] += 1
-        elif sample == 1.0: # El límite superior [0,1)
-            observed_counts[num_bins - 1] +=1
+    en_rango = muestras[(muestras >= 0.0) & (muestras <= 1.0)]
+    indices = np.minimum((en_rango / bin_width).astype(np.int64), num_bins - 1) # El límite superior [0,1)
+    return np.bincount(indices, minlength=num_bins)
 
+def _resultados_chi2(observed_counts, n_samples, num_bins):
+    """Estadístico, grados de libertad y p-value de Chi-cuadrado a partir de los conteos por bin."""
+    results = {'test_name': 'Chi-Cuadrado para Uniformidad (desde cero)'}
+    if n_samples == 0 or n_samples < num_bins * 5:
+        results['error'] = 'No suficientes muestras o bins para Chi-cuadrado confiable.'
+        return results
 
     expected_count_per_bin = n_samples / num_bins
-    
+
     if expected_count_per_bin < 1:
         results['warning'] = f"Frecuencia esperada por bin ({expected_count_per_bin:.2f}) es < 1. Resultados pueden no ser precisos."
     elif expected_count_per_bin < 5:
         results['warning'] = f"Frecuencia esperada por bin ({expected_count_per_bin:.2f}) es < 5. Resultados pueden ser menos precisos."
 
-    chi2_statistic = 0.0
-    for obs_count in observed_counts:
-        chi2_statistic += ((obs_count - expected_count_per_bin)**2) / expected_count_per_bin
-    
+    chi2_statistic = float((((observed_counts - expected_count_per_bin)**2) / expected_count_per_bin).sum())
     degrees_freedom = num_bins - 1
-    
+
     results['statistic'] = chi2_statistic
     results['degrees_freedom'] = degrees_freedom
-    results['p_value_placeholder'] = chi2_cdf(chi2_statistic, degrees_freedom) # Usará el placeholder
+    results['p_value'] = chi2_sf(chi2_statistic, degrees_freedom)
     results['bins'] = num_bins
-    results['observed_counts'] = observed_counts
+    results['observed_counts'] = observed_counts.tolist()
     results['expected_per_bin'] = expected_count_per_bin
     return results
 
-
-def run_kolmogorov_smirnov_test_uniform_floats_from_scratch(float_samples: list) -> dict:
+def run_chi_squared_test_uniform_floats_from_scratch(float_samples, num_bins: int) -> dict:
     """
-    Prueba K-S para uniformidad de flotantes en [0,1).
-    Retorna el estadístico D.
+    Prueba de Chi-cuadrado para uniformidad de flotantes en [0,1), implementada desde cero.
+    Retorna el estadístico Chi2, los grados de libertad y el p-value (Chi2 con num_bins - 1 grados de libertad).
     """
+    return _resultados_chi2(_conteos_por_bin(float_samples, num_bins), len(float_samples), num_bins)
+
+def _resultados_ks(ks_statistic, n):
+    """Resultado de la prueba K-S a partir del estadístico D de n muestras."""
     results = {'test_name': 'Kolmogorov-Smirnov para Uniformidad (desde cero)'}
-    n = len(float_samples)
-    if not float_samples or n == 0:
-        results['error'] = 'No hay muestras para la prueba K-S.'
-        return results
-        
-    sorted_samples = sorted(float_samples)
-    
-    d_plus_max = 0.0
-    d_minus_max = 0.0
-    
-    for i in range(n):
-        
-        f_n_xi = (i + 1) / n
-        f_xi = sorted_samples[i]
-        
-        d_plus_current = f_n_xi - f_xi
-        if d_plus_current > d_plus_max:
-            d_plus_max = d_plus_current
-            
-        # D_n^- = max_i ( F(x_i) - (i-1)/n )
-        f_n_xi_minus_1 = i / n # (i-1)+1 / n
-        d_minus_current = f_xi - f_n_xi_minus_1
-        if d_minus_current > d_minus_max:
-            d_minus_max = d_minus_current
-            
-    ks_statistic = max(d_plus_max, d_minus_max)
     results['statistic_D'] = ks_statistic
-    
-    
-    critical_value_approx = 0.0
+    results['p_value'] = ks_sf(ks_statistic, n)
     if n > 35:
-        critical_value_approx = 1.358 / np.sqrt(n)
+        critical_value_approx = 1.358 / math.sqrt(n)
         results['critical_value_D_at_alpha_0.05 (approx)'] = critical_value_approx
-        if ks_statistic > critical_value_approx:
-            results['hypothesis_H0_rejected_at_alpha_0.05 (approx)'] = True
-        else:
-            results['hypothesis_H0_rejected_at_alpha_0.05 (approx)'] = False
+        results['hypothesis_H0_rejected_at_alpha_0.05 (approx)'] = bool(ks_statistic > critical_value_approx)
     else:
-        results['p_value_info'] = "P-value exacto requiere tabla o librería para N <= 35."
+        results['p_value_info'] = "El p-value usa la distribución asintótica; para N <= 35 es aproximado."
+    return results
+
+def run_kolmogorov_smirnov_test_uniform_floats_from_scratch(float_samples, incluir_muestras: bool = False) -> dict:
+    """
+    Prueba K-S para uniformidad de flotantes en [0,1).
+    Retorna el estadístico D = max(D+, D-) sobre las muestras ordenadas y su p-value; con incluir_muestras=True,
+    también el arreglo ordenado ('sorted_samples'), para graficar la ECDF sin volver a generar las muestras.
+    """
+    n = len(float_samples)
+    if n == 0:
+        return {'test_name': 'Kolmogorov-Smirnov para Uniformidad (desde cero)', 'error': 'No hay muestras para la prueba K-S.'}
 
+    sorted_samples = np.sort(np.asarray(float_samples, dtype=float))
+    i = np.arange(n)
+    # D_n^+ = max_i ( (i+1)/n - F(x_i) ),  D_n^- = max_i ( F(x_i) - i/n ), ambos al menos 0
+    d_plus_max = max(0.0, float(((i + 1) / n - sorted_samples).max()))
+    d_minus_max = max(0.0, float((sorted_samples - i / n).max()))
+    results = _resultados_ks(max(d_plus_max, d_minus_max), n)
+    if incluir_muestras:
+        results['sorted_samples'] = sorted_samples
     return results
 
+def _resultados_autocorrelacion(samples_np):
+    """Autocorrelación lag-1 (coeficiente de Pearson entre x_i y x_i+1)."""
+    if len(samples_np) > 1:
+        try:
+            return {'value': float(np.corrcoef(samples_np[:-1], samples_np[1:])[0, 1])}
+        except Exception as e:
+            return {'error': f'Error en Autocorrelación: {str(e)}'}
+    return {'error': 'No suficientes muestras'}
+
+
+class AcumuladorUniformidad:
+    """
+    Pruebas de uniformidad sobre una secuencia recibida por bloques, con memoria acotada:
+    - Chi-cuadrado: exacta (conteos por bin acumulados).
+    - K-S: acotada con un histograma fino de 'bins_ks' intervalos. La ECDF es exacta en los bordes de los
+      intervalos, así que D evaluado en ellos es una cota inferior del D real, y la cota superior agrega a lo
+      sumo el ancho de un intervalo más la fracción de muestras del intervalo más poblado. Se reportan ambas;
+      el p-value usa la inferior.
+    - Autocorrelación lag-1: exacta salvo redondeo (sumas acumuladas, incluido el par entre bloques).
+    """
+    def __init__(self, num_bins, bins_ks=BINS_KS_POR_BLOQUES):
+        self.num_bins = num_bins
+        self.bins_ks = bins_ks
+        self.n = 0
+        self.conteos = np.zeros(num_bins, dtype=np.int64)
+        self.conteos_ks = np.zeros(bins_ks, dtype=np.int64)
+        self.suma = self.suma_cuadrados = self.suma_productos = 0.0 # Σx, Σx², Σ x_i x_i+1
+        self.primero = self.ultimo = None
+
+    def agregar(self, bloque):
+        bloque = np.asarray(bloque, dtype=float)
+        if len(bloque) == 0:
+            return
+        self.conteos += _conteos_por_bin(bloque, self.num_bins)
+        en_rango = (bloque >= 0.0) & (bloque <= 1.0)
+        indices_ks = np.minimum((bloque[en_rango] * self.bins_ks).astype(np.int64), self.bins_ks - 1)
+        self.conteos_ks += np.bincount(indices_ks, minlength=self.bins_ks)
+
+        self.suma += float(bloque.sum())
+        self.suma_cuadrados += float((bloque * bloque).sum())
+        self.suma_productos += float((bloque[:-1] * bloque[1:]).sum())
+        if self.ultimo is not None:
+            self.suma_productos += self.ultimo * float(bloque[0])
+        else:
+            self.primero = float(bloque[0])
+        self.ultimo = float(bloque[-1])
+        self.n += len(bloque)
+
+    def chi_cuadrado(self):
+        return _resultados_chi2(self.conteos, self.n, self.num_bins)
+
+    def kolmogorov_smirnov(self, incluir_ecdf=False, puntos_ecdf=2048):
+        if self.n == 0:
+            return {'test_name': 'Kolmogorov-Smirnov para Uniformidad (desde cero)', 'error': 'No hay muestras para la prueba K-S.'}
+        # Las muestras fuera de [0, 1] no entran al histograma, pero sí a n (solo pueden aumentar D)
+        acumulados = np.concatenate([[0], np.cumsum(self.conteos_ks)]) / self.n # F_n en los bordes (por izquierda)
+        bordes = np.arange(self.bins_ks + 1) / self.bins_ks
+        d_inferior = float(np.abs(acumulados - bordes).max())
+        d_superior = float(max((acumulados[1:] - bordes[:-1]).max(), (bordes[1:] - acumulados[:-1]).max()))
+        results = _resultados_ks(d_inferior, self.n)
+        results['statistic_D_upper_bound'] = max(d_inferior, d_superior)
+        results['ks_info'] = f"D acotado con un histograma de {self.bins_ks} intervalos (modo por bloques)."
+        if incluir_ecdf: # ECDF en 'puntos_ecdf' bordes equiespaciados, para graficar
+            paso = max(1, self.bins_ks // puntos_ecdf)
+            results['ecdf_edges'] = bordes[::paso]
+            results['ecdf_values'] = acumulados[::paso]
+        return results
+
+    def autocorrelacion(self):
+        if self.n < 2:
+            return {'error': 'No suficientes muestras'}
+        m = self.n - 1 # Pares (x_i, x_i+1)
+        suma_a, suma_b = self.suma - self.ultimo, self.suma - self.primero
+        cuad_a, cuad_b = self.suma_cuadrados - self.ultimo**2, self.suma_cuadrados - self.primero**2
+        covarianza = self.suma_productos / m - (suma_a / m) * (suma_b / m)
+        varianza_a = cuad_a / m - (suma_a / m)**2
+        varianza_b = cuad_b / m - (suma_b / m)**2
+        if varianza_a <= 0 or varianza_b <= 0:
+            return {'value': float('nan')}
+        return {'value': covarianza / math.sqrt(varianza_a * varianza_b)}
+
+
+class PruebasCanceladas(Exception):
+    """Las pruebas se interrumpieron porque 'cancelado()' retornó True (ver perform_rng_quality_tests_from_scratch)."""
+
+
+def perform_rng_quality_tests_from_scratch(rng_instance_to_test, num_samples: int, num_bins: int = None,
+                                           tamano_bloque: int = TAMANO_BLOQUE_VALIDACION, progreso=None, cancelado=None,
+                                           incluir_muestras: bool = False) -> dict:
+    """
+    Genera num_samples flotantes con el RNG y aplica Chi-cuadrado, K-S y autocorrelación lag-1.
+    Hasta 'tamano_bloque' muestras las pruebas son exactas sobre el arreglo; con más, las muestras se generan y
+    prueban bloque a bloque (AcumuladorUniformidad), con memoria acotada aunque num_samples sea ~10^9.
+    progreso(fraccion) se llama a medida que avanzan las pruebas y cancelado() se consulta entre etapas (o bloques);
+    si retorna True se lanza PruebasCanceladas. Con incluir_muestras=True el resultado de K-S incluye la ECDF para
+    graficar sin volver a generar: 'sorted_samples' (modo exacto) o 'ecdf_edges' / 'ecdf_values' (modo por bloques).
+    """
+    num_bins = num_bins or config.RNG_TEST_NUM_BINS_CHI2
+    def avanzar(fraccion):
+        if cancelado is not None and cancelado():
+            raise PruebasCanceladas()
+        if progreso is not None:
+            progreso(fraccion)
 
-def perform_rng_quality_tests_from_scratch(rng_instance_to_test, num_samples: int) -> dict:
     test_suite_results = {}
-    
-    # Asegurarnos de que generate_samples_from_rng_instance está definido o lo copiamos aquí
-    # Asumiendo que lo definimos en este mismo archivo:
-    float_samples = generate_samples_from_rng_instance(rng_instance_to_test, num_samples, 'float')
-    
     test_suite_results['rng_type'] = type(rng_instance_to_test).__name__
     if hasattr(rng_instance_to_test, 'initial_seed'): # Para que funcione con LCG y MiddleSquare
         test_suite_results['initial_seed_for_test_sequence'] = rng_instance_to_test.initial_seed
-    test_suite_results['num_samples_tested'] = len(float_samples)
-
-    test_suite_results['chi_squared_uniformity'] = run_chi_squared_test_uniform_floats_from_scratch(
-        float_samples, 
-        config.RNG_TEST_NUM_BINS_CHI2
-    )
-    test_suite_results['kolmogorov_smirnov_uniformity'] = run_kolmogorov_smirnov_test_uniform_floats_from_scratch(
-        float_samples
-    )
-    
-    if len(float_samples) > 1:
-        try:
-            samples_np = np.array(float_samples)
-            autocorr_lag1 = np.corrcoef(samples_np[:-1], samples_np[1:])[0, 1]
-            test_suite_results['autocorrelation_lag1_numpy'] = {'value': autocorr_lag1}
-        except Exception as e:
-            test_suite_results['autocorrelation_lag1_numpy'] = {'error': f'Error en Autocorrelación: {str(e)}'}
-    else:
-        test_suite_results['autocorrelation_lag1_numpy'] = {'error': 'No suficientes muestras'}
 
+    avanzar(0.0)
+    if num_samples <= tamano_bloque:
+        float_samples = generate_samples_from_rng_instance(rng_instance_to_test, num_samples, 'float')
+        avanzar(0.4)
+        test_suite_results['num_samples_tested'] = len(float_samples)
+        test_suite_results['chi_squared_uniformity'] = run_chi_squared_test_uniform_floats_from_scratch(float_samples, num_bins)
+        avanzar(0.5)
+        ks = run_kolmogorov_smirnov_test_uniform_floats_from_scratch(float_samples, incluir_muestras)
+        test_suite_results['kolmogorov_smirnov_uniformity'] = ks
+        avanzar(0.9)
+        test_suite_results['autocorrelation_lag1_numpy'] = _resultados_autocorrelacion(float_samples)
+        avanzar(1.0)
+        return test_suite_results
+
+    acumulador = AcumuladorUniformidad(num_bins)
+    for bloque in generate_sample_blocks_from_rng_instance(rng_instance_to_test, num_samples, tamano_bloque):
+        acumulador.agregar(bloque)
+        avanzar(0.95 * acumulador.n / num_samples)
+    test_suite_results['num_samples_tested'] = acumulador.n
+    test_suite_results['chi_squared_uniformity'] = acumulador.chi_cuadrado()
+    test_suite_results['kolmogorov_smirnov_uniformity'] = acumulador.kolmogorov_smirnov(incluir_muestras)
+    test_suite_results['autocorrelation_lag1_numpy'] = acumulador.autocorrelacion()
+    avanzar(1.0)
     return test_suite_results
 
-# Función auxiliar que estaba en rng_validator.py antes, necesaria para perform_rng_quality_tests_from_scratch
-def generate_samples_from_rng_instance(rng_instance, num_samples: int, sample_type: str = 'float') -> list:
-    samples = []
-    if sample_type == 'float':
-        for _ in range(num_samples):
-            samples.append(rng_instance.next_float())
-    return samples
\ No newline at end of file
+def ejecutar_pruebas_en_proceso(nombre, rng_instance, num_samples, num_bins=None, cola_progreso=None, evento_cancelar=None):
+    """
+    perform_rng_quality_tests_from_scratch para un pool de procesos (p. ej. el dashboard): el avance se envía a
+    'cola_progreso' como (nombre, fracción) y las pruebas se interrumpen cuando se activa 'evento_cancelar'
+    (multiprocessing.Manager().Queue() / .Event()). El resultado incluye la ECDF para graficar y el nombre;
+    si se canceló, retorna {'generator_name': nombre, 'cancelled': True}.
+    """
+    progreso = (lambda fraccion: cola_progreso.put((nombre, fraccion))) if cola_progreso is not None else None
+    cancelado = evento_cancelar.is_set if evento_cancelar is not None else None
+    try:
+        resultados = perform_rng_quality_tests_from_scratch(rng_instance, num_samples, num_bins, progreso=progreso,
+                                                            cancelado=cancelado, incluir_muestras=True)
+    except PruebasCanceladas:
+        return {'generator_name': nombre, 'cancelled': True}
+    resultados['generator_name'] = nombre
+    return resultados
+
+def generate_samples_from_rng_instance(rng_instance, num_samples: int, sample_type: str = 'float') -> np.ndarray:
+    """Arreglo con num_samples flotantes del RNG; usa next_floats (por bloques) si el generador lo tiene."""
+    if sample_type != 'float':
+        raise ValueError(f"Tipo de muestra no soportado: '{sample_type}'.")
+    if hasattr(rng_instance, 'next_floats'):
+        return rng_instance.next_floats(num_samples)
+    return np.fromiter((rng_instance.next_float() for _ in range(num_samples)), dtype=float, count=num_samples)
+
+def generate_sample_blocks_from_rng_instance(rng_instance, num_samples: int, tamano_bloque: int = TAMANO_BLOQUE_VALIDACION):
+    """Genera los num_samples flotantes del RNG en bloques (arreglos) de a lo sumo tamano_bloque, en orden."""
+    for inicio in range(0, num_samples, tamano_bloque):
+        yield generate_samples_from_rng_instance(rng_instance, min(tamano_bloque, num_samples - inicio))
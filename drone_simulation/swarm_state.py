@@ -0,0 +1,97 @@
+# drone_simulation/swarm_state.py
+import numpy as np
+
+class SwarmState:
+    """
+    Estado del enjambre en formato estructura-de-arreglos (SoA).
+    Posiciones, velocidades, aceleraciones y fuerzas se guardan en arreglos contiguos (N, 2);
+    radios y banderas de actividad en arreglos (N,). Cada Drone es solo un índice dentro de este estado.
+    """
+    def __init__(self, capacidad=16):
+        capacidad = max(1, int(capacidad))
+        self.n = 0 # Número de drones en uso (las filas [n:capacidad] son espacio reservado)
+        self._posiciones = np.zeros((capacidad, 2))
+        self._velocidades = np.zeros((capacidad, 2))
+        self._aceleraciones = np.zeros((capacidad, 2))
+        self._fuerzas = np.zeros((capacidad, 2))
+        self._radios = np.zeros(capacidad)
+        self._activos = np.zeros(capacidad, dtype=bool)
+
+    @property
+    def capacidad(self):
+        return len(self._radios)
+
+    # Vistas (sin copia) sobre los drones en uso. Escribir en ellas modifica el estado.
+    @property
+    def posiciones(self): return self._posiciones[:self.n]
+    @property
+    def velocidades(self): return self._velocidades[:self.n]
+    @property
+    def aceleraciones(self): return self._aceleraciones[:self.n]
+    @property
+    def fuerzas(self): return self._fuerzas[:self.n]
+    @property
+    def radios(self): return self._radios[:self.n]
+    @property
+    def activos(self): return self._activos[:self.n]
+
+    def _crecer(self, capacidad_minima):
+        """Duplica la capacidad de los arreglos (amortizado O(1) por dron añadido)."""
+        nueva_capacidad = max(capacidad_minima, 2 * self.capacidad)
+        for nombre in ('_posiciones', '_velocidades', '_aceleraciones', '_fuerzas', '_radios', '_activos'):
+            viejo = getattr(self, nombre)
+            nuevo = np.zeros((nueva_capacidad,) + viejo.shape[1:], dtype=viejo.dtype)
+            nuevo[:self.n] = viejo[:self.n]
+            setattr(self, nombre, nuevo)
+
+    def agregar(self, posicion, radio, velocidad=(0.0, 0.0), activo=True):
+        """Reserva una fila para un nuevo dron y retorna su índice."""
+        if self.n >= self.capacidad:
+            self._crecer(self.n + 1)
+        idx = self.n
+        self._posiciones[idx] = posicion
+        self._velocidades[idx] = velocidad
+        self._aceleraciones[idx] = 0.0
+        self._fuerzas[idx] = 0.0
+        self._radios[idx] = radio
+        self._activos[idx] = activo
+        self.n += 1
+        return idx
+
+    def trasladar_a(self, compartido, inicio):
+        """
+        Copia los drones en uso a las filas [inicio, inicio + n) de otro SwarmState y pasa a usar esas filas
+        como almacenamiento (vistas), de modo que varios estados comparten un único arreglo (ver MotorConjunto).
+        Los manejadores Drone siguen siendo válidos. Agregar otro dron después vuelve a reservar arreglos propios
+        y deshace el enlace.
+        """
+        fin = inicio + self.n
+        for nombre in ('_posiciones', '_velocidades', '_aceleraciones', '_fuerzas', '_radios', '_activos'):
+            filas = getattr(compartido, nombre)[inicio:fin]
+            filas[...] = getattr(self, nombre)[:self.n]
+            setattr(self, nombre, filas)
+        compartido.n = max(compartido.n, fin)
+
+    def quitar_ultimo(self):
+        """Libera la última fila. Solo se puede quitar el último dron para que los índices sigan siendo válidos."""
+        if self.n > 0:
+            self.n -= 1
+
+
+class _CampoEstado:
+    """
+    Descriptor que expone una fila de un arreglo de SwarmState como atributo de Drone.
+    Para campos vectoriales retorna una vista (escribir en ella modifica el estado del enjambre).
+    """
+    def __init__(self, nombre_arreglo, conversion=None):
+        self.nombre_arreglo = nombre_arreglo
+        self.conversion = conversion # float/bool para campos escalares, None para vectores
+
+    def __get__(self, obj, tipo=None):
+        if obj is None:
+            return self
+        valor = getattr(obj._estado, self.nombre_arreglo)[obj._idx]
+        return self.conversion(valor) if self.conversion else valor
+
+    def __set__(self, obj, valor):
+        getattr(obj._estado, self.nombre_arreglo)[obj._idx] = valor
@@ -0,0 +1,229 @@
+# drone_simulation/trayectoria.py
+"""
+Grabación de corridas en un archivo binario compacto y lectura para reproducirlas o analizarlas sin volver a simular.
+GrabadorTrayectoria agrega el estado de cada paso (posiciones y velocidades float32, drones activos empaquetados en
+bits, celdas de cobertura nuevas del paso y las métricas time / coverage / celdas_cubiertas / critical_collisions)
+en bloques de hasta PASOS_POR_BLOQUE_TRAYECTORIA pasos con el mismo número de drones. Cada bloque empieza con la
+grilla completa (empaquetada en bits) como fotograma clave; al cerrar se escribe un índice con el bloque de cada paso.
+LectorTrayectoria mapea el archivo en memoria (np.memmap) y va a cualquier paso en O(1): las posiciones y
+velocidades son vistas sin copia, y la grilla se reconstruye desde la clave de su bloque.
+
+Disposición (little-endian, secciones alineadas a 8 bytes):
+    cabecera: MAGIA, VERSION, nx, ny, pasos por bloque, DELTA_T (float64), 0, 0
+    bloque: cabecera (MAGIA_BLOQUE, bytes del bloque, paso inicial, pasos, n, celdas nuevas, 0, 0), grilla clave,
+            time, coverage, celdas_cubiertas, critical_collisions, posiciones (P, n, 2) float32, velocidades (P, n, 2)
+            float32, activos (P, ceil(n / 8)) bits, inicio de las celdas nuevas de cada paso (P + 1), celdas nuevas int32
+    índice: bloques (B, 4): desplazamiento, paso inicial, pasos, n; bloque de cada paso (N,) int32
+    pie: MAGIA_INDICE, desplazamiento del índice, B, N
+Si la grabación se interrumpe sin cerrar el archivo (sin índice), el lector lo reconstruye recorriendo los bloques.
+"""
+import math
+import numpy as np
+
+MAGIA, MAGIA_BLOQUE, MAGIA_INDICE = 0x5452_4159_4543, 0x424C_4F51, 0x494E_4443 # "TRAYEC", "BLOQ", "INDC"
+VERSION = 1
+_BYTES_CABECERA = 8 * 8
+_BYTES_PIE = 4 * 8
+_I8, _F8, _F4, _I4, _U1 = (np.dtype(tipo) for tipo in ('<i8', '<f8', '<f4', '<i4', 'u1'))
+
+def _alinear(bytes_):
+    return (bytes_ + 7) // 8 * 8
+
+def _disposicion_bloque(nx, ny, pasos, n, celdas):
+    """Secciones de un bloque: nombre -> (desplazamiento, dtype, forma), y el tamaño total en bytes."""
+    secciones, cursor = {}, 0
+    for nombre, dtype, forma in (
+        ("cabecera", _I8, (8,)), ("clave", _U1, ((nx * ny + 7) // 8,)),
+        ("time", _F8, (pasos,)), ("coverage", _F8, (pasos,)),
+        ("celdas_cubiertas", _I8, (pasos,)), ("critical_collisions", _I8, (pasos,)),
+        ("posiciones", _F4, (pasos, n, 2)), ("velocidades", _F4, (pasos, n, 2)),
+        ("activos", _U1, (pasos, (n + 7) // 8)), ("inicio_celdas", _I8, (pasos + 1,)),
+        ("celdas", _I4, (celdas,)),
+    ):
+        secciones[nombre] = (cursor, dtype, forma)
+        cursor += _alinear(math.prod(forma) * dtype.itemsize)
+    return secciones, cursor
+
+class GrabadorTrayectoria:
+    """
+    Escribe la trayectoria de un motor. Se asigna al motor con engine.grabador_trayectoria = grabador y
+    SimulationEngine.paso llama a grabar(engine) al final de cada paso; cerrar() escribe el último bloque y el índice.
+    Un bloque nuevo empieza al llenarse, al cambiar el número de drones o al resetearse el motor (grilla nueva).
+    """
+    def __init__(self, ruta, forma_grilla, pasos_por_bloque=1024, dt=0.0):
+        self.ruta = ruta
+        self.nx, self.ny = forma_grilla
+        self.pasos_por_bloque = int(pasos_por_bloque)
+        self.archivo = open(ruta, "wb")
+        cabecera = np.array([MAGIA, VERSION, self.nx, self.ny, self.pasos_por_bloque, 0, 0, 0], dtype='<i8')
+        cabecera[5:6] = np.array([dt], dtype='<f8').view('<i8')
+        self.archivo.write(cabecera.tobytes())
+        self.pasos = 0 # Pasos grabados
+        self._bloques = [] # (desplazamiento, paso inicial, pasos, n) de los bloques escritos
+        self._pendiente = None # Pasos del bloque en curso (aún en memoria)
+
+    @classmethod
+    def para_config(cls, ruta, config):
+        """Grabador para la grilla de cobertura que crea el motor con 'config' (la misma cuenta que _init_state)."""
+        forma_grilla = (config.ANCHO_PANTALLA // config.TAMANO_CELDA_COBERTURA, config.ALTO_PANTALLA // config.TAMANO_CELDA_COBERTURA)
+        return cls(ruta, forma_grilla, config.PASOS_POR_BLOQUE_TRAYECTORIA, config.DELTA_T)
+
+    def grabar(self, engine):
+        """Agrega el estado del motor después de su último paso."""
+        estado = engine.estado
+        n = estado.n
+        bloque = self._pendiente
+        if bloque is None or bloque["n"] != n or bloque["grilla"] is not engine.grilla or len(bloque["time"]) == self.pasos_por_bloque:
+            self._escribir_bloque()
+            clave = engine.grilla.reshape(-1) != 0
+            clave[engine.celdas_nuevas] = False # Grilla antes de este paso: el bloque la reconstruye con las celdas nuevas
+            bloque = self._pendiente = {
+                "n": n, "grilla": engine.grilla, "paso_inicial": self.pasos, "clave": np.packbits(clave),
+                "time": [], "coverage": [], "celdas_cubiertas": [], "critical_collisions": [],
+                "posiciones": [], "velocidades": [], "activos": [], "celdas": [],
+            }
+        bloque["time"].append(engine.time)
+        bloque["coverage"].append(engine.coverage)
+        bloque["celdas_cubiertas"].append(engine.celdas_cubiertas)
+        bloque["critical_collisions"].append(engine.critical_collisions)
+        bloque["posiciones"].append(estado.posiciones.astype(np.float32))
+        bloque["velocidades"].append(estado.velocidades.astype(np.float32))
+        bloque["activos"].append(np.packbits(estado.activos))
+        bloque["celdas"].append(np.asarray(engine.celdas_nuevas, dtype=np.int32))
+        self.pasos += 1
+
+    def _escribir_bloque(self):
+        bloque, self._pendiente = self._pendiente, None
+        if bloque is None or not bloque["time"]:
+            return
+        pasos, n = len(bloque["time"]), bloque["n"]
+        inicio_celdas = np.concatenate([[0], np.cumsum([len(c) for c in bloque["celdas"]])])
+        secciones, total = _disposicion_bloque(self.nx, self.ny, pasos, n, int(inicio_celdas[-1]))
+        datos = {
+            "cabecera": [MAGIA_BLOQUE, total, bloque["paso_inicial"], pasos, n, inicio_celdas[-1], 0, 0],
+            "clave": bloque["clave"], "inicio_celdas": inicio_celdas,
+            "celdas": np.concatenate(bloque["celdas"]),
+            "posiciones": np.stack(bloque["posiciones"]).reshape(pasos, n, 2),
+            "velocidades": np.stack(bloque["velocidades"]).reshape(pasos, n, 2),
+            "activos": np.stack(bloque["activos"]).reshape(pasos, (n + 7) // 8),
+        }
+        for nombre in ("time", "coverage", "celdas_cubiertas", "critical_collisions"):
+            datos[nombre] = bloque[nombre]
+        buffer = bytearray(total)
+        for nombre, (desplazamiento, dtype, forma) in secciones.items():
+            np.ndarray(forma, dtype, buffer, desplazamiento)[...] = np.asarray(datos[nombre]).reshape(forma)
+        self._bloques.append((self.archivo.tell(), bloque["paso_inicial"], pasos, n))
+        self.archivo.write(buffer)
+
+    def cerrar(self):
+        """Escribe el bloque en curso, el índice y el pie, y cierra el archivo."""
+        if self.archivo.closed:
+            return
+        self._escribir_bloque()
+        desplazamiento_indice = self.archivo.tell()
+        bloques = np.array(self._bloques, dtype='<i8').reshape(-1, 4)
+        bloque_de_paso = np.repeat(np.arange(len(bloques), dtype='<i4'), bloques[:, 2])
+        self.archivo.write(bloques.tobytes())
+        self.archivo.write(bloque_de_paso.tobytes())
+        self.archivo.write(b"\0" * (_alinear(bloque_de_paso.nbytes) - bloque_de_paso.nbytes))
+        self.archivo.write(np.array([MAGIA_INDICE, desplazamiento_indice, len(bloques), self.pasos], dtype='<i8').tobytes())
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+class PasoTrayectoria:
+    """
+    Estado grabado de un paso. 'posiciones' y 'velocidades' (float32, (n, 2)) son vistas sobre el archivo mapeado;
+    'activos' se desempaqueta a bool y la grilla se reconstruye al pedirla con grilla().
+    """
+    def __init__(self, lector, bloque, k):
+        self._lector, self._bloque, self._k = lector, bloque, k
+        self.paso = bloque["paso_inicial"] + k
+        self.n = bloque["n"]
+        self.time = float(bloque["time"][k])
+        self.coverage = float(bloque["coverage"][k])
+        self.celdas_cubiertas = int(bloque["celdas_cubiertas"][k])
+        self.critical_collisions = int(bloque["critical_collisions"][k])
+        self.posiciones = bloque["posiciones"][k]
+        self.velocidades = bloque["velocidades"][k]
+        self.activos = np.unpackbits(bloque["activos"][k], count=self.n).astype(bool)
+
+    @property
+    def celdas_nuevas(self):
+        """Índices planos (ix * ny + iy) de las celdas cubiertas en este paso."""
+        inicio = self._bloque["inicio_celdas"]
+        return self._bloque["celdas"][inicio[self._k]:inicio[self._k + 1]]
+
+    def grilla(self):
+        """Grilla de cobertura (nx, ny) después de este paso: la clave del bloque más las celdas nuevas hasta él."""
+        plana = np.unpackbits(self._bloque["clave"], count=self._lector.nx * self._lector.ny)
+        plana[self._bloque["celdas"][:self._bloque["inicio_celdas"][self._k + 1]]] = 1
+        return plana.reshape(self._lector.nx, self._lector.ny)
+
+class LectorTrayectoria:
+    """Lee un archivo de GrabadorTrayectoria mapeado en memoria; len(lector) pasos, lector[i] -> PasoTrayectoria."""
+    def __init__(self, ruta):
+        self.datos = np.memmap(ruta, dtype=np.uint8, mode='r')
+        cabecera = np.ndarray((8,), '<i8', self.datos, 0)
+        if cabecera[0] != MAGIA or cabecera[1] != VERSION:
+            raise ValueError(f"{ruta} no es una trayectoria de la simulación (versión {VERSION}).")
+        self.nx, self.ny, self.pasos_por_bloque = (int(v) for v in cabecera[2:5])
+        self.dt = float(cabecera[5:6].view('<f8')[0])
+        pie = np.ndarray((4,), '<i8', self.datos, len(self.datos) - _BYTES_PIE) if len(self.datos) >= _BYTES_CABECERA + _BYTES_PIE else None
+        if pie is not None and pie[0] == MAGIA_INDICE:
+            desplazamiento, num_bloques, pasos = (int(v) for v in pie[1:])
+            self.bloques = np.ndarray((num_bloques, 4), '<i8', self.datos, desplazamiento)
+            self.bloque_de_paso = np.ndarray((pasos,), '<i4', self.datos, desplazamiento + self.bloques.nbytes)
+            self.completo = True
+        else:
+            self.bloques, self.bloque_de_paso = self._reconstruir_indice()
+            self.completo = False # Grabación interrumpida: índice reconstruido recorriendo los bloques
+        self._ultimo_bloque = (None, None) # (índice, vistas) del último bloque pedido: la lectura suele ser secuencial
+
+    def _reconstruir_indice(self):
+        bloques, cursor = [], _BYTES_CABECERA
+        while cursor + 64 <= len(self.datos):
+            cabecera = np.ndarray((8,), '<i8', self.datos, cursor)
+            if cabecera[0] != MAGIA_BLOQUE or cursor + cabecera[1] > len(self.datos): # Bloque incompleto: fin de lo grabado
+                break
+            bloques.append((cursor, int(cabecera[2]), int(cabecera[3]), int(cabecera[4])))
+            cursor += int(cabecera[1])
+        bloques = np.array(bloques, dtype=np.int64).reshape(-1, 4)
+        return bloques, np.repeat(np.arange(len(bloques), dtype=np.int32), bloques[:, 2])
+
+    def __len__(self):
+        return len(self.bloque_de_paso)
+
+    def bloque(self, indice):
+        """Secciones del bloque 'indice' como vistas sobre el archivo (dict nombre -> arreglo), más paso_inicial y n."""
+        if self._ultimo_bloque[0] == indice:
+            return self._ultimo_bloque[1]
+        desplazamiento, paso_inicial, pasos, n = (int(v) for v in self.bloques[indice])
+        celdas = int(np.ndarray((8,), '<i8', self.datos, desplazamiento)[5])
+        secciones, _ = _disposicion_bloque(self.nx, self.ny, pasos, n, celdas)
+        vistas = {nombre: np.ndarray(forma, dtype, self.datos, desplazamiento + inicio)
+                  for nombre, (inicio, dtype, forma) in secciones.items()}
+        vistas.update(paso_inicial=paso_inicial, n=n)
+        self._ultimo_bloque = (indice, vistas)
+        return vistas
+
+    def __getitem__(self, paso):
+        if paso < 0:
+            paso += len(self)
+        if not 0 <= paso < len(self):
+            raise IndexError(f"Paso {paso} fuera de la trayectoria ({len(self)} pasos).")
+        bloque = self.bloque(int(self.bloque_de_paso[paso]))
+        return PasoTrayectoria(self, bloque, paso - bloque["paso_inicial"])
+
+    def serie(self, nombre):
+        """Serie completa de una métrica por paso ('time', 'coverage', 'celdas_cubiertas' o 'critical_collisions')."""
+        return np.concatenate([self.bloque(b)[nombre] for b in range(len(self.bloques))]) if len(self.bloques) else np.zeros(0)
+
+    def cerrar(self):
+        """Suelta el mapeo (el archivo se desmapea cuando no quedan vistas de pasos leídos)."""
+        self.datos = self.bloques = self.bloque_de_paso = None
+        self._ultimo_bloque = (None, None)
@@ -1,6 +1,10 @@
 # drone_simulation/ui.py
 import pygame
+from . import render
 from .engine import SimulationEngine
+from .hilo_fisica import HiloFisica, Instantanea
+from .memoria_compartida import CanalCompartido
+from .trayectoria import GrabadorTrayectoria
 import os, subprocess, sys
 
 class SimulationUI:
@@ -14,9 +18,16 @@ class SimulationUI:
         )
         pygame.display.set_caption("Simulación Enjambre - Pygame")
         self.clock = pygame.time.Clock()
+        self.teclas = render.teclas_acciones(config) # Código de tecla -> acción
+        self.capa_cobertura = render.CapaCobertura(config) # Grilla de cobertura como superficie persistente
+        self.capa_enjambre = render.CapaEnjambre(config) # Obstáculos y drones con sprites cacheados, un blit por lote
 
         # Motor de simulación y reporter
         self.engine = SimulationEngine(config, rngs)
+        if config.MEMORIA_COMPARTIDA: # Publicar el estado de cada paso para visores en otros procesos
+            self.engine.canal_compartido = CanalCompartido.para_config(config, config.MEMORIA_COMPARTIDA)
+        if config.ARCHIVO_TRAYECTORIA: # Grabar cada paso para reproducir o analizar la corrida después
+            self.engine.grabador_trayectoria = GrabadorTrayectoria.para_config(config.ARCHIVO_TRAYECTORIA, config)
 
         # Fuentes para métricas y mensajes
         self.font_metrics = pygame.font.SysFont(None, 22)
@@ -29,13 +40,38 @@ class SimulationUI:
 
         # Control de velocidad de simulación
         self.simulation_speed_multiplier = 1.0  # 1.0 para velocidad normal
-        self.simulation_time_accumulator = 0.0  # Para manejar multiplicadores fraccionales
+        self.simulation_time_accumulator = 0.0  # Para manejar multiplicadores fraccionales (sin hilo de física)
+
+        # Con FISICA_EN_HILO el motor avanza en su propio hilo y aquí solo se dibujan sus instantáneas
+        self.hilo_fisica = HiloFisica(self.engine, self.simulation_speed_multiplier) if config.FISICA_EN_HILO else None
+        self._instantanea = None # Última instantánea tomada del motor (sin hilo de física)
+
+    def _en_motor(self, accion):
+        """Aplica una acción sobre el motor: en el hilo de física si lo hay (entre dos pasos), si no de inmediato."""
+        if self.hilo_fisica is not None:
+            self.hilo_fisica.encolar(accion)
+        else:
+            accion()
+
+    def _cambiar_velocidad(self, sentido):
+        """Pasa al multiplicador siguiente (+1) o anterior (-1) de config.VELOCIDADES_SIMULACION."""
+        velocidades = sorted(self.config.VELOCIDADES_SIMULACION)
+        if sentido > 0:
+            mayores = [v for v in velocidades if v > self.simulation_speed_multiplier]
+            self.simulation_speed_multiplier = mayores[0] if mayores else velocidades[-1]
+        else:
+            menores = [v for v in velocidades if v < self.simulation_speed_multiplier]
+            self.simulation_speed_multiplier = menores[-1] if menores else velocidades[0]
+        if self.hilo_fisica is not None:
+            self.hilo_fisica.multiplicador = self.simulation_speed_multiplier
 
     def run(self):
         """Inicia el bucle principal de Pygame."""
         # self.running se usa para el bucle principal de la aplicación
         # self.paused se usa para pausar/reanudar la lógica de la simulación
         
+        if self.hilo_fisica is not None:
+            self.hilo_fisica.iniciar()
         app_running = True
         while app_running:
             # Manejo de eventos
@@ -45,32 +81,37 @@ class SimulationUI:
                     self.running = False # Para asegurar que cualquier sub-bucle también termine
 
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == self.config.TECLA_PAUSA_REANUDAR:
+                    accion = self.teclas.get(event.key)
+                    if accion == render.PAUSA:
                         self.paused = not self.paused
+                        if self.hilo_fisica is not None:
+                            self.hilo_fisica.pausado = self.paused
 
-                    elif event.key == self.config.TECLA_RESETEAR:
-                        self.engine._init_state()
+                    elif accion == render.RESETEAR:
+                        self._en_motor(self.engine._init_state)
 
-                    elif event.key == self.config.TECLA_ANADIR_DRON:
-                        self.engine._spawn_drones(1)
+                    elif accion == render.ANADIR_DRON:
+                        self._en_motor(lambda: self.engine._spawn_drones(1))
 
-                    elif event.key == self.config.TECLA_QUITAR_DRON:
-                        if self.engine.drones: # Asegurarse que hay drones para quitar
-                            self.engine.drones.pop()
+                    elif accion == render.QUITAR_DRON:
+                        self._en_motor(self.engine._remove_last_drone) # No hace nada si no hay drones
 
-                    elif event.key == self.config.TECLA_EJECUTAR_RNG_TESTS:
+                    elif accion == render.RNG_TESTS:
                         dash = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'rng_dashboard.py'))
                         subprocess.Popen([sys.executable, dash])
 
                     # Teclas para controlar la velocidad de simulación
-                    elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
-                        self.simulation_speed_multiplier = min(self.simulation_speed_multiplier + 0.5, 5.0) # Cap max 5x
-                    elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
-                        self.simulation_speed_multiplier = max(0.5, self.simulation_speed_multiplier - 0.5) # Cap min 0.5x
+                    elif accion == render.ACELERAR:
+                        self._cambiar_velocidad(+1)
+                    elif accion == render.DESACELERAR:
+                        self._cambiar_velocidad(-1)
 
+            if self.hilo_fisica is not None:
+                if self.hilo_fisica.error is not None: # El hilo de física falló: no seguir dibujando un estado congelado
+                    raise self.hilo_fisica.error
 
-            # Actualizar simulación si no está pausada
-            if not self.paused:
+            # Sin hilo de física: actualizar simulación en este mismo bucle si no está pausada
+            elif not self.paused:
                 # Determinar cuántos pasos de simulación ejecutar este fotograma visual
                 steps_to_run_float = self.simulation_speed_multiplier
                 
@@ -94,38 +135,37 @@ class SimulationUI:
             self._draw()
             self.clock.tick(self.config.FPS) # Controla el FPS visual
 
+        # Lo que el motor escribe en cada paso solo se libera cuando el hilo de física terminó (no está en paso())
+        detenido = self.hilo_fisica is None or self.hilo_fisica.detener()
+        if detenido and self.engine.canal_compartido is not None:
+            self.engine.canal_compartido.cerrar()
+        if detenido and self.engine.grabador_trayectoria is not None:
+            self.engine.grabador_trayectoria.cerrar()
         pygame.quit()
 
     def _draw(self):
-        """Dibuja grilla, obstáculos, drones y métricas."""
+        """Dibuja grilla, obstáculos, drones y métricas a partir de una instantánea del motor."""
+        if self.hilo_fisica is not None:
+            instantanea = self.hilo_fisica.instantanea_interpolada() # Posiciones entre las dos últimas publicadas
+        else:
+            instantanea = self._instantanea = Instantanea.de_motor(self.engine, anterior=self._instantanea)
+
         # Fondo y grilla de cobertura
         self.screen.fill(self.config.GRIS_CLARO)
-        nx_grid, ny_grid = self.engine.grilla.shape # Corregido para usar las dimensiones reales de la grilla del engine
-        cell_size = self.config.TAMANO_CELDA_COBERTURA # Corregido para usar el nombre correcto de la variable
-        for i in range(nx_grid):
-            for j in range(ny_grid):
-                color = (
-                    self.config.COLOR_CELDA_CUBIERTA
-                    if self.engine.grilla[i, j] else
-                    self.config.COLOR_CELDA_NO_CUBIERTA
-                )
-                rect = pygame.Rect(i * cell_size, j * cell_size, cell_size, cell_size)
-                pygame.draw.rect(self.screen, color, rect)
+        self.capa_cobertura.dibujar(self.screen, instantanea) # Solo redibuja las celdas que cambiaron
 
         # Dibujar obstáculos y drones
-        for obs in self.engine.obstaculos:
-            obs.dibujar(self.screen)
-        for dr in self.engine.drones:
-            dr.dibujar(self.screen)
+        self.capa_enjambre.dibujar(self.screen, instantanea)
 
         # Métricas en pantalla
         y_offset = 10 # Renombrado para claridad
+        activos = int(instantanea.activos.sum())
         texts = [
-            f"Tiempo Sim: {self.engine.time:.2f}s",
-            f"Cobertura: {self.engine.coverage:.2f}%",
-            f"Drones activos: {sum(d.esta_activo for d in self.engine.drones)}",
-            f"Drones inactivos: {len(self.engine.drones) - sum(d.esta_activo for d in self.engine.drones)}",
-            f"Colisiones críticas: {self.engine.critical_collisions}"
+            f"Tiempo Sim: {instantanea.time:.2f}s",
+            f"Cobertura: {instantanea.coverage:.2f}%",
+            f"Drones activos: {activos}",
+            f"Drones inactivos: {len(instantanea.activos) - activos}",
+            f"Colisiones críticas: {instantanea.critical_collisions}"
         ]
         for line in texts:
             surf = self.font_metrics.render(line, True, self.config.NEGRO)
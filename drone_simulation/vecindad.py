@@ -0,0 +1,239 @@
+# drone_simulation/vecindad.py
+import numpy as np
+
+# Holgura relativa al seleccionar pares candidatos: el filtro exacto lo aplica quien consume los pares,
+# así un redondeo distinto en la distancia nunca descarta un par que el cálculo por dron sí consideraría.
+HOLGURA_CANDIDATOS = 1e-9
+
+def _ordenar_pares(i, j):
+    """Retorna los pares con i < j, ordenados por (i, j) como los recorre un doble bucle."""
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    orden = np.lexsort((j, i))
+    return i[orden], j[orden]
+
+def _expandir_rangos(inicios, cuentas):
+    """
+    Para cada consulta k con un rango [inicios[k], inicios[k] + cuentas[k]) retorna los pares
+    (k, posición) de todos los elementos de los rangos, sin bucles en Python.
+    """
+    total = int(cuentas.sum())
+    consulta = np.repeat(np.arange(len(cuentas)), cuentas)
+    desplazamiento = np.arange(total) - np.repeat(np.cumsum(cuentas) - cuentas, cuentas)
+    return consulta, np.repeat(inicios, cuentas) + desplazamiento
+
+def pares_en_rango_bruto(posiciones, activos, radio, tam_bloque=512):
+    """
+    Retorna los pares (i, j), con i < j, de drones activos cuya distancia es menor que 'radio',
+    ordenados por (i, j). Fuerza bruta O(N^2) procesada por bloques de filas para acotar la memoria.
+    """
+    idx_activos = np.flatnonzero(activos)
+    pos = posiciones[idx_activos]
+    n = len(idx_activos)
+    radio_sq = (radio * (1.0 + HOLGURA_CANDIDATOS))**2
+    lista_i, lista_j = [], []
+    for ini in range(0, n, tam_bloque):
+        fin = min(ini + tam_bloque, n)
+        dif = pos[None, ini + 1:, :] - pos[ini:fin, None, :] # Solo j > ini para recortar el triángulo inferior
+        dist_sq = dif[..., 0]**2 + dif[..., 1]**2
+        mascara = dist_sq < radio_sq
+        mascara &= (np.arange(ini + 1, n)[None, :] > np.arange(ini, fin)[:, None]) # Triángulo superior (j > i)
+        ii, jj = np.nonzero(mascara)
+        lista_i.append(ii + ini)
+        lista_j.append(jj + ini + 1)
+    if not lista_i:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    return idx_activos[np.concatenate(lista_i)], idx_activos[np.concatenate(lista_j)]
+
+
+class GrillaEspacial:
+    """
+    Índice espacial de celdas uniformes (spatial hash) para consultas de pares cercanos.
+    Se construye una vez por paso con las posiciones del enjambre y luego responde consultas
+    de pares a distancia < radio para cualquier radio, revisando solo las celdas vecinas.
+    Con densidad acotada el costo es O(N) en lugar de O(N^2).
+    """
+    def __init__(self, tamano_celda):
+        if tamano_celda <= 0:
+            raise ValueError("El tamaño de celda de la GrillaEspacial debe ser positivo.")
+        self.tamano_celda = float(tamano_celda)
+        self.construir(np.zeros((0, 2)))
+
+    def construir(self, posiciones, grupos=None):
+        """
+        Ordena los puntos por celda. 'posiciones' es un arreglo (N, 2); los índices retornados se refieren a sus filas.
+        Con 'grupos' (entero por punto, p. ej. el mundo de cada dron en un MotorConjunto) solo se forman pares
+        entre puntos del mismo grupo: cada grupo ocupa su propio rango de claves.
+        """
+        celdas = np.floor(posiciones / self.tamano_celda).astype(np.int64)
+        if len(celdas) > 0:
+            celdas -= celdas.min(axis=0) # Celdas desde (0, 0) para poder usar una clave entera densa
+            self._dims = celdas.max(axis=0) + 1
+        else:
+            self._dims = np.ones(2, dtype=np.int64)
+        base = 0 if grupos is None else np.asarray(grupos, dtype=np.int64) * (self._dims[0] * self._dims[1])
+        claves = base + celdas[:, 0] * self._dims[1] + celdas[:, 1]
+        self._orden = np.argsort(claves, kind='stable') # Fila original de cada punto en orden de celda
+        self._claves = claves[self._orden]
+        self._base = 0 if grupos is None else base[self._orden] # Clave del grupo de cada punto
+        self._celdas = celdas[self._orden]
+        self._pos = posiciones[self._orden]
+
+    def pares(self, radio):
+        """
+        Retorna los pares candidatos (i, j), con i < j, a distancia < radio, ordenados por (i, j).
+        Solo se recorre la mitad del vecindario de celdas para no generar cada par dos veces.
+        """
+        m = len(self._claves)
+        vacio = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+        if m < 2 or radio <= 0:
+            return vacio
+        extension = int(self._dims.max())
+        if np.isfinite(radio):
+            r_celdas = min(int(np.ceil(radio / self.tamano_celda)), extension)
+        else:
+            r_celdas = extension
+        radio_sq = (radio * (1.0 + HOLGURA_CANDIDATOS))**2
+
+        propios = np.arange(m)
+        lista_a, lista_b = [], []
+        for dx in range(0, r_celdas + 1):
+            for dy in range(-r_celdas, r_celdas + 1):
+                if dx == 0 and dy < 0:
+                    continue # La otra mitad del vecindario ya queda cubierta por simetría
+                vecina = self._celdas + (dx, dy)
+                dentro = ((vecina[:, 0] < self._dims[0]) & (vecina[:, 1] >= 0) & (vecina[:, 1] < self._dims[1]))
+                clave_vecina = self._base + vecina[:, 0] * self._dims[1] + vecina[:, 1]
+                inicio = np.searchsorted(self._claves, clave_vecina, side='left')
+                fin = np.searchsorted(self._claves, clave_vecina, side='right')
+                if dx == 0 and dy == 0:
+                    inicio = propios + 1 # En la propia celda solo los que siguen en el orden (sin auto-pares)
+                cuentas = np.where(dentro, np.maximum(fin - inicio, 0), 0)
+                if not cuentas.any():
+                    continue
+                a, b = _expandir_rangos(inicio, cuentas)
+                dif = self._pos[b] - self._pos[a]
+                cerca = (dif[:, 0]**2 + dif[:, 1]**2) < radio_sq
+                lista_a.append(a[cerca])
+                lista_b.append(b[cerca])
+        if not lista_a:
+            return vacio
+        return _ordenar_pares(self._orden[np.concatenate(lista_a)], self._orden[np.concatenate(lista_b)])
+
+
+def vecinos_por_dron(pares, n):
+    """
+    Convierte pares (i, j) en listas de adyacencia CSR: los vecinos de k son
+    vecinos[inicio[k]:inicio[k + 1]], en orden creciente de índice.
+    """
+    i, j = pares
+    origen = np.concatenate([i, j])
+    destino = np.concatenate([j, i])
+    orden = np.lexsort((destino, origen))
+    inicio = np.searchsorted(origen[orden], np.arange(n + 1))
+    return inicio, destino[orden]
+
+
+class IndiceObstaculos:
+    """
+    Índice de obstáculos para consultas "obstáculos a distancia < R del punto p".
+    Los obstáculos estáticos nunca se mueven: se agrupan en celdas uniformes que se construyen una sola vez
+    (y de nuevo solo si se añade otro estático). Los dinámicos son pocos y se revisan por fuerza bruta;
+    su posición, radio y actividad se refrescan cuando Obstaculo.actualizar reporta un cambio.
+    El índice k de cada obstáculo es su posición en la lista de obstáculos del motor.
+    """
+    def __init__(self, tamano_celda):
+        if tamano_celda <= 0:
+            raise ValueError("El tamaño de celda del IndiceObstaculos debe ser positivo.")
+        self.tamano_celda = float(tamano_celda)
+        self.posiciones = np.zeros((0, 2))
+        self.radios = np.zeros(0)
+        self.activos = np.zeros(0, dtype=bool)
+        self.dinamicos = np.zeros(0, dtype=bool)
+        self._estaticos_construidos = False
+
+    def agregar(self, obstaculo):
+        """Registra un obstáculo nuevo (al final de la lista del motor) y retorna su índice."""
+        self.posiciones = np.vstack([self.posiciones, obstaculo.posicion])
+        self.radios = np.append(self.radios, obstaculo.radio)
+        self.activos = np.append(self.activos, obstaculo.esta_activo)
+        self.dinamicos = np.append(self.dinamicos, obstaculo.es_dinamico)
+        if not obstaculo.es_dinamico:
+            self._estaticos_construidos = False
+        return len(self.radios) - 1
+
+    def actualizar(self, k, obstaculo):
+        """Refresca el obstáculo k tras un cambio (activación, desactivación o reaparición en otro lugar)."""
+        self.posiciones[k] = obstaculo.posicion
+        self.radios[k] = obstaculo.radio
+        self.activos[k] = obstaculo.esta_activo
+        if not self.dinamicos[k]:
+            self._estaticos_construidos = False
+
+    def _construir_estaticos(self):
+        """Ordena los obstáculos estáticos activos por celda (una vez; no cambian entre pasos)."""
+        estaticos = np.flatnonzero(~self.dinamicos & self.activos)
+        celdas = np.floor(self.posiciones[estaticos] / self.tamano_celda).astype(np.int64)
+        if len(celdas) > 0:
+            self._origen = celdas.min(axis=0)
+            self._dims = celdas.max(axis=0) - self._origen + 1
+        else:
+            self._origen = np.zeros(2, dtype=np.int64)
+            self._dims = np.ones(2, dtype=np.int64)
+        celdas -= self._origen
+        claves = celdas[:, 0] * self._dims[1] + celdas[:, 1]
+        orden = np.argsort(claves, kind='stable')
+        self._estaticos = estaticos[orden]
+        self._claves = claves[orden]
+        self._radio_max_estatico = float(self.radios[estaticos].max()) if len(estaticos) else 0.0
+        self._estaticos_construidos = True
+
+    def pares(self, puntos, activos_puntos, radio, sumar_radio_obstaculo=True):
+        """
+        Retorna los pares candidatos (p, k) de puntos activos y obstáculos activos con
+        distancia entre centros < radio (+ radio del obstáculo k si sumar_radio_obstaculo),
+        ordenados por (p, k) como un doble bucle sobre puntos y obstáculos.
+        """
+        if not self._estaticos_construidos:
+            self._construir_estaticos()
+        idx_puntos = np.flatnonzero(activos_puntos)
+        pos = puntos[idx_puntos]
+        lista_p, lista_k = [], []
+
+        # Obstáculos estáticos: solo las celdas alrededor de cada punto
+        if len(self._estaticos) > 0 and len(pos) > 0 and radio > 0:
+            alcance = radio + (self._radio_max_estatico if sumar_radio_obstaculo else 0.0)
+            r_celdas = int(np.ceil(alcance / self.tamano_celda)) if np.isfinite(alcance) else None
+            if r_celdas is None or (2 * r_celdas + 1)**2 >= self._dims[0] * self._dims[1]:
+                # El vecindario cubre toda la grilla: todos los estáticos son candidatos
+                lista_p.append(np.repeat(np.arange(len(pos)), len(self._estaticos)))
+                lista_k.append(np.tile(self._estaticos, len(pos)))
+            else:
+                celdas = np.floor(pos / self.tamano_celda).astype(np.int64) - self._origen
+                for dx in range(-r_celdas, r_celdas + 1):
+                    for dy in range(-r_celdas, r_celdas + 1):
+                        vecina = celdas + (dx, dy)
+                        dentro = ((vecina[:, 0] >= 0) & (vecina[:, 0] < self._dims[0]) &
+                                  (vecina[:, 1] >= 0) & (vecina[:, 1] < self._dims[1]))
+                        clave = vecina[:, 0] * self._dims[1] + vecina[:, 1]
+                        inicio = np.searchsorted(self._claves, clave, side='left')
+                        cuentas = np.where(dentro, np.searchsorted(self._claves, clave, side='right') - inicio, 0)
+                        if cuentas.any():
+                            p, posicion = _expandir_rangos(inicio, cuentas)
+                            lista_p.append(p)
+                            lista_k.append(self._estaticos[posicion])
+
+        # Obstáculos dinámicos activos: pocos, se revisan todos
+        dinamicos = np.flatnonzero(self.dinamicos & self.activos)
+        if len(dinamicos) > 0 and len(pos) > 0:
+            lista_p.append(np.repeat(np.arange(len(pos)), len(dinamicos)))
+            lista_k.append(np.tile(dinamicos, len(pos)))
+
+        if not lista_p:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        p, k = np.concatenate(lista_p), np.concatenate(lista_k)
+        dif = self.posiciones[k] - pos[p]
+        limite = radio + (self.radios[k] if sumar_radio_obstaculo else 0.0)
+        cerca = (dif[:, 0]**2 + dif[:, 1]**2) < (limite * (1.0 + HOLGURA_CANDIDATOS))**2
+        p, k = idx_puntos[p[cerca]], k[cerca]
+        orden = np.lexsort((k, p))
+        return p[orden], k[orden]
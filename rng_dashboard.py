@@ -2,17 +2,21 @@
 import sys
 import os
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel,
     QPushButton, QComboBox, QHBoxLayout, QSizePolicy, QScrollArea,
-    QTextEdit, QGroupBox
+    QTextEdit, QGroupBox, QCheckBox, QProgressBar
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from drone_simulation.rng import LCG, MiddleSquareRNG
-from drone_simulation.rng_validator import perform_rng_quality_tests_from_scratch
+from drone_simulation.rng_validator import ejecutar_pruebas_en_proceso
+
+PUNTOS_ECDF_GRAFICO = 1000 # Puntos de la ECDF dibujados por generador (submuestra de las muestras ordenadas)
 
 class RNGDashboard(QMainWindow):
     def __init__(self):
@@ -22,6 +26,13 @@ class RNGDashboard(QMainWindow):
         self.config_data = self.cargar_config_runtime()
         self.generadores = {}
         self.setup_generadores()
+        # Las pruebas corren en un pool de procesos; la ventana consulta el avance con un QTimer sin bloquearse
+        self.pool = None # ProcessPoolExecutor, se crea en la primera ejecución
+        self.manager = None # multiprocessing.Manager para la cola de progreso y el evento de cancelación
+        self.futuros = {} # Nombre del generador -> Future de sus pruebas en curso
+        self.progreso = {} # Nombre del generador -> fracción completada
+        self.timer_pruebas = QTimer(self)
+        self.timer_pruebas.timeout.connect(self._revisar_pruebas)
         self.setup_ui()
 
     def cargar_config_runtime(self):
@@ -138,10 +149,23 @@ class RNGDashboard(QMainWindow):
         controls_layout.addWidget(QLabel("Generador:"))
         controls_layout.addWidget(self.combo)
 
+        self.check_comparar = QCheckBox("Comparar los tres")
+        self.check_comparar.setToolTip("Prueba los tres generadores configurados a la vez y los muestra lado a lado.")
+        controls_layout.addWidget(self.check_comparar)
+
         self.btn_run_tests = QPushButton("Ejecutar Pruebas")
         self.btn_run_tests.clicked.connect(self.ejecutar_pruebas)
         self.btn_run_tests.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; padding: 5px; }")
         controls_layout.addWidget(self.btn_run_tests)
+
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.clicked.connect(self.cancelar_pruebas)
+        self.btn_cancelar.setEnabled(False)
+        controls_layout.addWidget(self.btn_cancelar)
+
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setRange(0, 100)
+        controls_layout.addWidget(self.barra_progreso)
         controls_groupbox.setLayout(controls_layout)
         main_layout.addWidget(controls_groupbox)
 
@@ -167,17 +191,8 @@ class RNGDashboard(QMainWindow):
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
-    def ejecutar_pruebas(self):
-        self.figure.clear() # Limpiar figuras anteriores
-        gen_key = self.combo.currentText()
-        
-        if not gen_key:
-            self.result_text_area.setText("Por favor, selecciona un generador.")
-            return
-        
-        rng_instance = self.generadores[gen_key]() # Crear instancia del RNG seleccionado
-        
-        # Obtener parámetros para las pruebas desde la configuración cargada
+    def _parametros_prueba(self):
+        """(muestras, bins de Chi²) desde la configuración cargada."""
         num_samples_test = self.config_data.get("RNG_TEST_NUM_SAMPLES", 10000)
         try: # Asegurarse que sean enteros
             num_samples_test = int(num_samples_test)
@@ -191,10 +206,90 @@ class RNGDashboard(QMainWindow):
         except (ValueError, TypeError):
             num_bins_chi2 = 10
             print("Advertencia: RNG_TEST_NUM_BINS_CHI2 no es un entero válido en config, usando 10.")
+        return num_samples_test, num_bins_chi2
+
+    def ejecutar_pruebas(self):
+        """Lanza las pruebas del generador elegido (o de los tres) en el pool de procesos y vuelve de inmediato."""
+        gen_key = self.combo.currentText()
+        if not gen_key:
+            self.result_text_area.setText("Por favor, selecciona un generador.")
+            return
+        if self.futuros: # Ya hay pruebas en curso
+            return
+        nombres = list(self.generadores) if self.check_comparar.isChecked() else [gen_key]
+        num_samples_test, num_bins_chi2 = self._parametros_prueba()
+
+        if self.pool is None:
+            self.manager = multiprocessing.Manager()
+            self.cola_progreso = self.manager.Queue()
+            self.evento_cancelar = self.manager.Event()
+            self.pool = ProcessPoolExecutor(max_workers=len(self.generadores))
+        self.evento_cancelar.clear()
+        self.progreso = {nombre: 0.0 for nombre in nombres}
+        for nombre in nombres:
+            rng_instance = self.generadores[nombre]() # Crear instancia del RNG (se envía al proceso)
+            self.futuros[nombre] = self.pool.submit(
+                ejecutar_pruebas_en_proceso, nombre, rng_instance, num_samples_test, num_bins_chi2,
+                self.cola_progreso, self.evento_cancelar
+            )
+        self.barra_progreso.setValue(0)
+        self.btn_run_tests.setEnabled(False)
+        self.btn_cancelar.setEnabled(True)
+        self.result_text_area.setText(f"Ejecutando pruebas de: {', '.join(nombres)} ({num_samples_test} muestras)...")
+        self.timer_pruebas.start(100)
+
+    def cancelar_pruebas(self):
+        """Pide a las pruebas en curso que se detengan; las que aún no empezaron se descartan."""
+        if self.futuros:
+            self.evento_cancelar.set()
+            for futuro in self.futuros.values():
+                futuro.cancel()
+            self.btn_cancelar.setEnabled(False)
 
-        resultados = perform_rng_quality_tests_from_scratch(rng_instance, num_samples_test)
+    def _revisar_pruebas(self):
+        """Llamado por el QTimer: actualiza la barra de progreso y muestra los resultados cuando todas terminaron."""
+        while not self.cola_progreso.empty():
+            nombre, fraccion = self.cola_progreso.get_nowait()
+            if nombre in self.progreso:
+                self.progreso[nombre] = fraccion
+        if self.progreso:
+            self.barra_progreso.setValue(int(100 * sum(self.progreso.values()) / len(self.progreso)))
+        if not all(futuro.done() for futuro in self.futuros.values()):
+            return
+
+        self.timer_pruebas.stop()
+        resultados = []
+        for nombre, futuro in self.futuros.items():
+            if futuro.cancelled():
+                resultados.append({'generator_name': nombre, 'cancelled': True})
+                continue
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append({'generator_name': nombre, 'error': f"{type(e).__name__}: {e}"})
+        self.futuros = {}
+        self.btn_run_tests.setEnabled(True)
+        self.btn_cancelar.setEnabled(False)
+        self._mostrar_resultados(resultados)
 
-        # Formatear los resultados para el QTextEdit
+    def _mostrar_resultados(self, resultados):
+        self.figure.clear() # Limpiar figuras anteriores
+        completos = [r for r in resultados if not r.get('cancelled') and 'error' not in r]
+        avisos = "".join(
+            f"<p><font color='{'orange' if r.get('cancelled') else 'red'}'>{r['generator_name']}: "
+            f"{'cancelado' if r.get('cancelled') else 'Error: ' + r['error']}</font></p>"
+            for r in resultados if r not in completos
+        )
+        if len(completos) == 1 and len(resultados) == 1:
+            self.result_text_area.setHtml(self._html_resultado(completos[0]))
+        else:
+            self.result_text_area.setHtml(avisos + (self._html_comparacion(completos) if completos else ""))
+        if completos:
+            self.barra_progreso.setValue(100)
+            self._graficar(completos)
+
+    def _html_resultado(self, resultados):
+        """Resultados detallados de un generador."""
         texto_resultado_html = "<h3>Resultados Detallados:</h3>" # Usar HTML para mejor formato
         texto_resultado_html += f"<p><b>Tipo RNG:</b> {resultados['rng_type']}<br>"
         texto_resultado_html += f"<b>Semilla Inicial (para esta secuencia de prueba):</b> {resultados.get('initial_seed_for_test_sequence', 'N/A')}<br>"
@@ -208,6 +303,7 @@ class RNGDashboard(QMainWindow):
         else:
             texto_resultado_html += f"<p>Estadístico Chi² (calculado): {chi2_res.get('statistic', float('nan')):.4f}<br>"
             texto_resultado_html += f"Grados de Libertad: {chi2_res.get('degrees_freedom', 'N/A')}<br>"
+            texto_resultado_html += f"p-value: {chi2_res.get('p_value', float('nan')):.4f}<br>"
             if chi2_res.get('warning'):
                  texto_resultado_html += f"<p><font color='orange'>Advertencia (Chi²): {chi2_res.get('warning')}</font></p>"
 
@@ -219,6 +315,7 @@ class RNGDashboard(QMainWindow):
             texto_resultado_html += f"<p><font color='red'>Error: {ks_res['error']}</font></p>"
         else:
             texto_resultado_html += f"<p>Estadístico K-S (D) (calculado): {ks_res.get('statistic_D', float('nan')):.4f}<br>"
+            texto_resultado_html += f"p-value: {ks_res.get('p_value', float('nan')):.4f}<br>"
             # Interpretación aproximada de K-S si está disponible y N es grande
             h0_rejected_ks = ks_res.get('hypothesis_H0_rejected_at_alpha_0.05 (approx)', None)
             if h0_rejected_ks is not None:
@@ -235,53 +332,88 @@ class RNGDashboard(QMainWindow):
             texto_resultado_html += f"<p><font color='red'>Error: {autocorr_res['error']}</font></p>"
         else:
             texto_resultado_html += f"<p>Valor: {autocorr_res.get('value', float('nan')):.4f}</p>"
-        
-        self.result_text_area.setHtml(texto_resultado_html)
-
-        # --- GRÁFICOS ---
-        # Gráfico 1: Histograma Chi-Cuadrado
-        ax1 = self.figure.add_subplot(211) # Dos filas, una columna, primer gráfico
-        if "observed_counts" in chi2_res and chi2_res.get("expected_per_bin") is not None:
-            num_bins = len(chi2_res["observed_counts"])
-            ax1.bar(range(num_bins), chi2_res["observed_counts"], label="Frecuencia Observada", color='skyblue', edgecolor='black')
-            ax1.axhline(chi2_res["expected_per_bin"], color='r', linestyle='--', label=f"Frec. Esperada ({chi2_res['expected_per_bin']:.2f})")
-            ax1.set_title(f"Histograma - Prueba Chi² (Bins: {num_bins})")
-            ax1.set_xlabel("Intervalo (Bin)")
-            ax1.set_ylabel("Frecuencia")
-            ax1.legend()
-        else:
-            ax1.text(0.5, 0.5, "Datos para Chi² no disponibles o incompletos.", ha='center', va='center')
-            ax1.set_title("Histograma - Prueba Chi²")
-
-        # Gráfico 2: K-S ECDF vs CDF Teórica
-        ax2 = self.figure.add_subplot(212) # Dos filas, una columna, segundo gráfico
-        if "statistic_D" in ks_res and not np.isnan(ks_res['statistic_D']):
-            # Volver a generar muestras para el gráfico ECDF (o pasarlas desde rng_validator)
-            temp_rng_for_plot = self.generadores[gen_key]() # Nueva instancia
-            # Usar un número menor de muestras para el gráfico para que no sea muy lento
-            samples_for_ecdf = np.sort([temp_rng_for_plot.next_float() for _ in range(min(1000, num_samples_test))])
-            
-            if len(samples_for_ecdf) > 0:
-                ecdf_y = np.arange(1, len(samples_for_ecdf) + 1) / len(samples_for_ecdf)
-                ax2.plot(samples_for_ecdf, ecdf_y, label="ECDF (Muestra)", color='dodgerblue', marker='.', linestyle='none', markersize=4)
+        return texto_resultado_html
+
+    def _html_comparacion(self, lista_resultados):
+        """Tabla con una columna por generador y una fila por métrica."""
+        def valor(res, prueba, clave, formato):
+            dato = res[prueba].get(clave) if prueba else res.get(clave)
+            return "—" if dato is None else format(dato, formato)
+        filas = [
+            ("Tipo RNG", None, 'rng_type', ''),
+            ("Semilla inicial", None, 'initial_seed_for_test_sequence', ''),
+            ("Muestras", None, 'num_samples_tested', 'd'),
+            ("Chi² (estadístico)", 'chi_squared_uniformity', 'statistic', '.4f'),
+            ("Chi² (p-value)", 'chi_squared_uniformity', 'p_value', '.4f'),
+            ("K-S (D)", 'kolmogorov_smirnov_uniformity', 'statistic_D', '.5f'),
+            ("K-S (p-value)", 'kolmogorov_smirnov_uniformity', 'p_value', '.4f'),
+            ("Autocorrelación lag-1", 'autocorrelation_lag1_numpy', 'value', '.4f'),
+        ]
+        html = "<h3>Comparación de Generadores:</h3><table border='1' cellpadding='3'><tr><th></th>"
+        html += "".join(f"<th>{res['generator_name']}</th>" for res in lista_resultados) + "</tr>"
+        for titulo, prueba, clave, formato in filas:
+            html += f"<tr><td><b>{titulo}</b></td>"
+            html += "".join(f"<td>{valor(res, prueba, clave, formato)}</td>" for res in lista_resultados) + "</tr>"
+        return html + "</table>"
+
+    def _graficar(self, lista_resultados):
+        """Histograma Chi² y ECDF de cada generador (una columna por generador), con las muestras del resultado."""
+        columnas = len(lista_resultados)
+        for c, resultados in enumerate(lista_resultados):
+            sufijo = f" - {resultados['generator_name']}" if columnas > 1 else ""
+            chi2_res = resultados["chi_squared_uniformity"]
+            ks_res = resultados["kolmogorov_smirnov_uniformity"]
+
+            # Gráfico 1: Histograma Chi-Cuadrado
+            ax1 = self.figure.add_subplot(2, columnas, c + 1) # Dos filas: histograma arriba, ECDF abajo
+            if "observed_counts" in chi2_res and chi2_res.get("expected_per_bin") is not None:
+                num_bins = len(chi2_res["observed_counts"])
+                ax1.bar(range(num_bins), chi2_res["observed_counts"], label="Frecuencia Observada", color='skyblue', edgecolor='black')
+                ax1.axhline(chi2_res["expected_per_bin"], color='r', linestyle='--', label=f"Frec. Esperada ({chi2_res['expected_per_bin']:.2f})")
+                ax1.set_title(f"Histograma - Prueba Chi² (Bins: {num_bins}){sufijo}")
+                ax1.set_xlabel("Intervalo (Bin)")
+                ax1.set_ylabel("Frecuencia")
+                ax1.legend()
+            else:
+                ax1.text(0.5, 0.5, "Datos para Chi² no disponibles o incompletos.", ha='center', va='center')
+                ax1.set_title(f"Histograma - Prueba Chi²{sufijo}")
+
+            # Gráfico 2: K-S ECDF vs CDF Teórica, con las muestras ordenadas que trae el resultado
+            ax2 = self.figure.add_subplot(2, columnas, columnas + c + 1)
+            if "sorted_samples" in ks_res and len(ks_res["sorted_samples"]) > 0:
+                ordenadas = ks_res["sorted_samples"]
+                indices = np.linspace(0, len(ordenadas) - 1, min(PUNTOS_ECDF_GRAFICO, len(ordenadas))).astype(int)
+                ecdf_x, ecdf_y = ordenadas[indices], (indices + 1) / len(ordenadas)
+            elif "ecdf_edges" in ks_res: # Modo por bloques: ECDF en los bordes del histograma fino
+                ecdf_x, ecdf_y = ks_res["ecdf_edges"], ks_res["ecdf_values"]
+            else:
+                ecdf_x = None
+            if ecdf_x is not None:
+                ax2.plot(ecdf_x, ecdf_y, label="ECDF (Muestra)", color='dodgerblue', marker='.', linestyle='none', markersize=4)
                 ax2.plot([0, 1], [0, 1], linestyle="--", label="CDF Teórica U(0,1)", color='salmon') # Línea y=x para U(0,1)
-                ax2.set_title(f"K-S: ECDF vs CDF Teórica (D={ks_res['statistic_D']:.4f})")
+                ax2.set_title(f"K-S: ECDF vs CDF Teórica (D={ks_res['statistic_D']:.4f}){sufijo}")
                 ax2.set_xlabel("Valor de la Muestra")
                 ax2.set_ylabel("Probabilidad Acumulada")
                 ax2.legend()
                 ax2.grid(True, linestyle=':', alpha=0.7)
             else:
-                ax2.text(0.5, 0.5, "No hay muestras para graficar ECDF.", ha='center', va='center')
-                ax2.set_title("K-S: ECDF vs CDF Teórica")
-        else:
-            ax2.text(0.5, 0.5, "Datos para K-S no disponibles o incompletos.", ha='center', va='center')
-            ax2.set_title("K-S: ECDF vs CDF Teórica")
+                ax2.text(0.5, 0.5, "Datos para K-S no disponibles o incompletos.", ha='center', va='center')
+                ax2.set_title(f"K-S: ECDF vs CDF Teórica{sufijo}")
 
         self.figure.tight_layout(pad=3.0) # Añade espacio entre subplots y título general
         self.canvas.draw()
 
+    def closeEvent(self, event):
+        """Al cerrar la ventana se cancelan las pruebas en curso y se liberan los procesos."""
+        self.timer_pruebas.stop()
+        if self.pool is not None:
+            self.evento_cancelar.set()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.manager.shutdown()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = RNGDashboard()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())